@@ -1,17 +1,50 @@
 from flask import Flask
-from flasgger import Swagger
 from models.user import User
 from services.user_services import users, active_sessions  # Import the users dictionary
 from routes.auth_routes import auth_bp  # Import the auth_routes Blueprint
 from routes.profile_routes import profile_bp
 from routes.destination_routes import destination_bp
+from routes.admin_routes import admin_bp
+from services.audit_log import init_audit_log
+from services.columnar_services import init_columnar_store
+from services.apispec_cache import init_swagger
+from services.compression import init_compression
+from services.json_provider import FastJSONProvider
+from services.memory_services import init_tracemalloc
+from services.metrics import init_metrics
+from services.profiler import init_profiler
+from services.request_validation import init_request_validation
+from services.tracing import init_tracing
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
-    # Initialize Swagger
-    Swagger(app)
+    # Registered first so its after_request hook runs last and the recorded
+    # latency includes the other hooks (compression etc.)
+    init_metrics(app)
+
+    # Initialize Swagger (optional) with a cached apispec
+    init_swagger(app)
+
+    # Compress responses for clients that send Accept-Encoding
+    init_compression(app)
+
+    # Opt-in cProfile / stack sampling of selected requests
+    init_profiler(app)
+
+    # Opt-in per-request span trees (auth, hashing, services, JSON encoding)
+    init_tracing(app)
+
+    # Trace allocations for GET /admin/memory when TRACEMALLOC_FRAMES is set
+    init_tracemalloc(app)
+
+    # Write admin audit events to a file when AUDIT_LOG_PATH is set
+    init_audit_log(app)
+
+    # Columnar destination table for filters/group-bys when COLUMNAR_STORE_ENABLED=1
+    init_columnar_store(app)
 
     # Preload users
     User.preload_users(users, active_sessions)
@@ -20,6 +53,10 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix="/")
     app.register_blueprint(profile_bp, url_prefix="/")
     app.register_blueprint(destination_bp, url_prefix="/")
+    app.register_blueprint(admin_bp, url_prefix="/")
+
+    # Compile request body validators from the route specs registered above
+    init_request_validation(app)
 
     # Root route
     @app.route("/", methods=["GET"])
@@ -0,0 +1,75 @@
+"""
+Report create_app() time and /apispec_1.json latency, cached vs uncached.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_apispec
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+from flasgger import Swagger
+
+from app import create_app
+
+
+def _create_app(swagger_enabled):
+    """Return ``(app, seconds)`` for one create_app() call."""
+    os.environ["SWAGGER_ENABLED"] = "1" if swagger_enabled else "0"
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        app = create_app()
+        elapsed = time.perf_counter() - start
+    return app, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for enabled in (True, False):
+        times = [_create_app(enabled)[1] for _ in range(args.runs)]
+        label = "enabled" if enabled else "disabled"
+        print(f"create_app, swagger {label:<8}: {min(times) * 1e3:8.2f} ms (best)")
+
+    app, _ = _create_app(True)
+    client = app.test_client()
+    swagger = app.extensions["apispec_cache"].swagger
+
+    # What every request cost before: rebuild the dict and encode it
+    with app.test_request_context():
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            swagger.apispecs.pop(Swagger.DEFAULT_ENDPOINT, None)
+            json.dumps(swagger.get_apispecs())
+        uncached = (time.perf_counter() - start) / args.runs * 1e3
+    print(f"apispec, generated per request: {uncached:8.2f} ms")
+
+    start = time.perf_counter()
+    response = client.get("/apispec_1.json")
+    print(
+        f"apispec, first cached request:  {(time.perf_counter() - start) * 1e3:8.2f} ms"
+    )
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        client.get("/apispec_1.json")
+    cached = (time.perf_counter() - start) / args.runs * 1e3
+    print(f"apispec, cached bytes:          {cached:8.2f} ms")
+
+    etag = response.headers["ETag"]
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        client.get("/apispec_1.json", headers={"If-None-Match": etag})
+    revalidated = (time.perf_counter() - start) / args.runs * 1e3
+    print(f"apispec, 304 revalidation:      {revalidated:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
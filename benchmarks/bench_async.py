@@ -0,0 +1,163 @@
+"""
+Concurrency benchmarks for the async and long-lived endpoints.
+
+1. Bulk user import: hashing passwords one after another on the request
+   thread vs. awaiting them concurrently on the blocking-work pool.
+2. Slow clients: hold N open event streams, then time ordinary requests
+   on werkzeug's thread-per-connection server and on serve.py's fixed
+   thread pool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_async --users 64 --streams 4,16,64
+"""
+
+import argparse
+import asyncio
+import http.client
+import logging
+import socket
+import threading
+import time
+
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+from app import create_app
+from benchmarks import datagen
+from benchmarks.harness import _percentile, quiet
+from serve import PooledWSGIServer
+from services import user_services
+from services.executors import BLOCKING_WORKERS
+
+
+def bench_import(user_count):
+    records = [
+        {
+            "name": f"Import {i}",
+            "email": f"import{i}@bench.example.com",
+            "password": "pw",
+        }
+        for i in range(user_count)
+    ]
+
+    start = time.perf_counter()
+    for record in records:
+        generate_password_hash(record["password"])
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result, _ = asyncio.run(user_services.import_users_service(records))
+    concurrent = time.perf_counter() - start
+    assert result["created"] == user_count
+
+    print(f"bulk import of {user_count} users ({BLOCKING_WORKERS} hash threads)")
+    print(f"  sequential hashing:    {sequential * 1e3:9.1f} ms")
+    print(f"  import_users_service:  {concurrent * 1e3:9.1f} ms")
+
+
+def _open_stream(port, token):
+    """Open an event stream and leave it unread, like a slow client."""
+    stream = socket.create_connection(("127.0.0.1", port))
+    stream.sendall(
+        b"GET /destinations/events HTTP/1.1\r\nHost: bench\r\n"
+        b"Authorization: " + token.encode() + b"\r\n\r\n"
+    )
+    return stream
+
+
+def _time_requests(port, count, timeout):
+    latencies = []
+    timeouts = 0
+    for _ in range(count):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        start = time.perf_counter()
+        try:
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            latencies.append(time.perf_counter() - start)
+        except (socket.timeout, OSError):
+            timeouts += 1
+        finally:
+            connection.close()
+    return latencies, timeouts
+
+
+def bench_slow_clients(app, token, stream_counts, threads, requests, timeout):
+    """Return ``(server, streams, latencies, timeouts)`` rows."""
+    rows = []
+    servers = {
+        "werkzeug threaded": lambda: make_server("127.0.0.1", 0, app, threaded=True),
+        f"serve.py pool ({threads}t)": lambda: _pooled_server(app, threads),
+    }
+    for label, build in servers.items():
+        for stream_count in stream_counts:
+            server = build()
+            thread = threading.Thread(
+                target=server.serve_forever, kwargs={"poll_interval": 0.05}
+            )
+            thread.start()
+            port = server.server_address[1]
+            streams = [_open_stream(port, token) for _ in range(stream_count)]
+            time.sleep(0.2)  # let the server pick the streams up
+            latencies, timeouts = _time_requests(port, requests, timeout)
+            for stream in streams:
+                stream.close()
+            server.shutdown()
+            thread.join()
+            if isinstance(server, PooledWSGIServer):
+                server.pool.shutdown(wait=True)
+            rows.append((label, stream_count, sorted(latencies), timeouts))
+    return rows
+
+
+def print_slow_clients(rows, requests):
+    print(f"\n{requests} GET / requests while N event streams are held open")
+    print(f"{'server':<26} {'streams':>7} {'p50 ms':>8} {'p99 ms':>8} {'timeouts':>8}")
+    for label, stream_count, latencies, timeouts in rows:
+        if latencies:
+            p50 = f"{_percentile(latencies, 0.5) * 1e3:8.2f}"
+            p99 = f"{_percentile(latencies, 0.99) * 1e3:8.2f}"
+        else:
+            p50 = p99 = f"{'-':>8}"
+        print(f"{label:<26} {stream_count:>7} {p50} {p99} {timeouts:>8}")
+
+
+def _pooled_server(app, threads):
+    listener = socket.create_server(("127.0.0.1", 0))
+    host, port = listener.getsockname()
+    server = PooledWSGIServer(host, port, app, listener.fileno(), threads)
+    listener.close()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--streams", default="4,16,64", help="Open stream counts")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # The per-request access log would dominate the run
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    with quiet():
+        app = create_app()
+        app.config["EVENT_STREAM_HEARTBEAT"] = 1
+        accounts = datagen.populate(user_count=2, destination_count=10)
+    bench_import(args.users)
+    with quiet():
+        rows = bench_slow_clients(
+            app,
+            accounts["user"][1],
+            [int(n) for n in args.streams.split(",")],
+            args.threads,
+            args.requests,
+            args.timeout,
+        )
+    print_slow_clients(rows, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark multi-destination availability search: bitsets vs per-day sets.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_availability --destinations 100000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from services import availability_services
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--destinations", type=int, default=100000)
+    parser.add_argument("--nights", type=int, default=7)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    year_start = date(2027, 1, 1)
+    per_day = {}
+    availability_services.calendars.clear()
+
+    for i in range(args.destinations):
+        destination_id = f"bench-{i}"
+        # Open ~80% of the year in a few long stretches
+        open_days = set()
+        bits = 0
+        for _ in range(4):
+            first = rng.randrange(365)
+            length = rng.randint(30, 90)
+            for offset in range(length):
+                day = min(first + offset, 364)
+                open_days.add(year_start + timedelta(days=day))
+                bits |= 1 << day
+        availability_services.calendars[destination_id] = {2027: bits}
+        per_day[destination_id] = open_days
+
+    queries = []
+    for _ in range(args.queries):
+        first = rng.randrange(365 - args.nights)
+        queries.append(
+            [year_start + timedelta(days=first + n) for n in range(args.nights)]
+        )
+
+    start = time.perf_counter()
+    for days in queries:
+        bitset_hits = availability_services.find_open_destination_ids(days)
+    bitset_ms = (time.perf_counter() - start) / len(queries) * 1e3
+
+    start = time.perf_counter()
+    for days in queries:
+        scan_hits = [
+            destination_id
+            for destination_id, open_days in per_day.items()
+            if all(day in open_days for day in days)
+        ]
+    scan_ms = (time.perf_counter() - start) / len(queries) * 1e3
+
+    assert sorted(bitset_hits) == sorted(scan_hits)
+    print(f"{args.destinations} destinations, {args.nights}-night queries")
+    print(f"bitset AND:    {bitset_ms:8.2f} ms/query")
+    print(f"per-day scan:  {scan_ms:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
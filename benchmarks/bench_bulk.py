@@ -0,0 +1,77 @@
+"""
+Loading a partner catalog: one POST per destination vs. one bulk request.
+
+Adds N destinations through the Flask test client, first with individual
+POST /destinations calls and then with a single POST
+/admin/destinations/bulk, and reports destinations per second and how many
+catalog versions each approach went through. Catalog listeners (similarity
+index, availability, event stream, ...) are active in both runs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bulk --destinations 2000
+"""
+
+import argparse
+import time
+
+from app import create_app
+from benchmarks import datagen
+from benchmarks.harness import quiet
+from services import destination_services
+
+
+def _records(count, prefix):
+    return [
+        {
+            "name": f"{prefix} {i}",
+            "description": f"Partner destination {i} {datagen.WORDS[i % len(datagen.WORDS)]}",
+            "location": datagen.WORDS[(i * 7) % len(datagen.WORDS)],
+        }
+        for i in range(count)
+    ]
+
+
+def run(label, operation, count):
+    version = destination_services.catalog_version
+    start = time.perf_counter()
+    with quiet():
+        operation()
+    elapsed = time.perf_counter() - start
+    versions = destination_services.catalog_version - version
+    print(f"{label:<22} {elapsed * 1e3:10.1f} {count / elapsed:12.0f} {versions:9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--destinations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with quiet():
+        app = create_app()
+        datagen.reset()
+        accounts = datagen.populate(user_count=2, destination_count=1000)
+    client = app.test_client()
+    headers = {"Authorization": accounts["admin"][1]}
+
+    def one_by_one():
+        for record in _records(args.destinations, "Single"):
+            response = client.post("/destinations", json=record, headers=headers)
+            assert response.status_code == 201
+
+    def bulk():
+        response = client.post(
+            "/admin/destinations/bulk",
+            json=_records(args.destinations, "Bulk"),
+            headers=headers,
+        )
+        assert response.status_code == 200, response.get_json()
+
+    print(f"adding {args.destinations} destinations to a 1000-destination catalog")
+    print(f"{'mode':<22} {'ms':>10} {'dest/s':>12} {'versions':>9}")
+    run("POST /destinations xN", one_by_one, args.destinations)
+    run("bulk request", bulk, args.destinations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measure bytes on the wire and CPU per request for the catalog endpoint.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_compression --destinations 2000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from app import create_app
+from services import destination_services
+from services.compression import compress
+from services.destination_services import destinations
+from models.destination import Destination
+
+
+def _login_admin(client):
+    client.post(
+        "/register",
+        json={
+            "name": "Bench Admin",
+            "email": "bench.admin@example.com",
+            "password": "benchpass",
+            "role": "Admin",
+        },
+    )
+    response = client.post(
+        "/login", json={"email": "bench.admin@example.com", "password": "benchpass"}
+    )
+    return response.get_json()["auth_token"]
+
+
+def _seed(count):
+    changes = []
+    for i in range(count):
+        destination = Destination(
+            f"Destination {i}",
+            f"A generated destination number {i} with a reasonably long description.",
+            f"Region {i % 50}",
+            "bench.admin@example.com",
+        )
+        destinations[f"bench-{i}"] = destination
+        changes.append(("added", f"bench-{i}", destination))
+    destination_services._commit_changes(changes)
+
+
+def _cpu_per_request(client, headers, iterations):
+    start = time.process_time()
+    # The services print on every call; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            response = client.get("/destinations", headers=headers)
+    elapsed = time.process_time() - start
+    return len(response.data), elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--destinations", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--level", type=int, default=6)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config["COMPRESS_LEVEL"] = args.level
+    client = app.test_client()
+    with contextlib.redirect_stdout(io.StringIO()):
+        token = _login_admin(client)
+    _seed(args.destinations)
+
+    print(f"{'encoding':<10} {'bytes':>10} {'cpu us/req':>12}")
+    for encoding in ("identity", "gzip", "deflate"):
+        headers = {"Authorization": token, "Accept-Encoding": encoding}
+        size, cpu = _cpu_per_request(client, headers, args.iterations)
+        print(f"{encoding:<10} {size:>10} {cpu:>12.1f}")
+
+    # What every request would pay if the compressed body were not cached
+    raw = destination_services.get_catalog_body().raw
+    start = time.process_time()
+    for _ in range(args.iterations):
+        compress(raw, "gzip", args.level)
+    cpu = (time.process_time() - start) / args.iterations * 1e6
+    print(f"{'gzip/req':<10} {'':>10} {cpu:>12.1f}  (compression alone, uncached)")
+
+
+if __name__ == "__main__":
+    main()
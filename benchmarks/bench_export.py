@@ -0,0 +1,66 @@
+"""
+Peak memory of exporting the catalog: one JSON body vs. a streamed export.
+
+For each catalog size, builds the full GET /destinations body (what an
+admin had to download before) and drains the CSV and NDJSON export
+generators chunk by chunk, like a WSGI server writing them to a socket.
+Reports wall time and the tracemalloc peak for each.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_export --sizes 10000,100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks import datagen
+from benchmarks.harness import quiet
+from services import destination_services
+from services.export_services import export_service
+
+
+def _full_body():
+    destination_services.catalog_version += 1
+    return len(destination_services.get_catalog_body().raw)
+
+
+def _drain(export_format):
+    chunks, _ = export_service("destinations", export_format)
+    return sum(len(chunk) for chunk in chunks)
+
+
+def run(label, operation):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = operation()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"  {label:<12} {elapsed * 1e3:9.1f} {peak / 2**20:10.2f} {size / 2**20:10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    for count in (int(n) for n in args.sizes.split(",")):
+        with quiet():
+            datagen.reset()
+            datagen.populate(user_count=2, destination_count=count, index=False)
+        # Encode every fragment once, as a running server would have
+        destination_services.get_catalog_body()
+
+        print(f"{count} destinations")
+        print(f"  {'mode':<12} {'ms':>9} {'peak MiB':>10} {'out MiB':>10}")
+        run("json body", _full_body)
+        run("csv stream", lambda: _drain("csv"))
+        run("ndjson", lambda: _drain("ndjson"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare serialization strategies for the destination catalog.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization --destinations 10000
+"""
+
+import argparse
+import json
+import time
+
+from models.destination import Destination
+from services import json_provider
+from services.json_provider import join_fragments
+
+
+def _timed(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start) / iterations * 1e3
+    print(f"{label:<40} {elapsed:>10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--destinations", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    catalog = [
+        Destination(
+            f"Destination {i}",
+            f"A generated destination number {i} with a reasonably long description.",
+            f"Region {i % 50}",
+            "bench.admin@example.com",
+        )
+        for i in range(args.destinations)
+    ]
+
+    encoder = "orjson" if json_provider.orjson is not None else "stdlib json"
+    print(f"{args.destinations} destinations, encoder: {encoder}")
+
+    _timed(
+        "stdlib json.dumps of to_dict() list",
+        lambda: json.dumps([dest.to_dict() for dest in catalog], separators=(",", ":")),
+        args.iterations,
+    )
+    _timed(
+        "dumps_bytes of to_dict() list",
+        lambda: json_provider.dumps_bytes([dest.to_dict() for dest in catalog]),
+        args.iterations,
+    )
+
+    def cold_fragments():
+        for dest in catalog:
+            dest._json_fragment = None
+        return join_fragments(dest.to_json() for dest in catalog)
+
+    _timed("fragments, cold (every object encoded)", cold_fragments, args.iterations)
+    _timed(
+        "fragments, warm (join only)",
+        lambda: join_fragments(dest.to_json() for dest in catalog),
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Compare request throughput of serve.py against the Flask debug server.
+
+Each server runs as a subprocess with the same synthetic data, preloaded
+before any worker forks. Client threads then issue authenticated reads
+(the only traffic that is consistent across workers, see serve.py).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serve --workers 1,2,4 --clients 32 --duration 10
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import datagen
+from benchmarks.harness import _percentile
+from benchmarks.loadgen import HttpTransport
+
+ACCOUNTS_ENV = "BENCH_SERVE_ACCOUNTS"
+
+
+def preload(app):
+    """serve.py --preload hook: add synthetic data and publish its tokens."""
+    accounts = datagen.populate(user_count=1000, destination_count=1000)
+    with open(os.environ[ACCOUNTS_ENV], "w", encoding="utf-8") as output:
+        json.dump(accounts, output)
+
+
+def _run_debug_server(port):
+    from app import create_app
+
+    app = create_app()
+    preload(app)
+    # The reloader would re-run this in a child process with new tokens
+    app.run(port=port, debug=True, use_reloader=False)
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _start(command, accounts_path):
+    env = dict(os.environ, **{ACCOUNTS_ENV: accounts_path})
+    process = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if os.path.getsize(accounts_path) and process.poll() is None:
+            return process
+        time.sleep(0.1)
+    process.kill()
+    raise SystemExit(f"Server did not start: {' '.join(command)}")
+
+
+def _wait_until_serving(transport):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if transport.request("GET", "/")[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit("Server is not answering requests")
+
+
+def _load(transport, token, clients, duration):
+    headers = {"Authorization": token}
+    paths = [f"/destinations/{i}" for i in range(3, 1003)]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    ready = threading.Barrier(clients)
+
+    def client(seed):
+        rng = random.Random(seed)
+        own = []
+        failed = 0
+        ready.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            path = "/profile" if rng.random() < 0.2 else rng.choice(paths)
+            start = time.perf_counter()
+            try:
+                status, _ = transport.request("GET", path, headers=headers)
+            except OSError:
+                status = None
+            own.append(time.perf_counter() - start)
+            if status != 200:
+                failed += 1
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "errors": errors[0],
+        "p50_ms": _percentile(latencies, 0.5) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def _bench(label, command, port, args):
+    with tempfile.NamedTemporaryFile(suffix=".json") as accounts_file:
+        process = _start(command, accounts_file.name)
+        try:
+            transport = HttpTransport(f"http://127.0.0.1:{port}")
+            _wait_until_serving(transport)
+            with open(accounts_file.name, encoding="utf-8") as accounts:
+                token = json.load(accounts)["user"][1]
+            result = _load(transport, token, args.clients, args.duration)
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+    print(
+        f"{label:<28} {result['requests']:>8} {result['rps']:>9.0f} "
+        f"{result['errors']:>7} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to try")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--serve-debug", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_debug:
+        _run_debug_server(args.serve_debug)
+        return
+
+    print(
+        f"{'server':<28} {'requests':>8} {'req/s':>9} {'errors':>7} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    port = _free_port()
+    _bench(
+        "debug server (app.run)",
+        [sys.executable, "-m", "benchmarks.bench_serve", "--serve-debug", str(port)],
+        port,
+        args,
+    )
+    for workers in (int(n) for n in args.workers.split(",")):
+        port = _free_port()
+        _bench(
+            f"serve.py {workers}w x {args.threads}t",
+            [
+                sys.executable,
+                "serve.py",
+                f"--bind=127.0.0.1:{port}",
+                f"--workers={workers}",
+                f"--threads={args.threads}",
+                "--preload=benchmarks.bench_serve:preload",
+            ],
+            port,
+            args,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Time "similar destinations" queries against a pure-Python TF-IDF loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_similarity --destinations 100000
+"""
+
+import argparse
+import math
+import random
+import re
+import time
+
+from services.similarity_services import TfidfIndex
+
+WORDS = (
+    "beach mountain lake river city old town museum castle island forest "
+    "desert tropical snowy historic modern quiet lively coastal alpine "
+    "volcano canyon harbor market temple palace garden valley glacier reef "
+    "vineyard festival cathedral bridge lagoon savanna jungle fjord"
+).split()
+
+
+def _random_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+
+
+def _python_similar(docs, query_id, k):
+    """Reference implementation: sparse dict vectors and a loop per document."""
+    df = {}
+    for terms in docs.values():
+        for term in terms:
+            df[term] = df.get(term, 0) + 1
+    count = len(docs)
+    idf = {term: math.log((1 + count) / (1 + n)) + 1 for term, n in df.items()}
+
+    def vector(terms):
+        return {t: (1 + math.log(c)) * idf[t] for t, c in terms.items()}
+
+    query = vector(docs[query_id])
+    query_norm = math.sqrt(sum(w * w for w in query.values()))
+    scores = []
+    for doc_id, terms in docs.items():
+        if doc_id == query_id:
+            continue
+        vec = vector(terms)
+        dot = sum(w * vec.get(t, 0.0) for t, w in query.items())
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        scores.append((dot / (norm * query_norm) if norm else 0.0, doc_id))
+    scores.sort(reverse=True)
+    return scores[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--destinations", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = TfidfIndex()
+    docs = {}
+
+    start = time.perf_counter()
+    for i in range(args.destinations):
+        text = _random_text(rng)
+        index.upsert(str(i), text)
+        terms = {}
+        for token in re.findall(r"[a-z0-9]+", text):
+            terms[token] = terms.get(token, 0) + 1
+        docs[str(i)] = terms
+    build = time.perf_counter() - start
+    print(f"indexed {args.destinations} destinations in {build:.2f} s")
+
+    query_ids = [str(rng.randrange(args.destinations)) for _ in range(args.queries)]
+
+    # First query after a write pays for the IDF and norm refresh
+    start = time.perf_counter()
+    index.most_similar(query_ids[0], args.k)
+    print(
+        f"numpy, first query after write: {(time.perf_counter() - start) * 1e3:8.2f} ms"
+    )
+
+    start = time.perf_counter()
+    for query_id in query_ids:
+        index.most_similar(query_id, args.k)
+    per_query = (time.perf_counter() - start) / len(query_ids) * 1e3
+    print(f"numpy, cached weights:          {per_query:8.2f} ms/query")
+
+    start = time.perf_counter()
+    _python_similar(docs, query_ids[0], args.k)
+    print(
+        f"pure-Python loop:               {(time.perf_counter() - start) * 1e3:8.2f} ms/query"
+    )
+
+
+if __name__ == "__main__":
+    main()
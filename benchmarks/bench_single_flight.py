@@ -0,0 +1,86 @@
+"""
+Burst of identical GET /destinations work right after a catalog change.
+
+Every round invalidates the catalog, then releases N threads at once, each
+asking for the serialized catalog and its gzip variant, like a herd of
+clients hitting GET /destinations. Runs with and without single-flight and
+reports the wall time per burst and how many builds/compressions ran.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_single_flight --destinations 20000 --threads 32
+"""
+
+import argparse
+import threading
+import time
+from unittest import mock
+
+from benchmarks import datagen
+from benchmarks.harness import quiet
+from services import compression, destination_services
+
+
+class _NoFlight:
+    """Drop-in for SingleFlight that lets every caller compute its own result."""
+
+    coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+def _burst(threads):
+    ready = threading.Barrier(threads + 1)
+
+    def client():
+        ready.wait()
+        destination_services.get_catalog_body().encoded("gzip", 6)
+
+    workers = [threading.Thread(target=client) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    destination_services.catalog_version += 1
+    ready.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def run(label, rounds, threads):
+    builds = mock.Mock(wraps=destination_services.join_fragments)
+    compressions = mock.Mock(wraps=compression.compress)
+    with mock.patch.object(
+        destination_services, "join_fragments", builds
+    ), mock.patch.object(compression, "compress", compressions):
+        times = sorted(_burst(threads) for _ in range(rounds))
+    print(
+        f"{label:<16} {times[len(times) // 2] * 1e3:9.1f} {times[-1] * 1e3:9.1f} "
+        f"{builds.call_count / rounds:8.1f} {compressions.call_count / rounds:8.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--destinations", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with quiet():
+        datagen.reset()
+        datagen.populate(user_count=2, destination_count=args.destinations, index=False)
+    destination_services.get_catalog_body()  # encode every fragment once
+
+    print(f"{args.threads} concurrent requests per burst, {args.rounds} bursts")
+    print(f"{'mode':<16} {'p50 ms':>9} {'max ms':>9} {'builds':>8} {'gzips':>8}")
+    with mock.patch.object(
+        destination_services, "catalog_flight", _NoFlight()
+    ), mock.patch.object(compression, "_compress_flight", _NoFlight()):
+        run("no coalescing", args.rounds, args.threads)
+    run("single-flight", args.rounds, args.threads)
+
+
+if __name__ == "__main__":
+    main()
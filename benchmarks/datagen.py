@@ -0,0 +1,97 @@
+"""
+Synthetic data for benchmarks: fill ``users``, ``active_sessions`` and
+``destinations`` at a configurable scale.
+"""
+
+import random
+import uuid
+from unittest import mock
+
+from werkzeug.security import generate_password_hash
+
+import models.user
+from models.destination import Destination
+from models.user import User
+from services import destination_services
+from services.destination_services import destinations
+from services.user_services import active_sessions, users
+
+# Every generated user shares this password, so the expensive hash is
+# computed once instead of once per user.
+PASSWORD = "benchmark-password"
+
+WORDS = (
+    "beach mountain lake river city old town museum castle island forest "
+    "desert tropical snowy historic modern quiet lively coastal alpine "
+    "volcano canyon harbor market temple palace garden valley glacier reef"
+).split()
+
+
+def reset():
+    """Empty every store."""
+    users.clear()
+    active_sessions.clear()
+    removed = [
+        ("removed", destination_id, destination)
+        for destination_id, destination in destinations.items()
+    ]
+    destinations.clear()
+    destination_services._commit_changes(removed)
+
+
+def populate(
+    user_count=1000,
+    destination_count=1000,
+    session_ratio=0.5,
+    admin_ratio=0.01,
+    index=True,
+    seed=1,
+):
+    """
+    Add ``user_count`` users, log in ``session_ratio`` of them and add
+    ``destination_count`` destinations.
+
+    With ``index=False`` catalog listeners (similarity index, etc.) are not
+    notified, which keeps million-row runs fast and small.
+
+    Returns ``{"admin": (email, token), "user": (email, token)}`` with one
+    logged-in account of each role for authenticated requests.
+    """
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD)
+    accounts = {}
+
+    with mock.patch.object(models.user, "generate_password_hash") as hasher:
+        hasher.return_value = password_hash
+        for i in range(user_count):
+            # The first two users are always one admin and one regular user
+            is_admin = i == 0 or (i > 1 and rng.random() < admin_ratio)
+            role = "Admin" if is_admin else "User"
+            email = f"user{i}@bench.example.com"
+            users[email] = User(f"User {i}", email, PASSWORD, role)
+            if i < 2 or rng.random() < session_ratio:
+                token = str(uuid.uuid4())
+                active_sessions[token] = {"email": email, "role": role}
+                accounts.setdefault(role.lower(), (email, f"Bearer {token}"))
+
+    changes = []
+    start = destination_services.destination_counter
+    for i in range(destination_count):
+        destination_id = str(start + i + 1)
+        destination = Destination(
+            " ".join(rng.choice(WORDS) for _ in range(2)).title(),
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))),
+            f"Region {rng.randrange(200)}",
+            f"user{rng.randrange(max(user_count, 1))}@bench.example.com",
+        )
+        destination.id = start + i + 1
+        destinations[destination_id] = destination
+        changes.append(("added", destination_id, destination))
+    destination_services.destination_counter = start + destination_count
+
+    if index:
+        destination_services._commit_changes(changes)
+    else:
+        destination_services.catalog_version += 1
+
+    return accounts
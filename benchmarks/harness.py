@@ -0,0 +1,122 @@
+"""
+Timing helpers shared by the benchmark suite.
+
+``measure`` reports throughput, latency percentiles and memory allocated per
+operation; results are plain dicts so they can be saved as JSON and compared
+between runs.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+
+def _percentile(sorted_samples, fraction):
+    index = min(
+        len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1)))
+    )
+    return sorted_samples[index]
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the debug prints emitted by the services."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(name, operation, iterations=1000, warmup=50, alloc_iterations=None):
+    """
+    Time ``operation()`` and return a result dict.
+
+    Latencies come from a plain timed pass; allocations are measured in a
+    separate, shorter pass under tracemalloc because tracing slows every
+    allocation down.
+    """
+    with quiet():
+        for _ in range(warmup):
+            operation()
+
+        samples = []
+        clock = time.perf_counter_ns
+        started = clock()
+        for _ in range(iterations):
+            before = clock()
+            operation()
+            samples.append(clock() - before)
+        total_ns = clock() - started
+
+        alloc_iterations = alloc_iterations or max(1, min(iterations, 200))
+        tracemalloc.start()
+        blocks_before = sys.getallocatedblocks()
+        allocated = 0
+        for _ in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - current
+        blocks_after = sys.getallocatedblocks()
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "ops_per_sec": iterations / (total_ns / 1e9),
+        "p50_us": _percentile(samples, 0.50) / 1e3,
+        "p95_us": _percentile(samples, 0.95) / 1e3,
+        "p99_us": _percentile(samples, 0.99) / 1e3,
+        "alloc_bytes_per_op": allocated / alloc_iterations,
+        "retained_blocks_per_op": (blocks_after - blocks_before) / alloc_iterations,
+    }
+
+
+def print_results(results):
+    header = (
+        f"{'benchmark':<34} {'ops/s':>10} {'p50 us':>10} {'p95 us':>10} "
+        f"{'p99 us':>10} {'alloc B/op':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['name']:<34} {result['ops_per_sec']:>10.0f} "
+            f"{result['p50_us']:>10.1f} {result['p95_us']:>10.1f} "
+            f"{result['p99_us']:>10.1f} {result['alloc_bytes_per_op']:>11.0f}"
+        )
+
+
+def save_results(path, results, **metadata):
+    document = {
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **metadata,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(document, results_file, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+def print_comparison(baseline, results):
+    """Print the change in throughput and p99 against a saved baseline run."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    print(f"\n{'benchmark':<34} {'ops/s change':>14} {'p99 change':>12}")
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            print(f"{result['name']:<34} {'(new)':>14}")
+            continue
+        throughput = (result["ops_per_sec"] / before["ops_per_sec"] - 1) * 100
+        p99 = (result["p99_us"] / before["p99_us"] - 1) * 100
+        print(f"{result['name']:<34} {throughput:>+13.1f}% {p99:>+11.1f}%")
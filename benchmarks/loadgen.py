@@ -0,0 +1,444 @@
+"""
+Mixed-workload load generator.
+
+Replays a synthetic (or recorded) request mix with concurrent workers and
+reports throughput, error rates and latency histograms per route.
+
+    # In-process threaded WSGI server on a free local port
+    python -m benchmarks.loadgen --workers 16 --duration 30
+
+    # Straight into the WSGI app through the test client (no sockets)
+    python -m benchmarks.loadgen --target wsgi
+
+    # A server that is already running
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000
+
+    # Replay recorded requests, one JSON object per line:
+    # {"method": "GET", "path": "/destinations", "auth": "user"}
+    python -m benchmarks.loadgen --replay requests.ndjson
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.harness import quiet
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# (weight, route label); weights are relative
+DEFAULT_MIX = (
+    (30, "GET /destinations"),
+    (25, "GET /destinations/<id>"),
+    (10, "GET /profile"),
+    (5, "PATCH /profile"),
+    (4, "POST /login"),
+    (2, "POST /logout"),
+    (2, "POST /register"),
+    (3, "POST /destinations"),
+    (3, "PUT /destinations/<id>"),
+    (2, "DELETE /destinations/<id>"),
+)
+
+
+class HttpTransport:
+    """Keep-alive HTTP connections to a running server, one per thread."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=30
+                )
+                self._local.connection = connection
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                if response.getheader("Connection", "").lower() == "close":
+                    self._reset()
+                return response.status, data
+            except (ConnectionError, http.client.HTTPException):
+                self._reset()
+                if attempt:
+                    raise
+
+    def _reset(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+        self._local.connection = None
+
+
+class WsgiTransport:
+    """Call the WSGI app directly through a Flask test client per thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.data
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.statuses = {}
+        self.exceptions = 0
+
+    def merge(self, other):
+        self.latencies_ms.extend(other.latencies_ms)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.exceptions += other.exceptions
+
+
+class Worker(threading.Thread):
+    """Runs requests from the mix until the deadline or request budget is hit."""
+
+    def __init__(self, number, transport, mix, state, ready, budget, seed):
+        super().__init__(name=f"loadgen-{number}", daemon=True)
+        self.number = number
+        self.transport = transport
+        self.mix = mix
+        self.state = state
+        self.ready = ready
+        self.budget = budget
+        self.rng = random.Random(seed)
+        self.stats = {}
+        self.token = None
+        self.email = f"loadgen-{number}-{seed}@example.com"
+        self.password = "loadgen-password"
+
+    def run(self):
+        self.token = self._register_and_login()
+        # Start measuring only once every worker has an account
+        self.ready.wait()
+        deadline = self.state["deadline"]
+        while time.perf_counter() < deadline and next(self.budget, None) is not None:
+            label, method, path, body, auth = self.mix.next_request(self)
+            headers = {}
+            if auth == "user" and self.token:
+                headers["Authorization"] = self.token
+            elif auth == "admin":
+                headers["Authorization"] = self.state["admin_token"]
+
+            stats = self.stats.setdefault(label, RouteStats())
+            started = time.perf_counter()
+            try:
+                status, data = self.transport.request(method, path, body, headers)
+            except Exception:
+                stats.exceptions += 1
+                continue
+            stats.latencies_ms.append((time.perf_counter() - started) * 1e3)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            self.mix.observe(self, label, status, data)
+
+    def _register_and_login(self):
+        self.transport.request(
+            "POST",
+            "/register",
+            {"name": self.email, "email": self.email, "password": self.password},
+        )
+        return self.login()
+
+    def login(self):
+        status, data = self.transport.request(
+            "POST", "/login", {"email": self.email, "password": self.password}
+        )
+        if status == 200:
+            return json.loads(data)["auth_token"]
+        return None
+
+
+class SyntheticMix:
+    """Picks requests from weighted route labels."""
+
+    def __init__(self, weights=DEFAULT_MIX):
+        self.labels = [label for _, label in weights]
+        self.cumulative = list(itertools.accumulate(weight for weight, _ in weights))
+        # Guards the destination id lists shared by every worker
+        self._lock = threading.Lock()
+
+    def next_request(self, worker):
+        rng = worker.rng
+        label = rng.choices(self.labels, cum_weights=self.cumulative)[0]
+        ids = worker.state["destination_ids"]
+        with self._lock:
+            some_id = rng.choice(ids) if ids else "1"
+
+        if label == "GET /destinations":
+            return label, "GET", "/destinations", None, "user"
+        if label == "GET /destinations/<id>":
+            return label, "GET", f"/destinations/{some_id}", None, "user"
+        if label == "GET /profile":
+            return label, "GET", "/profile", None, "user"
+        if label == "PATCH /profile":
+            body = {"name": f"Load {rng.randrange(1000)}"}
+            return label, "PATCH", "/profile", body, "user"
+        if label == "POST /login":
+            body = {"email": worker.email, "password": worker.password}
+            return label, "POST", "/login", body, None
+        if label == "POST /logout":
+            return label, "POST", "/logout", None, "user"
+        if label == "POST /register":
+            email = f"new-{worker.number}-{rng.getrandbits(48)}@example.com"
+            body = {"name": "New User", "email": email, "password": "newpass123"}
+            return label, "POST", "/register", body, None
+        if label == "POST /destinations":
+            body = {
+                "name": f"Load Destination {rng.randrange(10**6)}",
+                "description": "Created by the load generator",
+                "location": f"Region {rng.randrange(50)}",
+            }
+            return label, "POST", "/destinations", body, "admin"
+        if label == "PUT /destinations/<id>":
+            body = {"description": f"Updated {rng.randrange(10**6)}"}
+            return label, "PUT", f"/destinations/{some_id}", body, "admin"
+        # DELETE only removes destinations the load generator created itself
+        created = worker.state["created_ids"]
+        with self._lock:
+            target = created.pop() if created else "missing"
+            if target in ids:
+                ids.remove(target)
+        return label, "DELETE", f"/destinations/{target}", None, "admin"
+
+    def observe(self, worker, label, status, data):
+        if label == "POST /destinations" and status == 201:
+            destination_id = json.loads(data)["destination_id"]
+            with self._lock:
+                worker.state["created_ids"].append(destination_id)
+                worker.state["destination_ids"].append(destination_id)
+        elif label == "POST /login" and status == 200:
+            worker.token = json.loads(data)["auth_token"]
+        elif label == "POST /logout" and status == 200:
+            worker.token = worker.login()
+
+
+class ReplayMix:
+    """Replays recorded requests in order, cycling when the file runs out."""
+
+    def __init__(self, path):
+        with open(path, encoding="utf-8") as replay_file:
+            self.requests = [json.loads(line) for line in replay_file if line.strip()]
+        self._next = itertools.cycle(self.requests)
+        self._lock = threading.Lock()
+
+    def next_request(self, worker):
+        with self._lock:
+            entry = next(self._next)
+        label = entry.get("label") or f"{entry['method']} {entry['path']}"
+        return (
+            label,
+            entry["method"],
+            entry["path"],
+            entry.get("json"),
+            entry.get("auth"),
+        )
+
+    def observe(self, worker, label, status, data):
+        pass
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _histogram(latencies_ms):
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for latency in latencies_ms:
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if latency <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+def summarize(stats, elapsed):
+    report = {}
+    for label, route in sorted(stats.items()):
+        latencies = sorted(route.latencies_ms)
+        requests = len(latencies) + route.exceptions
+        server_errors = route.exceptions + sum(
+            count for status, count in route.statuses.items() if status >= 500
+        )
+        client_errors = sum(
+            count for status, count in route.statuses.items() if 400 <= status < 500
+        )
+        report[label] = {
+            "requests": requests,
+            "throughput_rps": requests / elapsed if elapsed else 0.0,
+            "error_rate": server_errors / requests if requests else 0.0,
+            "client_error_rate": client_errors / requests if requests else 0.0,
+            "statuses": {
+                str(status): n for status, n in sorted(route.statuses.items())
+            },
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+            "p99_ms": _percentile(latencies, 0.99),
+            "histogram": dict(
+                zip(
+                    [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + ["slower"],
+                    _histogram(latencies),
+                )
+            ),
+        }
+    return report
+
+
+def print_report(report, elapsed, workers):
+    total = sum(route["requests"] for route in report.values())
+    print(f"{total} requests in {elapsed:.1f}s with {workers} workers")
+    print(f"{total / elapsed:.0f} req/s overall\n")
+    print(
+        f"{'route':<28} {'reqs':>7} {'req/s':>8} {'5xx%':>6} {'4xx%':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for label, route in report.items():
+        print(
+            f"{label:<28} {route['requests']:>7} {route['throughput_rps']:>8.1f} "
+            f"{route['error_rate'] * 100:>6.1f} {route['client_error_rate'] * 100:>6.1f} "
+            f"{route['p50_ms']:>8.2f} {route['p95_ms']:>8.2f} {route['p99_ms']:>8.2f}"
+        )
+    print("\nlatency histograms (requests per bucket)")
+    for label, route in report.items():
+        buckets = " ".join(
+            f"{bucket}:{count}" for bucket, count in route["histogram"].items() if count
+        )
+        print(f"  {label:<28} {buckets}")
+
+
+def _start_inprocess_server(app):
+    import logging
+
+    from werkzeug.serving import make_server
+
+    # The per-request access log would dominate the run
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _setup_admin(transport):
+    admin = {"name": "Load Admin", "email": "loadgen.admin@example.com"}
+    admin.update(password="loadgen-admin", role="Admin")
+    transport.request("POST", "/register", admin)
+    status, data = transport.request(
+        "POST", "/login", {"email": admin["email"], "password": admin["password"]}
+    )
+    if status != 200:
+        raise SystemExit(f"Could not log in the load generator admin ({status})")
+    return json.loads(data)["auth_token"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload load generator.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument(
+        "--target",
+        choices=("inproc", "wsgi"),
+        default="inproc",
+        help="inproc: threaded WSGI server on a local port; wsgi: test client",
+    )
+    parser.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--replay", help="NDJSON file of recorded requests")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    server = None
+    with quiet():
+        if args.url:
+            transport = HttpTransport(args.url)
+        else:
+            from app import create_app
+
+            app = create_app()
+            if args.target == "wsgi":
+                transport = WsgiTransport(app)
+            else:
+                server, url = _start_inprocess_server(app)
+                transport = HttpTransport(url)
+
+        status, data = transport.request("GET", "/")
+        if status != 200:
+            raise SystemExit(f"Target is not responding ({status})")
+
+        state = {
+            "admin_token": _setup_admin(transport),
+            "destination_ids": ["1", "2"],
+            "created_ids": [],
+        }
+        mix = ReplayMix(args.replay) if args.replay else SyntheticMix()
+        budget = (
+            itertools.count() if args.requests is None else iter(range(args.requests))
+        )
+
+        def start_clock():
+            state["started"] = time.perf_counter()
+            state["deadline"] = state["started"] + args.duration
+
+        ready = threading.Barrier(args.workers, action=start_clock)
+        workers = [
+            Worker(n, transport, mix, state, ready, budget, args.seed * 1000 + n)
+            for n in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - state["started"]
+
+    if server is not None:
+        server.shutdown()
+
+    stats = {}
+    for worker in workers:
+        for label, route in worker.stats.items():
+            stats.setdefault(label, RouteStats()).merge(route)
+    report = summarize(stats, elapsed)
+    print_report(report, elapsed, args.workers)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out_file:
+            json.dump(
+                {"workers": args.workers, "elapsed": elapsed, "routes": report},
+                out_file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
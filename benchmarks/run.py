@@ -0,0 +1,162 @@
+"""
+Per-endpoint benchmark suite.
+
+Fills the stores with synthetic data, then times hot service functions
+directly and the main endpoints through the Flask test client.
+
+    python -m benchmarks.run --scale 10000 --out results.json
+    python -m benchmarks.run --scale 10000 --compare results.json
+"""
+
+import argparse
+import itertools
+
+from app import create_app
+from benchmarks import datagen
+from benchmarks.harness import (
+    load_results,
+    measure,
+    print_comparison,
+    print_results,
+    quiet,
+    save_results,
+)
+from services import destination_services
+from services.destination_services import get_all_destinations_service
+from services.user_services import login_user, validate_token
+
+
+def build_cases(client, accounts, iterations):
+    admin_email, admin_token = accounts["admin"]
+    user_email, user_token = accounts["user"]
+    user_headers = {"Authorization": user_token}
+    admin_headers = {"Authorization": admin_token}
+    destination_ids = itertools.cycle(
+        list(destination_services.destinations)[:1000] or ["missing"]
+    )
+
+    # A 20-item wishlist: one request per item vs. one batch request
+    wishlist = [next(destination_ids) for _ in range(20)]
+    batch_url = "/destinations/batch?ids=" + ",".join(wishlist)
+
+    def get_wishlist_one_by_one():
+        for destination_id in wishlist:
+            client.get(f"/destinations/{destination_id}", headers=user_headers)
+
+    def rebuild_catalog():
+        destination_services.catalog_version += 1
+        return destination_services.get_catalog_body()
+
+    # (name, operation, iterations); password hashing cases run far fewer
+    # iterations because each one costs tens of milliseconds.
+    hashing_iterations = max(5, iterations // 100)
+    return [
+        ("service validate_token", lambda: validate_token(user_token), iterations),
+        (
+            "service get_all_destinations",
+            get_all_destinations_service,
+            iterations,
+        ),
+        ("service catalog rebuild", rebuild_catalog, max(5, iterations // 20)),
+        (
+            "service login_user",
+            lambda: login_user(user_email, datagen.PASSWORD),
+            hashing_iterations,
+        ),
+        (
+            "GET /destinations",
+            lambda: client.get("/destinations", headers=user_headers),
+            iterations,
+        ),
+        (
+            "GET /destinations/<id>",
+            lambda: client.get(
+                f"/destinations/{next(destination_ids)}", headers=user_headers
+            ),
+            iterations,
+        ),
+        (
+            "GET /destinations/<id> x20",
+            get_wishlist_one_by_one,
+            max(5, iterations // 10),
+        ),
+        (
+            "GET /destinations/batch (20 ids)",
+            lambda: client.get(batch_url, headers=user_headers),
+            iterations,
+        ),
+        (
+            "GET /profile",
+            lambda: client.get("/profile", headers=user_headers),
+            iterations,
+        ),
+        (
+            "GET /users",
+            lambda: client.get("/users", headers=admin_headers),
+            max(5, iterations // 20),
+        ),
+        (
+            "POST /login",
+            lambda: client.post(
+                "/login", json={"email": user_email, "password": datagen.PASSWORD}
+            ),
+            hashing_iterations,
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-endpoint benchmark suite.")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1000,
+        help="Number of users and destinations (1000 to 1000000)",
+    )
+    parser.add_argument("--users", type=int, help="Override the number of users")
+    parser.add_argument(
+        "--destinations", type=int, help="Override the number of destinations"
+    )
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument(
+        "--filter", default="", help="Only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--out", help="Write the results as JSON to this path")
+    parser.add_argument("--compare", help="Compare against a previous JSON result")
+    args = parser.parse_args()
+
+    user_count = args.users or args.scale
+    destination_count = args.destinations or args.scale
+
+    with quiet():
+        app = create_app()
+        datagen.reset()
+        accounts = datagen.populate(
+            user_count=user_count,
+            destination_count=destination_count,
+            # Keep the similarity index out of very large runs
+            index=destination_count <= 100000,
+        )
+    client = app.test_client()
+
+    results = []
+    for name, operation, iterations in build_cases(client, accounts, args.iterations):
+        if args.filter in name:
+            results.append(measure(name, operation, iterations=iterations))
+
+    print(f"users={user_count} destinations={destination_count}\n")
+    print_results(results)
+
+    if args.compare:
+        print_comparison(load_results(args.compare), results)
+    if args.out:
+        save_results(
+            args.out,
+            results,
+            users=user_count,
+            destinations=destination_count,
+        )
+
+
+if __name__ == "__main__":
+    main()
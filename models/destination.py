@@ -1,7 +1,13 @@
+from services.json_provider import dumps_bytes
+
 destination_counter = 0
 
 
 class Destination:
+    # Fields that appear in to_dict(); changing any of them invalidates the
+    # cached JSON fragment.
+    SERIALIZED_FIELDS = ("id", "name", "description", "location")
+
     def __init__(self, name, description, location, admin_email):
         global destination_counter
         destination_counter += 1
@@ -11,6 +17,11 @@ class Destination:
         self.location = location
         self.admin_email = admin_email
 
+    def __setattr__(self, name, value):
+        if name in self.SERIALIZED_FIELDS:
+            object.__setattr__(self, "_json_fragment", None)
+        object.__setattr__(self, name, value)
+
     def __repr__(self):
         return f"Destination({self.name}, {self.description}, {self.location}, {self.admin_email})"
 
@@ -25,3 +36,11 @@ class Destination:
             "location": self.location,
             # Optionally include other attributes as needed
         }
+
+    def to_json(self):
+        """
+        Return to_dict() encoded as JSON bytes, cached until the next change
+        """
+        if self._json_fragment is None:
+            self._json_fragment = dumps_bytes(self.to_dict())
+        return self._json_fragment
@@ -1,26 +1,81 @@
 import uuid
+from array import array
+from bisect import bisect_left
 from werkzeug.security import generate_password_hash, check_password_hash
+from services.json_provider import dumps_bytes
+from services.tracing import span
 
 
 class User:
+    # Fields that appear in to_dict(); changing any of them invalidates the
+    # cached JSON fragment.
+    SERIALIZED_FIELDS = ("name", "email", "role")
+
     def __init__(self, name, email, password, role="User"):
         self.name = name
         self.email = email
-        self.password = generate_password_hash(
-            password
-        )  # Hash the password before storing
+        with span("hash_password"):
+            self.password = generate_password_hash(
+                password
+            )  # Hash the password before storing
         self.role = role
         self.token = None  # Initially no token
+        self.favorites = array("L")  # Sorted ids of favorite destinations
+
+    def __setattr__(self, name, value):
+        if name in self.SERIALIZED_FIELDS:
+            object.__setattr__(self, "_json_fragment", None)
+        object.__setattr__(self, name, value)
+
+    # Public profile data, without the password hash or token
+    def to_dict(self):
+        return {"name": self.name, "email": self.email, "role": self.role}
+
+    # to_dict() encoded as JSON bytes, cached until a public field changes
+    def to_json(self):
+        if self._json_fragment is None:
+            self._json_fragment = dumps_bytes(self.to_dict())
+        return self._json_fragment
+
+    # Builds a user around an already computed password hash (e.g. one hashed
+    # off the request thread) instead of hashing the password again
+    @classmethod
+    def from_password_hash(cls, name, email, password_hash, role="User"):
+        user = cls.__new__(cls)
+        user.name = name
+        user.email = email
+        user.password = password_hash
+        user.role = role
+        user.token = None
+        user.favorites = array("L")
+        return user
 
     # This method checks if the provided password matches the stored hashed password
     def verify_password(self, password):
-        return check_password_hash(self.password, password)  # Compare the hashes
+        with span("verify_password"):
+            return check_password_hash(self.password, password)  # Compare the hashes
 
     # This method generates a new token for the user
     def generate_token(self):
         self.token = str(uuid.uuid4())
         return self.token
 
+    # Adds a destination id to the favorites; returns False if already there
+    def add_favorite(self, destination_id):
+        index = bisect_left(self.favorites, destination_id)
+        if index < len(self.favorites) and self.favorites[index] == destination_id:
+            return False
+        self.favorites.insert(index, destination_id)
+        return True
+
+    # Removes a destination id from the favorites; returns False if missing
+    def remove_favorite(self, destination_id):
+        index = bisect_left(self.favorites, destination_id)
+        if index == len(self.favorites) or self.favorites[index] != destination_id:
+            return False
+        del self.favorites[index]
+        return True
+
     @staticmethod
     def preload_users(users, active_sessions):
         """Add some predefined users for testing purposes."""
@@ -0,0 +1,598 @@
+from flask import Blueprint, Response, current_app, jsonify, request, url_for
+from flasgger import swag_from
+from services.audit_log import query_events
+from services.columnar_services import GROUP_FIELDS, destination_stats_service
+from services.destination_services import bulk_destinations_service
+from services.export_services import EXPORT_FORMATS, export_service
+from services.jobs import (
+    JOB_TYPES,
+    cancel_job_service,
+    get_job_service,
+    list_jobs_service,
+    submit_job_service,
+)
+from services.memory_services import get_memory_report_service
+from services.request_validation import max_body_size
+from services.user_services import import_users_service, validate_token
+
+admin_bp = Blueprint("admin", __name__)
+
+
+def _authorize_admin():
+    """Return ``(user, None)`` for an admin token, else ``(None, error response)``."""
+    token = request.headers.get("Authorization")
+    if not token:
+        return None, (jsonify({"message": "Authorization token is required"}), 401)
+
+    user = validate_token(token)
+    if not user:
+        return None, (jsonify({"message": "Invalid or expired token"}), 401)
+
+    if user.role != "Admin":
+        return None, (jsonify({"message": "Forbidden. Admin access only."}), 403)
+
+    return user, None
+
+
+@admin_bp.route("/admin/audit", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Query recent admin actions (Admin only)",
+        "description": "Returns the most recent audit events from the in-memory buffer, newest first.",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "action",
+                "in": "query",
+                "type": "string",
+                "required": False,
+                "description": "Only return events for this action, e.g. delete_user",
+            },
+            {
+                "name": "actor",
+                "in": "query",
+                "type": "string",
+                "required": False,
+                "description": "Only return events performed by this admin email",
+            },
+            {
+                "name": "since",
+                "in": "query",
+                "type": "number",
+                "required": False,
+                "description": "Only return events at or after this Unix timestamp",
+            },
+            {
+                "name": "limit",
+                "in": "query",
+                "type": "integer",
+                "required": False,
+                "default": 100,
+                "description": "Maximum number of events to return (1-1000)",
+            },
+        ],
+        "responses": {
+            200: {"description": "Matching audit events"},
+            400: {"description": "Invalid limit"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+        },
+    }
+)
+def get_audit_events():
+    _, error = _authorize_admin()
+    if error:
+        return error
+
+    limit = request.args.get("limit", 100, type=int)
+    if limit < 1 or limit > 1000:
+        return jsonify({"message": "limit must be between 1 and 1000."}), 400
+
+    events = query_events(
+        action=request.args.get("action"),
+        actor=request.args.get("actor"),
+        since=request.args.get("since", type=float),
+        limit=limit,
+    )
+    return jsonify({"events": events}), 200
+
+
+@admin_bp.route("/admin/memory", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Report memory use of the in-memory stores (Admin only)",
+        "description": "Returns sampled deep-size estimates for the users, sessions and destinations stores and, on request, live model object counts and (when tracemalloc is running) the top allocation sites.",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "top",
+                "in": "query",
+                "type": "integer",
+                "required": False,
+                "default": 0,
+                "description": "Number of tracemalloc allocation sites to return (0-100)",
+            },
+            {
+                "name": "diff",
+                "in": "query",
+                "type": "boolean",
+                "required": False,
+                "description": "Report allocation growth since the previous diff request",
+            },
+            {
+                "name": "objects",
+                "in": "query",
+                "type": "boolean",
+                "required": False,
+                "description": "Count live model objects (scans every object the garbage collector tracks)",
+            },
+        ],
+        "responses": {
+            200: {"description": "Memory report"},
+            400: {"description": "Invalid top"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+        },
+    }
+)
+def get_memory_report():
+    _, error = _authorize_admin()
+    if error:
+        return error
+
+    result, status_code = get_memory_report_service(
+        top=request.args.get("top", 0, type=int),
+        diff=request.args.get("diff", "").lower() in ("1", "true"),
+        objects=request.args.get("objects", "").lower() in ("1", "true"),
+    )
+    return jsonify(result), status_code
+
+
+# Async view: the per-user password hashes are awaited concurrently. The spec
+# lives in the docstring because swag_from's sync wrapper would hide the
+# coroutine from Flask.
+@admin_bp.route("/admin/users/import", methods=["POST"])
+async def import_users():
+    """
+    Register many users in one request (Admin only).
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: body
+        in: body
+        required: true
+        description: A list of users, or an object with a "users" list
+        schema:
+          oneOf:
+            - type: array
+              items: &import_user
+                type: object
+                properties:
+                  name:
+                    type: string
+                  email:
+                    type: string
+                  password:
+                    type: string
+                  role:
+                    type: string
+            - type: object
+              required:
+                - users
+              properties:
+                users:
+                  type: array
+                  items: *import_user
+    responses:
+      200:
+        description: Per-user results, in input order
+      400:
+        description: Missing, empty or oversized user list
+      401:
+        description: Unauthorized access (Invalid or missing token)
+      403:
+        description: Forbidden access (Admin only)
+    """
+    admin, error = _authorize_admin()
+    if error:
+        return error
+
+    records = request.get_json(silent=True)
+    if isinstance(records, dict):
+        records = records.get("users")
+    result, status_code = await import_users_service(records, admin)
+    return jsonify(result), status_code
+
+
+@admin_bp.route("/admin/jobs", methods=["POST"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Run a bulk or maintenance task in the background (Admin only)",
+        "description": "Queues the job and returns at once; poll the Location header for progress. Job types: "
+        + ", ".join(JOB_TYPES)
+        + ".",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "body",
+                "in": "body",
+                "required": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "type": {"type": "string", "enum": list(JOB_TYPES)},
+                        "params": {
+                            "type": "object",
+                            "description": 'Job arguments, e.g. {"users": [...]} for import_users',
+                        },
+                    },
+                    "required": ["type"],
+                },
+            },
+        ],
+        "responses": {
+            202: {"description": "Job queued"},
+            400: {"description": "Unknown job type or invalid params"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+            503: {"description": "The job queue is full"},
+        },
+    }
+)
+def submit_job():
+    admin, error = _authorize_admin()
+    if error:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    result, status_code = submit_job_service(
+        data.get("type"), data.get("params"), admin
+    )
+    response = jsonify(result)
+    if status_code == 202:
+        response.headers["Location"] = url_for(
+            "admin.get_job", job_id=result["job"]["id"]
+        )
+    return response, status_code
+
+
+@admin_bp.route("/admin/jobs", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "List recent background jobs (Admin only)",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "limit",
+                "in": "query",
+                "type": "integer",
+                "required": False,
+                "default": 100,
+                "description": "Maximum number of jobs to return (1-1000)",
+            },
+        ],
+        "responses": {
+            200: {"description": "Jobs, newest first"},
+            400: {"description": "Invalid limit"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+        },
+    }
+)
+def list_jobs():
+    _, error = _authorize_admin()
+    if error:
+        return error
+
+    limit = request.args.get("limit", 100, type=int)
+    if limit < 1 or limit > 1000:
+        return jsonify({"message": "limit must be between 1 and 1000."}), 400
+
+    result, status_code = list_jobs_service(limit)
+    return jsonify(result), status_code
+
+
+@admin_bp.route("/admin/jobs/<job_id>", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Get the status and progress of a background job (Admin only)",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "job_id",
+                "in": "path",
+                "type": "string",
+                "required": True,
+                "description": "ID returned when the job was submitted",
+            },
+        ],
+        "responses": {
+            200: {"description": "Job status, progress and, once finished, its result"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+            404: {"description": "Job not found"},
+        },
+    }
+)
+def get_job(job_id):
+    _, error = _authorize_admin()
+    if error:
+        return error
+
+    result, status_code = get_job_service(job_id)
+    return jsonify(result), status_code
+
+
+@admin_bp.route("/admin/jobs/<job_id>", methods=["DELETE"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Cancel a background job (Admin only)",
+        "description": "A queued job is cancelled at once; a running job stops at its next progress report.",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "job_id",
+                "in": "path",
+                "type": "string",
+                "required": True,
+                "description": "ID returned when the job was submitted",
+            },
+        ],
+        "responses": {
+            202: {"description": "Cancellation requested"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+            404: {"description": "Job not found"},
+            409: {"description": "The job has already finished"},
+        },
+    }
+)
+def cancel_job(job_id):
+    admin, error = _authorize_admin()
+    if error:
+        return error
+
+    result, status_code = cancel_job_service(job_id, admin)
+    return jsonify(result), status_code
+
+
+@admin_bp.route("/admin/export/<dataset>", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Stream an export of users or destinations (Admin only)",
+        "description": "Streams CSV or NDJSON with chunked transfer, so memory use does not grow with the dataset. Rows come from a snapshot taken when the request starts.",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "dataset",
+                "in": "path",
+                "type": "string",
+                "enum": ["users", "destinations"],
+                "required": True,
+                "description": "What to export",
+            },
+            {
+                "name": "format",
+                "in": "query",
+                "type": "string",
+                "enum": list(EXPORT_FORMATS),
+                "required": False,
+                "default": "csv",
+                "description": "csv (with a header row) or ndjson (one JSON object per line)",
+            },
+        ],
+        "produces": list(EXPORT_FORMATS.values()),
+        "responses": {
+            200: {"description": "The export, streamed"},
+            400: {"description": "Unknown format"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+            404: {"description": "Unknown dataset"},
+        },
+    }
+)
+def export_dataset(dataset):
+    admin, error = _authorize_admin()
+    if error:
+        return error
+
+    export_format = request.args.get("format", "csv")
+    result, status_code = export_service(dataset, export_format, admin)
+    if status_code != 200:
+        return jsonify(result), status_code
+
+    response = Response(result, mimetype=EXPORT_FORMATS[export_format])
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename={dataset}.{export_format}"
+    )
+    return response
+
+
+@admin_bp.route("/admin/destinations/bulk", methods=["POST"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Create, update and delete many destinations at once (Admin only)",
+        "description": 'Applies every operation in one atomic write, or none of them if any is invalid. Send a JSON array, an object with an "operations" array, or NDJSON (Content-Type: application/x-ndjson) with one operation per line. Each operation has an "op" of create (the default), update or delete; update and delete take an "id".',
+        "consumes": ["application/json", "application/x-ndjson"],
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "body",
+                "in": "body",
+                "required": True,
+                "description": "The operations to apply, in order",
+                "schema": {
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "op": {
+                                "type": "string",
+                                "enum": ["create", "update", "delete"],
+                            },
+                            "id": {
+                                "description": "Destination ID, for update and delete"
+                            },
+                            "name": {"type": "string"},
+                            "description": {"type": "string"},
+                            "location": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        ],
+        "responses": {
+            200: {"description": "All operations applied; per-operation results"},
+            400: {
+                "description": "Invalid body or operations; nothing was applied. Per-operation results show which failed"
+            },
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+            413: {"description": "Body larger than BULK_MAX_CONTENT_LENGTH"},
+        },
+    }
+)
+@max_body_size("BULK_MAX_CONTENT_LENGTH")
+def bulk_destinations():
+    admin, error = _authorize_admin()
+    if error:
+        return error
+
+    if request.mimetype == "application/x-ndjson":
+        operations = []
+        lines = request.get_data().splitlines()
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                operations.append(current_app.json.loads(line))
+            except ValueError:
+                message = f"Line {line_number} is not valid JSON."
+                return jsonify({"message": message}), 400
+    else:
+        operations = request.get_json(silent=True)
+        if isinstance(operations, dict):
+            operations = operations.get("operations")
+
+    result, status_code = bulk_destinations_service(operations, admin)
+    return jsonify(result), status_code
+
+
+@admin_bp.route("/admin/destinations/stats", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Admin"],
+        "summary": "Count destinations per location or per admin (Admin only)",
+        "description": "Groups are ordered largest first. Vectorized over the columnar store when COLUMNAR_STORE_ENABLED is set.",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "by",
+                "in": "query",
+                "type": "string",
+                "enum": list(GROUP_FIELDS),
+                "required": False,
+                "default": "location",
+                "description": "Field to group by",
+            },
+            {
+                "name": "location",
+                "in": "query",
+                "type": "string",
+                "required": False,
+                "description": "Only count destinations with this location",
+            },
+            {
+                "name": "admin_email",
+                "in": "query",
+                "type": "string",
+                "required": False,
+                "description": "Only count destinations created by this admin",
+            },
+        ],
+        "responses": {
+            200: {"description": "Destination counts per group"},
+            400: {"description": "Unknown by field"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            403: {"description": "Forbidden access (Admin only)"},
+        },
+    }
+)
+def get_destination_stats():
+    _, error = _authorize_admin()
+    if error:
+        return error
+
+    result, status_code = destination_stats_service(
+        request.args.get("by", "location"),
+        location=request.args.get("location"),
+        admin_email=request.args.get("admin_email"),
+    )
+    return jsonify(result), status_code
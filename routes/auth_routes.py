@@ -7,11 +7,12 @@ from services.user_services import (
     delete_user_service,
 )
 from flasgger import Swagger, swag_from
+from services.idempotency import idempotent
+from services.request_validation import empty_body_message
 import uuid
 from services.user_services import users, active_sessions, validate_token
 from models.user import User
 
-
 auth_bp = Blueprint("auth", __name__)
 
 
@@ -21,12 +22,20 @@ def bad_request_error(error):
 
 
 @auth_bp.route("/register", methods=["POST"])
+@idempotent
 @swag_from(
     {
         "tags": ["Authentication"],
         "summary": "Register a new user",
         "description": "Allows new users to register by providing their name, email, password, and an optional role.",
         "parameters": [
+            {
+                "name": "Idempotency-Key",
+                "in": "header",
+                "type": "string",
+                "required": False,
+                "description": "Unique key for safely retrying this request",
+            },
             {
                 "name": "body",
                 "in": "body",
@@ -41,7 +50,7 @@ def bad_request_error(error):
                     },
                     "required": ["name", "email", "password"],
                 },
-            }
+            },
         ],
         "responses": {
             "201": {
@@ -81,12 +90,20 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@idempotent
 @swag_from(
     {
         "tags": ["Authentication"],
         "summary": "User Login",
         "description": "Allows a registered user to log in by providing their email and password. Returns an authentication token upon successful login.",
         "parameters": [
+            {
+                "name": "Idempotency-Key",
+                "in": "header",
+                "type": "string",
+                "required": False,
+                "description": "Unique key for safely retrying this request",
+            },
             {
                 "name": "body",
                 "in": "body",
@@ -99,7 +116,7 @@ def register():
                     },
                     "required": ["email", "password"],
                 },
-            }
+            },
         ],
         "responses": {
             "200": {
@@ -125,6 +142,7 @@ def register():
         },
     }
 )
+@empty_body_message("Bad Request, JSON data is missing")
 def login():
     """
     User login to authenticate and get an auth token.
@@ -1,23 +1,37 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from services.destination_services import (
     add_destination_service,
     get_all_destinations_service,
     get_destination_by_id_service,
+    get_destinations_batch_service,
     update_destination_service,
+    patch_destination_service,
     delete_destination_service,
 )
 from services.user_services import get_user_by_email, validate_token
+from services.compression import json_response
+from services.columnar_services import filter_destinations_service
+from services.event_stream import broker, stream_events
+from services.idempotency import idempotent
+from services.popularity_services import get_trending_service, record_view
+from services.similarity_services import get_similar_destinations_service
+from services.availability_services import (
+    find_available_destinations_service,
+    get_availability_service,
+    set_availability_service,
+)
 from flasgger import swag_from
 
 destination_bp = Blueprint("destinations", __name__)
 
 
 @destination_bp.route("/destinations", methods=["POST"])
+@idempotent
 @swag_from(
     {
         "tags": ["Destinations"],  # Group under 'Destinations' in Swagger
         "summary": "Add a new destination (Admin only)",
-        "description": "Admins can add new destinations by providing details such as name, description, location, and price.",
+        "description": "Admins can add new destinations by providing details such as name, description, and location.",
         "parameters": [
             {
                 "name": "Authorization",
@@ -26,13 +40,20 @@ destination_bp = Blueprint("destinations", __name__)
                 "required": True,
                 "description": "Bearer token for authentication",
             },
+            {
+                "name": "Idempotency-Key",
+                "in": "header",
+                "type": "string",
+                "required": False,
+                "description": "Unique key for safely retrying this request",
+            },
             {
                 "in": "body",
                 "name": "body",
                 "required": True,
                 "schema": {
                     "type": "object",
-                    "required": ["name", "description", "location", "price"],
+                    "required": ["name", "description", "location"],
                     "properties": {
                         "name": {
                             "type": "string",
@@ -91,8 +112,11 @@ def add_destination():
     if user.role != "Admin":
         return jsonify({"message": "Forbidden. Only admins can add destinations."}), 403
 
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "Invalid request. JSON data is missing"}), 400
+
     # Call the service function
-    data = request.get_json()
     result, status_code = add_destination_service(data, user)
     return jsonify(result), status_code
 
@@ -110,6 +134,16 @@ def get_all_destinations():
         type: string
         required: true
         description: Bearer token for authentication
+      - name: location
+        in: query
+        type: string
+        required: false
+        description: Only return destinations with exactly this location
+      - name: admin_email
+        in: query
+        type: string
+        required: false
+        description: Only return destinations created by this admin (Admin only)
     responses:
       200:
         description: A list of destinations
@@ -137,6 +171,8 @@ def get_all_destinations():
                     description: Price of the destination
       401:
         description: Unauthorized access (Invalid or missing token)
+      403:
+        description: admin_email filter used by a non-admin
     """
     token = request.headers.get("Authorization")
     if not token:
@@ -147,9 +183,17 @@ def get_all_destinations():
     if not user_email:
         return jsonify({"message": "Invalid or expired token"}), 401
 
+    location = request.args.get("location")
+    admin_email = request.args.get("admin_email")
+    if admin_email is not None and user_email.role != "Admin":
+        return jsonify({"message": "Forbidden. Admin access only."}), 403
+    if location is not None or admin_email is not None:
+        result, status_code = filter_destinations_service(location, admin_email)
+        return json_response(result, status_code)
+
     # Call the service to get all destinations
     result, status_code = get_all_destinations_service()
-    return jsonify(result), status_code
+    return json_response(result, status_code)
 
 
 @destination_bp.route("/destinations/<string:destination_id>", methods=["GET"])
@@ -209,6 +253,412 @@ def get_destination_by_id(destination_id):
 
     # Extract destination ID from the URL path
     result, status_code = get_destination_by_id_service(destination_id)
+    if status_code == 200:
+        record_view(destination_id)
+    return jsonify(result), status_code
+
+
+@destination_bp.route("/destinations/batch", methods=["GET"])
+def get_destinations_batch():
+    """
+    Get many destinations by ID in one request (Logged-in users only).
+    ---
+    tags:
+      - Destinations
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: ids
+        in: query
+        type: string
+        required: true
+        description: Comma-separated destination IDs (use POST for long lists)
+    responses:
+      200:
+        description: The destinations found, in request order, and the IDs that were not
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                destinations:
+                  type: array
+                  items:
+                    type: object
+                missing:
+                  type: array
+                  items:
+                    type: string
+      400:
+        description: Missing ids or too many ids
+      401:
+        description: Unauthorized access (Invalid or missing token)
+    """
+    ids = [value for value in request.args.get("ids", "").split(",") if value]
+    return _destinations_batch(ids)
+
+
+@destination_bp.route("/destinations/batch", methods=["POST"])
+def post_destinations_batch():
+    """
+    Get many destinations by ID, with the IDs in the body (Logged-in users only).
+    ---
+    tags:
+      - Destinations
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids:
+              type: array
+              description: Destination IDs to fetch
+          required:
+            - ids
+    responses:
+      200:
+        description: The destinations found, in request order, and the IDs that were not
+      400:
+        description: Missing, invalid or too many ids
+      401:
+        description: Unauthorized access (Invalid or missing token)
+    """
+    data = request.get_json(silent=True) or {}
+    return _destinations_batch(data.get("ids"))
+
+
+def _destinations_batch(ids):
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    if not validate_token(token):
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    result, status_code = get_destinations_batch_service(ids)
+    return jsonify(result), status_code
+
+
+@destination_bp.route("/destinations/events", methods=["GET"])
+def stream_destination_events():
+    """
+    Stream catalog changes as server-sent events (Logged-in users only).
+    ---
+    tags:
+      - Destinations
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: Last-Event-ID
+        in: header
+        type: integer
+        required: false
+        description: Replay buffered events after this id when reconnecting
+    responses:
+      200:
+        description: >
+          A text/event-stream of destination.added, destination.updated and
+          destination.removed events carrying the destination id
+      401:
+        description: Unauthorized access (Invalid or missing token)
+      503:
+        description: Too many open event streams
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    if not validate_token(token):
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    subscriber = broker.subscribe(request.headers.get("Last-Event-ID", type=int))
+    if subscriber is None:
+        return jsonify({"message": "Too many open event streams."}), 503
+
+    heartbeat = current_app.config.get("EVENT_STREAM_HEARTBEAT", 15)
+    response = Response(
+        stream_events(subscriber, heartbeat), mimetype="text/event-stream"
+    )
+    # An unstarted generator never runs its cleanup, so unsubscribe on close
+    response.call_on_close(lambda: broker.unsubscribe(subscriber))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@destination_bp.route("/destinations/trending", methods=["GET"])
+def get_trending_destinations():
+    """
+    Get the most viewed destinations (Logged-in users only).
+    ---
+    tags:
+      - Destinations
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: k
+        in: query
+        type: integer
+        required: false
+        default: 10
+        description: Number of destinations to return (1-100)
+    responses:
+      200:
+        description: Destinations ordered by time-decayed view count
+        content:
+          application/json:
+            schema:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                  name:
+                    type: string
+                  description:
+                    type: string
+                  location:
+                    type: string
+                  score:
+                    type: number
+                    description: View count with older views decayed
+      400:
+        description: Invalid k
+      401:
+        description: Unauthorized access (Invalid or missing token)
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    if not validate_token(token):
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    k = request.args.get("k", 10, type=int)
+    result, status_code = get_trending_service(k)
+    return jsonify(result), status_code
+
+
+@destination_bp.route("/destinations/<string:destination_id>/similar", methods=["GET"])
+def get_similar_destinations(destination_id):
+    """
+    Get the destinations most similar to a given one (Logged-in users only).
+    ---
+    tags:
+      - Destinations
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: destination_id
+        in: path
+        type: string
+        required: true
+        description: ID of the destination to compare against
+      - name: k
+        in: query
+        type: integer
+        required: false
+        default: 5
+        description: Number of destinations to return (1-50)
+    responses:
+      200:
+        description: Destinations ordered by TF-IDF cosine similarity of their name, description and location
+      400:
+        description: Invalid k
+      401:
+        description: Unauthorized access (Invalid or missing token)
+      404:
+        description: Destination not found
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    if not validate_token(token):
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    k = request.args.get("k", 5, type=int)
+    result, status_code = get_similar_destinations_service(destination_id, k)
+    return jsonify(result), status_code
+
+
+@destination_bp.route("/destinations/available", methods=["GET"])
+def get_available_destinations():
+    """
+    Find destinations open on all of the given dates (Logged-in users only).
+    ---
+    tags:
+      - Availability
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: dates
+        in: query
+        type: string
+        required: true
+        description: Comma-separated dates in YYYY-MM-DD format
+    responses:
+      200:
+        description: Destinations open on every requested date
+      400:
+        description: Missing or invalid dates
+      401:
+        description: Unauthorized access (Invalid or missing token)
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    if not validate_token(token):
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    dates = [value for value in request.args.get("dates", "").split(",") if value]
+    result, status_code = find_available_destinations_service(dates)
+    return jsonify(result), status_code
+
+
+@destination_bp.route(
+    "/destinations/<string:destination_id>/availability", methods=["GET"]
+)
+def get_destination_availability(destination_id):
+    """
+    Get the open dates of a destination (Logged-in users only).
+    ---
+    tags:
+      - Availability
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: destination_id
+        in: path
+        type: string
+        required: true
+        description: ID of the destination
+      - name: from
+        in: query
+        type: string
+        required: true
+        description: First date of the range (YYYY-MM-DD)
+      - name: to
+        in: query
+        type: string
+        required: true
+        description: Last date of the range, inclusive (YYYY-MM-DD)
+    responses:
+      200:
+        description: Open dates within the range
+      400:
+        description: Invalid date range
+      401:
+        description: Unauthorized access (Invalid or missing token)
+      404:
+        description: Destination not found
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    if not validate_token(token):
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    result, status_code = get_availability_service(
+        destination_id, request.args.get("from"), request.args.get("to")
+    )
+    return jsonify(result), status_code
+
+
+@destination_bp.route(
+    "/destinations/<string:destination_id>/availability", methods=["POST"]
+)
+def set_destination_availability(destination_id):
+    """
+    Open or close a date range for a destination (Admin only).
+    ---
+    tags:
+      - Availability
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: destination_id
+        in: path
+        type: string
+        required: true
+        description: ID of the destination
+      - in: body
+        name: range
+        schema:
+          type: object
+          required:
+            - from
+            - to
+            - open
+          properties:
+            from:
+              type: string
+              description: First date of the range (YYYY-MM-DD)
+            to:
+              type: string
+              description: Last date of the range, inclusive (YYYY-MM-DD)
+            open:
+              type: boolean
+              description: true to open the dates, false to close them
+    responses:
+      200:
+        description: Availability updated successfully
+      400:
+        description: Invalid date range
+      401:
+        description: Unauthorized access (Invalid or missing token)
+      403:
+        description: Forbidden access (Not an Admin)
+      404:
+        description: Destination not found
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    user = validate_token(token)
+    if not user:
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    if user.role != "Admin":
+        return (
+            jsonify({"message": "Forbidden. Only admins can change availability."}),
+            403,
+        )
+
+    data = request.get_json(silent=True) or {}
+    result, status_code = set_availability_service(destination_id, data, user)
     return jsonify(result), status_code
 
 
@@ -234,6 +684,7 @@ def update_destination_by_id(destination_id):
         name: destination
         schema:
           type: object
+          minProperties: 1
           properties:
             name:
               type: string
@@ -273,8 +724,78 @@ def update_destination_by_id(destination_id):
         )
 
     # Get the updated data from the request body
-    data = request.get_json()
-    result, status_code = update_destination_service(destination_id, data)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "Invalid request. JSON data is missing"}), 400
+
+    result, status_code = update_destination_service(destination_id, data, user_email)
+    return jsonify(result), status_code
+
+
+@destination_bp.route("/destinations/<string:destination_id>", methods=["PATCH"])
+def patch_destination_by_id(destination_id):
+    """
+    Partially update a destination with a JSON merge patch (Admin only).
+    ---
+    tags:
+      - Destinations
+    consumes:
+      - application/merge-patch+json
+      - application/json
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer token for authentication
+      - name: destination_id
+        in: path
+        type: string
+        required: true
+        description: ID of the destination to patch
+      - in: body
+        name: patch
+        description: RFC 7396 merge patch; only the fields to change are sent
+        schema:
+          type: object
+          properties:
+            name:
+              type: string
+            description:
+              type: string
+            location:
+              type: string
+    responses:
+      200:
+        description: Patch applied; lists the fields that actually changed
+      400:
+        description: Invalid merge patch
+      401:
+        description: Unauthorized access (Invalid or missing token)
+      403:
+        description: Forbidden access (Not an Admin)
+      404:
+        description: Destination not found
+    """
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    user = validate_token(token)
+    if not user:
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    if user.role != "Admin":
+        return (
+            jsonify({"message": "Forbidden. Only admins can update destinations."}),
+            403,
+        )
+
+    patch = request.get_json(silent=True)
+    if patch is None:
+        return jsonify({"message": "Merge patch body is required"}), 400
+
+    result, status_code = patch_destination_service(destination_id, patch, user)
     return jsonify(result), status_code
 
 
@@ -325,5 +846,5 @@ def delete_destination_by_id(destination_id):
     destination_id = request.view_args["destination_id"]
 
     # Call the service function
-    result, status_code = delete_destination_service(destination_id)
+    result, status_code = delete_destination_service(destination_id, user_email)
     return jsonify(result), status_code
@@ -2,9 +2,16 @@ from flask import Blueprint, jsonify, request
 from services.user_services import (
     get_user_profile,
     update_user_profile,
+    patch_user_profile,
     delete_user_profile,
 )
 from services.user_services import validate_token, active_sessions, users
+from services.favorite_services import (
+    add_favorite_service,
+    remove_favorite_service,
+    get_favorites_service,
+)
+from services.json_provider import RawJSON
 from flasgger import swag_from  # Make sure to import swag_from for Swagger doc
 
 profile_bp = Blueprint("profile", __name__)
@@ -53,8 +60,7 @@ def view_profile():
         return jsonify({"message": "Invalid or expired token"}), 401
 
     # Return full user profile
-    profile_data = {"name": user.name, "email": user.email, "role": user.role}
-    return jsonify(profile_data), 200
+    return jsonify(RawJSON(user.to_json())), 200
 
 
 @profile_bp.route("/profile", methods=["PUT"])
@@ -166,7 +172,7 @@ def update_profile():
       404:
         description: User not found
     """
-    data = request.get_json()
+    data = request.get_json(silent=True)
     token = request.headers.get("Authorization")
 
     if not token:
@@ -181,6 +187,9 @@ def update_profile():
     if not user:
         return jsonify({"message": "Invalid or expired token"}), 401
 
+    if not isinstance(data, dict):
+        return jsonify({"message": "Invalid request. JSON data is missing"}), 400
+
     # Get user email from the validated user
     user_email = user.email
 
@@ -192,6 +201,80 @@ def update_profile():
     return jsonify(result), status_code
 
 
+@profile_bp.route("/profile", methods=["PATCH"])
+@swag_from(
+    {
+        "tags": ["Profile"],
+        "summary": "Partially update logged-in user profile",
+        "description": "Applies an RFC 7396 JSON merge patch to the profile. Only the fields that change are written. Changing the password requires both `password` and `new_password`.",
+        "consumes": ["application/merge-patch+json", "application/json"],
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "body",
+                "in": "body",
+                "required": True,
+                "description": "Merge patch with the fields to change",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "password": {
+                            "type": "string",
+                            "description": "Current password (needed for a password change)",
+                        },
+                        "new_password": {"type": "string"},
+                    },
+                },
+            },
+        ],
+        "responses": {
+            200: {
+                "description": "Patch applied; lists the fields that actually changed",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "email": {"type": "string"},
+                                "changed": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                },
+                            },
+                        }
+                    }
+                },
+            },
+            400: {"description": "Invalid merge patch"},
+            401: {"description": "Unauthorized access (Invalid token or password)"},
+            404: {"description": "User not found"},
+        },
+    }
+)
+def patch_profile():
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    user = validate_token(token)
+    if not user:
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    patch = request.get_json(silent=True)
+    if patch is None:
+        return jsonify({"message": "Merge patch body is required"}), 400
+
+    result, status_code = patch_user_profile(user.email, patch)
+    return jsonify(result), status_code
+
+
 @profile_bp.route("/profile", methods=["DELETE"])
 @swag_from(
     {
@@ -268,3 +351,143 @@ def delete_profile():
 
     result, status_code = delete_user_profile(user_email)
     return jsonify(result), status_code
+
+
+@profile_bp.route("/profile/favorites", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["Profile"],
+        "summary": "List the logged-in user's favorite destinations",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            }
+        ],
+        "responses": {
+            200: {
+                "description": "Favorite destinations",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "favorites": {
+                                    "type": "array",
+                                    "items": {"type": "object"},
+                                }
+                            },
+                        }
+                    }
+                },
+            },
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+        },
+    }
+)
+def list_favorites():
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    user = validate_token(token)
+    if not user:
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    result, status_code = get_favorites_service(user)
+    return jsonify(result), status_code
+
+
+@profile_bp.route("/profile/favorites", methods=["POST"])
+@swag_from(
+    {
+        "tags": ["Profile"],
+        "summary": "Add a destination to the logged-in user's favorites",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "body",
+                "in": "body",
+                "required": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {"destination_id": {"type": "string"}},
+                    "required": ["destination_id"],
+                },
+            },
+        ],
+        "responses": {
+            201: {"description": "Favorite added"},
+            200: {"description": "Destination was already a favorite"},
+            400: {"description": "destination_id is missing"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            404: {"description": "Destination not found"},
+        },
+    }
+)
+def add_favorite():
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    user = validate_token(token)
+    if not user:
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    data = request.get_json(silent=True) or {}
+    destination_id = data.get("destination_id")
+    if destination_id is None:
+        return jsonify({"message": "destination_id is required"}), 400
+
+    result, status_code = add_favorite_service(user, destination_id)
+    return jsonify(result), status_code
+
+
+@profile_bp.route("/profile/favorites/<string:destination_id>", methods=["DELETE"])
+@swag_from(
+    {
+        "tags": ["Profile"],
+        "summary": "Remove a destination from the logged-in user's favorites",
+        "parameters": [
+            {
+                "name": "Authorization",
+                "in": "header",
+                "type": "string",
+                "required": True,
+                "description": "Bearer token for authentication",
+            },
+            {
+                "name": "destination_id",
+                "in": "path",
+                "type": "string",
+                "required": True,
+                "description": "ID of the destination to remove",
+            },
+        ],
+        "responses": {
+            200: {"description": "Favorite removed"},
+            401: {"description": "Unauthorized access (Invalid or missing token)"},
+            404: {"description": "Favorite not found"},
+        },
+    }
+)
+def remove_favorite(destination_id):
+    token = request.headers.get("Authorization")
+    if not token:
+        return jsonify({"message": "Authorization token is required"}), 401
+
+    user = validate_token(token)
+    if not user:
+        return jsonify({"message": "Invalid or expired token"}), 401
+
+    result, status_code = remove_favorite_service(user, destination_id)
+    return jsonify(result), status_code
@@ -0,0 +1,269 @@
+"""
+Pre-forking production server for the travel API.
+
+    python serve.py --bind 0.0.0.0:8000 --workers 4 --threads 8
+
+The master process calls ``create_app`` (which preloads the seed users) and
+any ``--preload module:function`` hook once, then forks the workers, so the
+loaded data is shared copy-on-write instead of being rebuilt per worker.
+Each worker serves connections on a fixed pool of ``--threads`` threads and
+is replaced after ``--max-requests`` requests.
+
+Signals sent to the master:
+    SIGHUP           fork a fresh set of workers, then gracefully stop the old ones
+    SIGTERM, SIGINT  gracefully stop every worker and exit
+
+Users, sessions and destinations live in process memory. After the fork
+every worker owns a private copy, so a login, registration or catalog
+write handled by one worker is invisible to the others and is lost when
+that worker is recycled. Until the stores move to a shared backend, run
+more than one worker only for read-mostly traffic over preloaded data.
+"""
+
+import argparse
+import gc
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from app import create_app
+from services.audit_log import stop_audit_writer
+from services.tracing import stop_trace_exporter
+
+# Seconds an idle keep-alive connection may hold a pool thread
+KEEPALIVE_TIMEOUT = 5
+# Seconds stopping workers get to finish in-flight requests before SIGKILL
+GRACEFUL_TIMEOUT = 30
+# How often the master checks on its workers (seconds)
+MASTER_POLL_INTERVAL = 0.5
+
+
+class PooledRequestHandler(WSGIRequestHandler):
+    timeout = KEEPALIVE_TIMEOUT
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        # Release keep-alive connections once the worker starts draining
+        if self.server.draining:
+            self.close_connection = True
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI server handling connections on a fixed-size thread pool.
+
+    Unlike werkzeug's threaded server, which starts a thread per
+    connection, concurrency per worker is bounded by ``threads``. After
+    ``max_requests`` requests (0 = unlimited) the server stops accepting
+    and lets in-flight requests finish.
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, fd, threads, max_requests=0):
+        super().__init__(
+            host, port, self._counting(app), handler=PooledRequestHandler, fd=fd
+        )
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix="request")
+        self.max_requests = max_requests
+        self.requests = 0
+        self.draining = False
+        self._lock = threading.Lock()
+
+    def _counting(self, app):
+        def counted_app(environ, start_response):
+            with self._lock:
+                self.requests += 1
+                recycle = self.max_requests and self.requests >= self.max_requests
+            if recycle:
+                self.stop()
+            return app(environ, start_response)
+
+        return counted_app
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def stop(self):
+        """Stop accepting connections; safe to call from any thread or signal."""
+        with self._lock:
+            if self.draining:
+                return
+            self.draining = True
+        # shutdown() blocks until serve_forever() returns, so it can't run on
+        # the thread (or in the signal handler) that is serving.
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def run_worker(app, listener, threads, max_requests):
+    """Serve requests in a forked worker until stopped or recycled, then exit."""
+    host, port = listener.getsockname()[:2]
+    server = PooledWSGIServer(host, port, app, listener.fileno(), threads, max_requests)
+    signal.signal(signal.SIGTERM, lambda *_: server.stop())
+    signal.signal(signal.SIGINT, lambda *_: server.stop())
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    exit_code = 0
+    try:
+        server.serve_forever(poll_interval=0.5)
+        server.pool.shutdown(wait=True)
+    except BaseException:
+        exit_code = 1
+    finally:
+        # os._exit skips atexit, so write out queued audit events and traces
+        stop_audit_writer()
+        stop_trace_exporter()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Skip atexit handlers and finalizers inherited from the master
+        os._exit(exit_code)
+
+
+class Master:
+    """Fork, watch and replace the worker processes."""
+
+    def __init__(self, app, listener, args):
+        self.app = app
+        self.listener = listener
+        self.args = args
+        self.generation = 0
+        self.workers = {}  # pid -> generation
+        self.stopping = False
+        self.stop_deadline = None
+        self.signals = []
+
+    def run(self):
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, _: self.signals.append(signum))
+        print(
+            f"Serving on {self.args.bind} with {self.args.workers} workers "
+            f"x {self.args.threads} threads (master pid {os.getpid()})"
+        )
+        while not (self.stopping and not self.workers):
+            self.reap()
+            while self.signals:
+                self.handle_signal(self.signals.pop(0))
+            if self.stopping:
+                self.force_stop_if_overdue()
+            else:
+                self.spawn_missing()
+            time.sleep(MASTER_POLL_INTERVAL)
+
+    def handle_signal(self, signum):
+        if signum == signal.SIGHUP and not self.stopping:
+            print("SIGHUP: restarting workers")
+            old = [pid for pid, gen in self.workers.items() if gen == self.generation]
+            self.generation += 1
+            self.spawn_missing()
+            self.kill(old, signal.SIGTERM)
+        elif signum in (signal.SIGTERM, signal.SIGINT) and not self.stopping:
+            print("Shutting down workers")
+            self.stopping = True
+            self.stop_deadline = time.monotonic() + GRACEFUL_TIMEOUT
+            self.kill(list(self.workers), signal.SIGTERM)
+
+    def spawn_missing(self):
+        current = sum(1 for gen in self.workers.values() if gen == self.generation)
+        for _ in range(self.args.workers - current):
+            self.spawn()
+
+    def spawn(self):
+        max_requests = self.args.max_requests
+        if max_requests and self.args.max_requests_jitter:
+            # Spread out recycling so the workers don't all restart at once
+            max_requests += random.randint(0, self.args.max_requests_jitter)
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.app, self.listener, self.args.threads, max_requests)
+        self.workers[pid] = self.generation
+
+    def reap(self):
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            self.workers.pop(pid, None)
+
+    def kill(self, pids, signum):
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+    def force_stop_if_overdue(self):
+        if self.workers and time.monotonic() > self.stop_deadline:
+            self.kill(list(self.workers), signal.SIGKILL)
+
+
+def _load_preload_hook(spec):
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name or "preload")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forking travel API server.")
+    parser.add_argument("--bind", default="127.0.0.1:8000", help="HOST:PORT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=8, help="Threads per worker")
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=0,
+        help="Recycle a worker after this many requests (0 = never)",
+    )
+    parser.add_argument("--max-requests-jitter", type=int, default=0)
+    parser.add_argument(
+        "--preload",
+        help="module:function called with the app before forking, e.g. to load data",
+    )
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    if not args.access_log:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    host, _, port = args.bind.rpartition(":")
+    listener = socket.create_server((host or "0.0.0.0", int(port)), backlog=2048)
+    listener.set_inheritable(True)
+
+    app = create_app()
+    if args.preload:
+        _load_preload_hook(args.preload)(app)
+    if args.workers > 1:
+        print(
+            "Warning: every worker keeps its own copy of users, sessions and "
+            "destinations; writes on one worker are not seen by the others."
+        )
+
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers don't write to (and so copy) the shared pages.
+    gc.collect()
+    gc.freeze()
+
+    Master(app, listener, args).run()
+
+
+if __name__ == "__main__":
+    main()
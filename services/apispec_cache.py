@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+
+import click
+from flask import request
+from flasgger import Swagger
+
+from services.compression import PrecompressedBody, json_response
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ("0", "false", "no", "off")
+
+
+class CachedApiSpec:
+    """
+    The generated apispec JSON, encoded once and served with an ETag.
+
+    Flasgger rebuilds the JSON on every request by walking all ``swag_from``
+    dicts and YAML docstrings. This keeps the encoded bytes instead, loaded
+    from APISPEC_FILE when one was dumped at build time or generated on the
+    first request otherwise. Compressed variants are cached alongside, and
+    each content coding gets its own ETag.
+    """
+
+    def __init__(self, swagger, path=None):
+        self.swagger = swagger
+        self.path = path
+        self.body = None
+        self.etag = None
+
+    def load(self):
+        if self.body is None:
+            if self.path and os.path.exists(self.path):
+                with open(self.path, "rb") as spec_file:
+                    body = spec_file.read()
+            else:
+                body = self.generate()
+            self.body = PrecompressedBody(body)
+            self.etag = hashlib.sha256(body).hexdigest()[:32]
+        return self.body
+
+    def generate(self):
+        # Some responses are keyed by int status codes, which the sorting
+        # jsonify provider cannot mix with string keys
+        return json.dumps(self.swagger.get_apispecs()).encode("utf-8")
+
+    def view(self):
+        response = json_response(self.load())
+        encoding = response.headers.get("Content-Encoding")
+        response.set_etag(f"{self.etag}-{encoding}" if encoding else self.etag)
+        response.headers["Cache-Control"] = "public, max-age=300"
+        return response.make_conditional(request)
+
+
+def init_swagger(app):
+    """
+    Set up the Swagger UI and a cached /apispec_1.json.
+
+    SWAGGER_ENABLED=0 skips flasgger entirely so production workers start
+    faster. APISPEC_FILE points at a spec dumped with ``flask dump-apispec``.
+    """
+    app.config.setdefault("SWAGGER_ENABLED", _env_flag("SWAGGER_ENABLED", True))
+    app.config.setdefault("APISPEC_FILE", os.environ.get("APISPEC_FILE"))
+    if not app.config["SWAGGER_ENABLED"]:
+        return None
+
+    swagger = Swagger(app)
+    spec = CachedApiSpec(swagger, app.config["APISPEC_FILE"])
+    app.view_functions[f"flasgger.{Swagger.DEFAULT_ENDPOINT}"] = spec.view
+    app.extensions["apispec_cache"] = spec
+
+    @app.cli.command("dump-apispec")
+    @click.argument("path")
+    def dump_apispec(path):
+        """Write the generated apispec JSON to PATH for use as APISPEC_FILE."""
+        with open(path, "wb") as spec_file:
+            spec_file.write(spec.generate())
+        click.echo(f"Wrote apispec to {path}")
+
+    return swagger
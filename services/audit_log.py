@@ -0,0 +1,129 @@
+import os
+import time
+from collections import deque
+
+from services.background import JsonLinesWriter, after_fork_in_child
+
+# Most recent events kept in memory for GET /admin/audit
+BUFFER_SIZE = 10000
+
+_buffer = deque(maxlen=BUFFER_SIZE)
+_writer = None
+
+
+def record_event(action, actor, target, **details):
+    """
+    Record an admin action.
+
+    Only appends to in-memory structures; the file is written by a
+    background thread, so no I/O happens on the request path.
+    """
+    event = {
+        "timestamp": time.time(),
+        "action": action,
+        "actor": actor,
+        "target": target,
+    }
+    if details:
+        event["details"] = details
+    _buffer.append(event)
+    if _writer is not None:
+        _writer.pending.put(event)
+    return event
+
+
+def query_events(action=None, actor=None, since=None, limit=100):
+    """Return the most recent buffered events matching the filters, newest first."""
+    matches = []
+    for event in reversed(list(_buffer)):
+        if since is not None and event["timestamp"] < since:
+            break
+        if action and event["action"] != action:
+            continue
+        if actor and event["actor"] != actor:
+            continue
+        matches.append(event)
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def clear_events():
+    _buffer.clear()
+
+
+class AuditFileWriter(JsonLinesWriter):
+    """
+    Background writer appending audit events to a JSON-lines file.
+
+    The file is rotated to ``path.1`` .. ``path.<backup_count>`` once it
+    grows past ``max_bytes``.
+    """
+
+    description = "audit log"
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        super().__init__(path, name="audit-log-writer")
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def clone(self):
+        return AuditFileWriter(
+            self.path, max_bytes=self.max_bytes, backup_count=self.backup_count
+        )
+
+    def append(self, data):
+        if (
+            os.path.exists(self.path)
+            and os.path.getsize(self.path) + len(data) > self.max_bytes
+        ):
+            self._rotate()
+        super().append(data)
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+def start_audit_writer(path, **kwargs):
+    """Start the background file writer, replacing any previous one."""
+    global _writer
+    stop_audit_writer()
+    _writer = AuditFileWriter(path, **kwargs)
+    _writer.start()
+    return _writer
+
+
+def stop_audit_writer():
+    """Flush pending events and stop the background writer, if running."""
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+@after_fork_in_child
+def _restart_writer_in_child():
+    global _writer
+    if _writer is not None:
+        _writer = _writer.clone()
+        _writer.start()
+
+
+def init_audit_log(app):
+    """Write audit events to AUDIT_LOG_PATH when it is configured."""
+    app.config.setdefault("AUDIT_LOG_PATH", os.environ.get("AUDIT_LOG_PATH"))
+    app.config.setdefault("AUDIT_LOG_MAX_BYTES", 10 * 1024 * 1024)
+    app.config.setdefault("AUDIT_LOG_BACKUP_COUNT", 5)
+    if app.config["AUDIT_LOG_PATH"]:
+        start_audit_writer(
+            app.config["AUDIT_LOG_PATH"],
+            max_bytes=app.config["AUDIT_LOG_MAX_BYTES"],
+            backup_count=app.config["AUDIT_LOG_BACKUP_COUNT"],
+        )
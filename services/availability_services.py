@@ -0,0 +1,175 @@
+from datetime import date, timedelta
+
+from services.audit_log import record_event
+from services.destination_services import (
+    catalog_lock,
+    destinations,
+    on_catalog_change,
+)
+from services.single_flight import SingleFlight, normalize_key
+from services.tracing import span
+
+# destination_id -> {year: bitset}. Bit n of a year's int is set when day n of
+# that year (0 = January 1st) is open, so range checks and multi-date searches
+# are a few word-wise AND / popcount operations instead of per-day lookups.
+calendars = {}
+
+# Concurrent searches for the same set of dates share one scan
+_search_flight = SingleFlight()
+
+# Longest range a single availability request may cover
+MAX_RANGE_DAYS = 3 * 366
+
+
+def _day_of_year(day):
+    return day.timetuple().tm_yday - 1
+
+
+def _year_masks(start, end):
+    """Yield ``(year, mask)`` pairs covering ``start`` to ``end`` inclusive."""
+    for year in range(start.year, end.year + 1):
+        first = _day_of_year(start) if year == start.year else 0
+        last = (
+            _day_of_year(end) if year == end.year else _day_of_year(date(year, 12, 31))
+        )
+        yield year, ((1 << (last - first + 1)) - 1) << first
+
+
+def _dates_masks(days):
+    """Group individual dates into one mask per year."""
+    masks = {}
+    for day in days:
+        masks[day.year] = masks.get(day.year, 0) | (1 << _day_of_year(day))
+    return masks
+
+
+def _iter_set_days(year, bits):
+    january_first = date(year, 1, 1)
+    while bits:
+        lowest = bits & -bits
+        yield january_first + timedelta(days=lowest.bit_length() - 1)
+        bits ^= lowest
+
+
+def parse_date_range(start, end):
+    """
+    Parse ISO ``from``/``to`` strings into dates.
+
+    Returns ``(start, end, error)`` where ``error`` is a message or None.
+    """
+    try:
+        start = date.fromisoformat(start)
+        end = date.fromisoformat(end)
+    except (TypeError, ValueError):
+        return None, None, "'from' and 'to' must be dates in YYYY-MM-DD format."
+    if end < start:
+        return None, None, "'to' must not be before 'from'."
+    if (end - start).days >= MAX_RANGE_DAYS:
+        return None, None, f"Date ranges are limited to {MAX_RANGE_DAYS} days."
+    return start, end, None
+
+
+@span("set_availability_service")
+def set_availability_service(destination_id, data, admin_user=None):
+    """Open or close a date range for a destination (Admin only)."""
+    destination_id = str(destination_id)
+    start, end, error = parse_date_range(data.get("from"), data.get("to"))
+    is_open = data.get("open")
+
+    # Held across the check and the write so a concurrent delete can't leave
+    # a calendar behind for a destination that no longer exists
+    with catalog_lock:
+        if destination_id not in destinations:
+            return {"message": "Destination not found."}, 404
+        if error:
+            return {"message": error}, 400
+        if not isinstance(is_open, bool):
+            return {"message": "'open' must be true or false."}, 400
+
+        calendar = calendars.setdefault(destination_id, {})
+        for year, mask in _year_masks(start, end):
+            bits = calendar.get(year, 0)
+            calendar[year] = bits | mask if is_open else bits & ~mask
+    record_event(
+        "set_availability",
+        admin_user.email if admin_user else None,
+        destination_id,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        open=is_open,
+    )
+
+    return {
+        "message": "Availability updated successfully.",
+        "destination_id": destination_id,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "open": is_open,
+    }, 200
+
+
+@span("get_availability_service")
+def get_availability_service(destination_id, start, end):
+    """List the open dates of a destination between ``start`` and ``end``."""
+    destination_id = str(destination_id)
+    if destination_id not in destinations:
+        return {"message": f"Destination with ID {destination_id} not found."}, 404
+
+    start, end, error = parse_date_range(start, end)
+    if error:
+        return {"message": error}, 400
+
+    calendar = calendars.get(destination_id, {})
+    open_dates = []
+    for year, mask in _year_masks(start, end):
+        bits = calendar.get(year, 0) & mask
+        open_dates.extend(day.isoformat() for day in _iter_set_days(year, bits))
+
+    return {
+        "destination_id": destination_id,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "open_days": len(open_dates),
+        "total_days": (end - start).days + 1,
+        "open_dates": open_dates,
+    }, 200
+
+
+def find_open_destination_ids(days):
+    """Return the ids of destinations open on every one of ``days``."""
+    masks = _dates_masks(days)
+    matches = []
+    # A snapshot: other requests may add calendars while this one scans
+    for destination_id, calendar in list(calendars.items()):
+        for year, mask in masks.items():
+            if calendar.get(year, 0) & mask != mask:
+                break
+        else:
+            matches.append(destination_id)
+    return matches
+
+
+@span("find_available_destinations_service")
+def find_available_destinations_service(dates):
+    """Fetch the destinations open on all of the given ISO dates."""
+    try:
+        days = [date.fromisoformat(value) for value in dates]
+    except ValueError:
+        return {"message": "Dates must be in YYYY-MM-DD format."}, 400
+    if not days:
+        return {"message": "At least one date is required."}, 400
+
+    key = normalize_key("available", days=days)
+    available = []
+    for destination_id in _search_flight.do(key, find_open_destination_ids, days):
+        destination = destinations.get(destination_id)
+        if destination:
+            available.append(destination.to_dict())
+    return available, 200
+
+
+@on_catalog_change
+def _drop_removed_calendars(changes):
+    for kind, destination_id, _ in changes:
+        if kind == "removed":
+            calendars.pop(destination_id, None)
@@ -0,0 +1,80 @@
+import json
+import os
+import queue
+import threading
+
+# A writer thread writes whatever is pending at least this often (seconds)
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE = 500
+
+
+def after_fork_in_child(func):
+    """
+    Register ``func`` to run in the child process right after ``fork()``.
+
+    Threads don't survive fork(): the child inherits module state such as
+    queues and pools but none of the threads serving them, so modules that
+    own threads use this to replace them in a forked worker.
+    """
+    os.register_at_fork(after_in_child=func)
+    return func
+
+
+class JsonLinesWriter(threading.Thread):
+    """
+    Daemon thread appending queued records to a JSON-lines file in batches.
+
+    Producers only ``pending.put(record)``; encoding and file I/O happen on
+    this thread. ``stop`` writes out everything still queued before it
+    returns.
+    """
+
+    # Named in the message printed when a write fails
+    description = "records"
+
+    def __init__(self, path, name="json-lines-writer"):
+        super().__init__(name=name, daemon=True)
+        self.path = path
+        self.pending = queue.SimpleQueue()
+        self._stopping = threading.Event()
+
+    def clone(self):
+        """Return a new, unstarted writer with the same settings."""
+        return type(self)(self.path)
+
+    def encode(self, record):
+        """Return the JSON-serializable form of a queued record."""
+        return record
+
+    def run(self):
+        while not (self._stopping.is_set() and self.pending.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self.join(timeout)
+
+    def append(self, data):
+        with open(self.path, "a", encoding="utf-8") as output:
+            output.write(data)
+
+    def _next_batch(self):
+        try:
+            batch = [self.pending.get(timeout=FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        data = "".join(json.dumps(self.encode(record)) + "\n" for record in batch)
+        try:
+            self.append(data)
+        except OSError as e:
+            print(f"Failed to write {self.description}: {e}")
@@ -0,0 +1,242 @@
+import os
+from collections import Counter
+
+import numpy as np
+
+from services.destination_services import catalog_lock, destinations, on_catalog_change
+from services.json_provider import RawJSON, join_fragments
+from services.tracing import span
+
+# Columns destinations can be filtered and grouped by
+GROUP_FIELDS = ("location", "admin_email")
+
+# Compact once more than this share of the rows are deleted
+MAX_DEAD_RATIO = 0.5
+
+
+class StringTable:
+    """Dictionary encoding of one string column: value <-> small int code."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        """Return the code for ``value``, or None if no row ever had it."""
+        return self.codes.get(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class DestinationTable:
+    """
+    Columnar copy of the catalog for vectorized filters and group-bys.
+
+    Each destination is one row: its id and object in object columns, and
+    its location and admin email as codes into a StringTable per field.
+    Deleted rows are only marked dead, so row order stays insertion order
+    (the same order as the ``destinations`` dict) until the next compaction.
+    """
+
+    def __init__(self, capacity=1024):
+        self.rows = {}
+        self.size = 0
+        self.dead = 0
+        self.strings = {field: StringTable() for field in GROUP_FIELDS}
+        self._allocate(capacity)
+
+    @classmethod
+    def from_items(cls, items):
+        """Build a table from ``(destination_id, destination)`` pairs in one pass."""
+        table = cls(capacity=max(1024, len(items)))
+        count = len(items)
+        table.ids[:count] = [destination_id for destination_id, _ in items]
+        table.objects[:count] = [destination for _, destination in items]
+        for field in GROUP_FIELDS:
+            strings = table.strings[field]
+            # Same codes as StringTable.encode, without a call per row
+            codes = strings.codes
+            table.codes[field][:count] = [
+                codes.setdefault(getattr(destination, field), len(codes))
+                for _, destination in items
+            ]
+            strings.values = list(codes)
+        table.alive[:count] = True
+        table.size = count
+        table.rows = {
+            destination_id: row for row, (destination_id, _) in enumerate(items)
+        }
+        return table
+
+    def _allocate(self, capacity):
+        self.ids = np.empty(capacity, dtype=object)
+        self.objects = np.empty(capacity, dtype=object)
+        self.codes = {
+            field: np.zeros(capacity, dtype=np.int32) for field in GROUP_FIELDS
+        }
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def upsert(self, destination_id, destination):
+        row = self.rows.get(destination_id)
+        if row is None:
+            if self.size == len(self.alive):
+                self._resize(self.size * 2)
+            row = self.rows[destination_id] = self.size
+            self.size += 1
+            self.ids[row] = destination_id
+            self.alive[row] = True
+        self.objects[row] = destination
+        for field in GROUP_FIELDS:
+            self.codes[field][row] = self.strings[field].encode(
+                getattr(destination, field)
+            )
+
+    def remove(self, destination_id):
+        row = self.rows.pop(destination_id, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self.objects[row] = None
+        self.dead += 1
+        if self.dead > self.size * MAX_DEAD_RATIO and self.size > 1024:
+            self._resize(max(1024, 2 * (self.size - self.dead)))
+
+    def _resize(self, capacity):
+        # Copies live rows only, so this also compacts away deleted rows
+        keep = np.flatnonzero(self.alive[: self.size])
+        ids = self.ids[keep]
+        objects = self.objects[keep]
+        codes = {field: column[keep] for field, column in self.codes.items()}
+        self._allocate(capacity)
+        count = len(keep)
+        self.ids[:count] = ids
+        self.objects[:count] = objects
+        for field, column in codes.items():
+            self.codes[field][:count] = column
+        self.alive[:count] = True
+        self.size = count
+        self.dead = 0
+        self.rows = {destination_id: row for row, destination_id in enumerate(ids)}
+
+    def mask(self, **filters):
+        """Boolean mask of live rows whose fields equal every given value."""
+        mask = self.alive[: self.size].copy()
+        for field, value in filters.items():
+            code = self.strings[field].lookup(value)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= self.codes[field][: self.size] == code
+        return mask
+
+    def select(self, **filters):
+        """Destinations matching ``filters``, in catalog order."""
+        return self.objects[: self.size][self.mask(**filters)].tolist()
+
+    def group_counts(self, by, **filters):
+        """``{value: count}`` of matching destinations grouped by a field."""
+        codes = self.codes[by][: self.size][self.mask(**filters)]
+        counts = np.bincount(codes, minlength=len(self.strings[by]))
+        values = self.strings[by].values
+        return {values[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def __len__(self):
+        return self.size - self.dead
+
+
+# The columnar copy of the catalog, or None while the store is disabled
+table = None
+
+
+def enable_table():
+    """Build the table from the current catalog and keep it in sync."""
+    global table
+    with catalog_lock:
+        table = DestinationTable.from_items(list(destinations.items()))
+    return table
+
+
+def disable_table():
+    global table
+    with catalog_lock:
+        table = None
+
+
+@on_catalog_change
+def _sync_table(changes):
+    if table is None:
+        return
+    for kind, destination_id, destination in changes:
+        if kind == "removed":
+            table.remove(destination_id)
+        else:
+            table.upsert(destination_id, destination)
+
+
+def _filters(location=None, admin_email=None):
+    filters = {"location": location, "admin_email": admin_email}
+    return {field: value for field, value in filters.items() if value is not None}
+
+
+@span("filter_destinations_service")
+def filter_destinations_service(location=None, admin_email=None):
+    """Fetch the destinations with the given location and/or admin."""
+    filters = _filters(location, admin_email)
+    if table is not None:
+        # The mask and the row lookup must see the same rows
+        with catalog_lock:
+            matches = table.select(**filters)
+    else:
+        matches = [
+            destination
+            for destination in list(destinations.values())
+            if all(
+                getattr(destination, field) == value for field, value in filters.items()
+            )
+        ]
+    return (
+        RawJSON(join_fragments(destination.to_json() for destination in matches)),
+        200,
+    )
+
+
+@span("destination_stats_service")
+def destination_stats_service(by, location=None, admin_email=None):
+    """Count destinations per location or per admin, largest groups first."""
+    if by not in GROUP_FIELDS:
+        return {"message": f"by must be one of: {', '.join(GROUP_FIELDS)}"}, 400
+
+    filters = _filters(location, admin_email)
+    if table is not None:
+        with catalog_lock:
+            counts = table.group_counts(by, **filters)
+    else:
+        counts = Counter(
+            getattr(destination, by)
+            for destination in list(destinations.values())
+            if all(
+                getattr(destination, field) == value for field, value in filters.items()
+            )
+        )
+    groups = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    return {
+        "by": by,
+        "total": sum(counts.values()),
+        "groups": [{"value": value, "count": count} for value, count in groups],
+    }, 200
+
+
+def init_columnar_store(app):
+    """Build the columnar destination table when COLUMNAR_STORE_ENABLED is set."""
+    app.config.setdefault(
+        "COLUMNAR_STORE_ENABLED", os.environ.get("COLUMNAR_STORE_ENABLED") == "1"
+    )
+    if app.config["COLUMNAR_STORE_ENABLED"] and table is None:
+        enable_table()
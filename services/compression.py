@@ -0,0 +1,120 @@
+import gzip
+import zlib
+
+from flask import Response, current_app, jsonify, request
+
+from services.single_flight import SingleFlight
+
+# Content codings we can produce, in order of preference.
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html", "text/csv")
+
+# Coalesces concurrent first compressions of the same cached body
+_compress_flight = SingleFlight()
+
+
+def compress(data, encoding, level):
+    """Compress ``data`` with the given HTTP content coding."""
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic so it can be cached and ETagged
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        # HTTP "deflate" is the zlib format (RFC 1950), not a raw deflate stream
+        return zlib.compress(data, level)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+def negotiate_encoding():
+    """Return the best content coding accepted by the current request, or None."""
+    return request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+
+class PrecompressedBody:
+    """
+    A serialized JSON body that keeps its compressed variants next to it.
+
+    Each variant is compressed the first time a client asks for it and then
+    reused, so a cached body is compressed once rather than once per request,
+    even when many clients ask for it at the same moment.
+    """
+
+    __slots__ = ("raw", "_encoded")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._encoded = {}
+
+    def encoded(self, encoding, level):
+        key = (encoding, level)
+        data = self._encoded.get(key)
+        if data is None:
+            data = _compress_flight.do((id(self),) + key, self._compress, key)
+        return data
+
+    def _compress(self, key):
+        data = self._encoded.get(key)
+        if data is None:
+            data = self._encoded[key] = compress(self.raw, *key)
+        return data
+
+
+def json_response(result, status_code=200):
+    """
+    Build a JSON response, serving a ``PrecompressedBody`` without re-encoding it.
+
+    Any other result is passed to ``jsonify`` and left to the compression hook.
+    """
+    if not isinstance(result, PrecompressedBody):
+        return jsonify(result), status_code
+
+    body = result.raw
+    response = Response(status=status_code, mimetype="application/json")
+    encoding = negotiate_encoding()
+    if encoding and len(body) >= current_app.config["COMPRESS_MIN_SIZE"]:
+        body = result.encoded(encoding, current_app.config["COMPRESS_LEVEL"])
+        response.headers["Content-Encoding"] = encoding
+    response.set_data(body)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def compress_response(response):
+    """after_request hook compressing eligible responses for the current client."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if response.content_length is None or (
+        response.content_length < current_app.config["COMPRESS_MIN_SIZE"]
+    ):
+        return response
+
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+
+    data = compress(response.get_data(), encoding, current_app.config["COMPRESS_LEVEL"])
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    # A strong ETag names exact bytes, so each coding needs its own
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_compression(app):
+    """Enable Accept-Encoding negotiated response compression for ``app``."""
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    # Bodies smaller than this are sent as-is; compressing them costs more
+    # than the bytes it saves.
+    app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+    app.after_request(compress_response)
@@ -1,6 +1,30 @@
+import threading
+
 from models.destination import Destination
+from services.audit_log import record_event
+from services.compression import PrecompressedBody
+from services.json_provider import RawJSON, dumps_bytes, join_fragments
+from services.merge_patch import apply_merge_patch, changed_fields
+from services.single_flight import SingleFlight
+from services.tracing import span
 
 destination_counter = 2
+# Serializes catalog writes (and the listener updates they trigger), so
+# background jobs can call the write services alongside request threads.
+catalog_lock = threading.RLock()
+# Bumped on every catalog change so cached views of the catalog can be reused
+# until the next write.
+catalog_version = 0
+# (catalog_version, PrecompressedBody) for the serialized destination list
+_catalog_body = None
+# Coalesces concurrent rebuilds of the same catalog version
+catalog_flight = SingleFlight()
+# Most ids a single batch lookup may ask for
+MAX_BATCH_IDS = 1000
+# Most operations a single bulk request may apply
+MAX_BULK_OPERATIONS = 10000
+# Callables notified with the list of changes after every catalog write
+_catalog_listeners = []
 destinations = {
     "1": Destination("Paris", "The city of lights.", "France", "admin@paris.com"),
     "2": Destination(
@@ -9,6 +33,7 @@ destinations = {
 }
 
 
+@span("add_destination_service")
 def add_destination_service(data, admin_user):
     """Service to add a new destination (Admin only)."""
 
@@ -21,23 +46,27 @@ def add_destination_service(data, admin_user):
     if not name or not description or not location:
         return {"message": "All fields are required"}, 400
 
-    destination_counter += 1
-    new_id = str(destination_counter)
-
-    # Create a new Destination instance
-    new_destination = Destination(
-        name=name,
-        description=description,
-        location=location,
-        admin_email=admin_user.email,
-    )
-
-    # Store the destination in the dictionary
-    destinations[new_id] = new_destination
+    with catalog_lock:
+        destination_counter += 1
+        new_id = str(destination_counter)
+        # Create a new Destination instance. Its id comes from this counter,
+        # not the model's, so to_dict() always matches the dict key.
+        new_destination = Destination(
+            name=name,
+            description=description,
+            location=location,
+            admin_email=admin_user.email,
+        )
+        new_destination.id = destination_counter
+        # Store the destination in the dictionary
+        destinations[new_id] = new_destination
+        _commit_changes([("added", new_id, new_destination)])
+    record_event("add_destination", admin_user.email, new_id, name=name)
 
     return {"message": "Destination added successfully", "destination_id": new_id}, 201
 
 
+@span("get_all_destinations_service")
 def get_all_destinations_service():
     """
     Fetch all destinations.
@@ -45,12 +74,42 @@ def get_all_destinations_service():
     if not destinations:
         return {"message": "No destinations available."}, 200
 
-    # Convert Destination objects to dictionaries using the to_dict() method
-    destination_list = [dest.to_dict() for dest in destinations.values()]
+    return get_catalog_body(), 200
+
+
+def get_catalog_body():
+    """
+    Return the serialized destination list for the current catalog version.
+
+    The body (and each compressed variant of it) is built once per catalog
+    version and shared by every request until the catalog changes. Requests
+    that arrive while it is being rebuilt wait for that build instead of
+    starting their own.
+    """
+    cached = _catalog_body
+    if cached is not None and cached[0] == catalog_version:
+        return cached[1]
+    version = catalog_version
+    return catalog_flight.do(("catalog_body", version), _build_catalog_body, version)
+
 
-    return destination_list, 200
+def _build_catalog_body(version):
+    global _catalog_body
 
+    # Each destination caches its own encoded fragment, so only the
+    # destinations changed since the last build are re-encoded.
+    with span("build_catalog_body", destinations=len(destinations)):
+        # list() copies the values in one step, so concurrent writes can't
+        # change the dict while it is being walked
+        snapshot = list(destinations.values())
+        raw = join_fragments(dest.to_json() for dest in snapshot)
+    body = PrecompressedBody(raw)
+    if _catalog_body is None or _catalog_body[0] <= version:
+        _catalog_body = (version, body)
+    return body
 
+
+@span("get_destination_by_id_service")
 def get_destination_by_id_service(destination_id):
     """
     Fetch a destination by its ID.
@@ -60,28 +119,93 @@ def get_destination_by_id_service(destination_id):
     if not destination:
         return {"message": f"Destination with ID {destination_id} not found."}, 404
 
-    return destination.to_dict(), 200
+    return RawJSON(destination.to_json()), 200
+
+
+@span("get_destinations_by_ids")
+def get_destinations_by_ids(destination_ids):
+    """
+    Look up many destinations in one pass.
+
+    Returns ``(found, missing)`` where ``found`` is a list of
+    ``(destination_id, destination)`` pairs in request order and ``missing``
+    lists the ids that do not exist.
+    """
+    found = []
+    missing = []
+    lookup = destinations.get
+    for destination_id in destination_ids:
+        destination_id = str(destination_id)
+        destination = lookup(destination_id)
+        if destination is None:
+            missing.append(destination_id)
+        else:
+            found.append((destination_id, destination))
+    return found, missing
+
+
+@span("get_destinations_batch_service")
+def get_destinations_batch_service(destination_ids):
+    """
+    Fetch many destinations in one request.
+
+    Returns the found destinations in request order (duplicates once) and
+    the ids that do not exist.
+    """
+    if not isinstance(destination_ids, list) or not destination_ids:
+        return {"message": "ids must be a non-empty list of destination IDs."}, 400
+    if len(destination_ids) > MAX_BATCH_IDS:
+        return {"message": f"At most {MAX_BATCH_IDS} ids can be fetched at once."}, 400
+    if any(
+        isinstance(destination_id, bool) or not isinstance(destination_id, (str, int))
+        for destination_id in destination_ids
+    ):
+        return {"message": "Destination IDs must be strings or integers."}, 400
+
+    unique_ids = dict.fromkeys(
+        str(destination_id) for destination_id in destination_ids
+    )
+    found, missing = get_destinations_by_ids(unique_ids)
+    body = join_fragments(
+        (destination.to_json() for _, destination in found),
+        prefix=b'{"destinations":[',
+        suffix=b'],"missing":' + dumps_bytes(missing) + b"}",
+    )
+    return RawJSON(body), 200
 
 
 # services/destination_services.py
 
 
-def update_destination_service(destination_id, updated_data):
+@span("update_destination_service")
+def update_destination_service(destination_id, updated_data, admin_user=None):
     """
     Update a destination's details.
     """
     destination_id = str(destination_id)  # Ensure string conversion
-    destination = destinations.get(destination_id)
-    if not destination:
-        return {"message": "Destination not found."}, 404
+    with catalog_lock:
+        destination = destinations.get(destination_id)
+        if not destination:
+            return {"message": "Destination not found."}, 404
 
-    # Update fields if they exist in the request
-    if "name" in updated_data:
-        destination.name = updated_data["name"]
-    if "description" in updated_data:
-        destination.description = updated_data["description"]
-    if "location" in updated_data:
-        destination.location = updated_data["location"]
+        # Update fields if they exist in the request
+        if "name" in updated_data:
+            destination.name = updated_data["name"]
+        if "description" in updated_data:
+            destination.description = updated_data["description"]
+        if "location" in updated_data:
+            destination.location = updated_data["location"]
+        _commit_changes([("updated", destination_id, destination)])
+    record_event(
+        "update_destination",
+        _actor(admin_user),
+        destination_id,
+        fields=sorted(
+            field
+            for field in ("name", "description", "location")
+            if field in updated_data
+        ),
+    )
 
     # Return the updated destination as a dictionary
     return {
@@ -90,16 +214,221 @@ def update_destination_service(destination_id, updated_data):
     }, 200
 
 
-def delete_destination_service(destination_id):
+@span("delete_destination_service")
+def delete_destination_service(destination_id, admin_user=None):
     """
     Delete a destination by its ID.
     """
     destination_id = str(destination_id)
 
-    destination = destinations.pop(
-        destination_id, None
-    )  # Remove destination if it exists
+    with catalog_lock:
+        destination = destinations.pop(
+            destination_id, None
+        )  # Remove destination if it exists
+        if not destination:
+            return {"message": "Destination not found."}, 404
+        _commit_changes([("removed", destination_id, destination)])
+    record_event("delete_destination", _actor(admin_user), destination_id)
+
+    return {"message": "Destination deleted successfully."}, 200
+
+
+PATCHABLE_DESTINATION_FIELDS = ("name", "description", "location")
+
+
+@span("patch_destination_service")
+def patch_destination_service(destination_id, patch, admin_user=None):
+    """
+    Apply a JSON merge patch (RFC 7396) to a destination.
+
+    Only fields whose value actually changes are written; a patch that
+    changes nothing leaves the catalog version untouched.
+    """
+    if not isinstance(patch, dict):
+        return {"message": "Merge patch must be a JSON object."}, 400
+
+    with catalog_lock:
+        return _patch_destination(str(destination_id), patch, admin_user)
+
+
+def _patch_destination(destination_id, patch, admin_user):
+    destination = destinations.get(destination_id)
     if not destination:
         return {"message": "Destination not found."}, 404
 
-    return {"message": "Destination deleted successfully."}, 200
+    unknown = sorted(set(patch) - set(PATCHABLE_DESTINATION_FIELDS))
+    if unknown:
+        return {"message": f"Unknown fields: {', '.join(unknown)}"}, 400
+
+    original = {
+        field: getattr(destination, field) for field in PATCHABLE_DESTINATION_FIELDS
+    }
+    patched = apply_merge_patch(original, patch)
+
+    for field in PATCHABLE_DESTINATION_FIELDS:
+        value = patched.get(field)
+        if not isinstance(value, str) or not value:
+            return {"message": f"Field '{field}' must be a non-empty string."}, 400
+
+    changed = changed_fields(original, patched)
+    if changed:
+        for field in changed:
+            setattr(destination, field, patched[field])
+        _commit_changes([("updated", destination_id, destination)])
+        record_event(
+            "patch_destination", _actor(admin_user), destination_id, fields=changed
+        )
+
+    return {"id": destination_id, "changed": changed}, 200
+
+
+BULK_OPERATIONS = ("create", "update", "delete")
+
+
+@span("bulk_destinations_service")
+def bulk_destinations_service(operations, admin_user=None):
+    """
+    Create, update and delete many destinations in one atomic write (Admin only).
+
+    Each operation is an object with an "op" of create (the default), update
+    or delete; update and delete name an "id". Every operation is checked
+    first; if any fails, nothing is applied. Otherwise all of them are
+    applied under the catalog lock with a single catalog version bump and
+    one listener notification.
+    """
+    if not isinstance(operations, list) or not operations:
+        return {"message": "A non-empty list of operations is required."}, 400
+    if len(operations) > MAX_BULK_OPERATIONS:
+        return {
+            "message": f"At most {MAX_BULK_OPERATIONS} operations can be applied at once."
+        }, 400
+
+    with catalog_lock:
+        planned, results = _plan_bulk(operations)
+        if any(result["status"] == "error" for result in results):
+            return {"applied": False, "results": results}, 400
+        counts = _apply_bulk(planned, results, admin_user)
+
+    record_event("bulk_destinations", _actor(admin_user), None, **counts)
+    return {"applied": True, **counts, "results": results}, 200
+
+
+def _plan_bulk(operations):
+    """Validate every operation against the catalog as it would be at that point."""
+    planned = []
+    results = []
+    deleted = set()
+    for index, operation in enumerate(operations):
+        result = {"index": index}
+        results.append(result)
+        if not isinstance(operation, dict):
+            result.update(status="error", message="Operation must be an object.")
+            continue
+        op = operation.get("op", "create")
+        result["op"] = op
+        if op not in BULK_OPERATIONS:
+            result.update(
+                status="error",
+                message=f"op must be one of: {', '.join(BULK_OPERATIONS)}",
+            )
+            continue
+
+        fields = {
+            field: value
+            for field, value in operation.items()
+            if field not in ("op", "id")
+        }
+        unknown = sorted(set(fields) - set(PATCHABLE_DESTINATION_FIELDS))
+        if op == "delete" and fields:
+            unknown = sorted(fields)
+        if unknown:
+            result.update(
+                status="error", message=f"Unknown fields: {', '.join(unknown)}"
+            )
+            continue
+        invalid = [
+            field
+            for field, value in fields.items()
+            if not isinstance(value, str) or not value
+        ]
+        if invalid:
+            message = f"Field '{invalid[0]}' must be a non-empty string."
+            result.update(status="error", message=message)
+            continue
+
+        if op == "create":
+            if len(fields) < len(PATCHABLE_DESTINATION_FIELDS):
+                result.update(status="error", message="All fields are required")
+                continue
+            planned.append((op, None, fields))
+            result["status"] = "ok"
+            continue
+
+        destination_id = str(operation.get("id", ""))
+        result["id"] = destination_id
+        if destination_id not in destinations or destination_id in deleted:
+            result.update(status="error", message="Destination not found.")
+            continue
+        if op == "delete":
+            deleted.add(destination_id)
+        planned.append((op, destination_id, fields))
+        result["status"] = "ok"
+    return planned, results
+
+
+def _apply_bulk(planned, results, admin_user):
+    global destination_counter
+
+    # One entry per destination, so listeners see its final state once
+    changes = {}
+    counts = {"created": 0, "updated": 0, "deleted": 0}
+    for (op, destination_id, fields), result in zip(planned, results):
+        if op == "create":
+            destination_counter += 1
+            destination_id = str(destination_counter)
+            destination = Destination(admin_email=_actor(admin_user), **fields)
+            destination.id = destination_counter
+            destinations[destination_id] = destination
+            changes[destination_id] = ("added", destination_id, destination)
+            result.update(id=destination_id, status="created")
+            counts["created"] += 1
+        elif op == "update":
+            destination = destinations[destination_id]
+            for field, value in fields.items():
+                setattr(destination, field, value)
+            changes[destination_id] = ("updated", destination_id, destination)
+            result["status"] = "updated"
+            counts["updated"] += 1
+        else:
+            destination = destinations.pop(destination_id)
+            changes[destination_id] = ("removed", destination_id, destination)
+            result["status"] = "deleted"
+            counts["deleted"] += 1
+    if changes:
+        _commit_changes(list(changes.values()))
+    return counts
+
+
+def _actor(admin_user):
+    return admin_user.email if admin_user else None
+
+
+def on_catalog_change(listener):
+    """
+    Register ``listener(changes)`` to be called after every catalog write.
+
+    ``changes`` is a list of ``(kind, destination_id, destination)`` tuples
+    where kind is "added", "updated" or "removed". Returns the listener so
+    this can be used as a decorator.
+    """
+    _catalog_listeners.append(listener)
+    return listener
+
+
+def _commit_changes(changes):
+    """Bump the catalog version and notify listeners of the given changes."""
+    global catalog_version
+    with catalog_lock:
+        catalog_version += 1
+        for listener in _catalog_listeners:
+            listener(changes)
@@ -0,0 +1,105 @@
+import itertools
+import queue
+import threading
+from collections import deque
+
+from services.destination_services import on_catalog_change
+from services.json_provider import dumps_bytes
+
+# Events a subscriber may fall behind by before it is disconnected
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Recent events kept for clients reconnecting with Last-Event-ID
+REPLAY_SIZE = 1000
+# Open streams allowed at once; each one holds a server thread under WSGI
+MAX_SUBSCRIBERS = 100
+
+_LAGGED = object()
+
+
+class EventBroker:
+    """
+    Fan catalog events out to server-sent event streams.
+
+    Publishing only appends to in-memory queues, so catalog writes never wait
+    on slow clients. A subscriber whose queue fills up is sent a final
+    ``lagged`` event and disconnected; it can reconnect with Last-Event-ID.
+    """
+
+    def __init__(self, max_subscribers=MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._recent = deque(maxlen=REPLAY_SIZE)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, last_event_id=None):
+        """Return a new subscriber queue, or None when the broker is full."""
+        subscriber = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            if last_event_id is not None:
+                for event in self._recent:
+                    if event[0] > last_event_id:
+                        subscriber.put_nowait(event)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, kind, data):
+        with self._lock:
+            event = (next(self._ids), kind, dumps_bytes(data))
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                self.unsubscribe(subscriber)
+                # Drop the backlog so the lagged marker fits
+                while not subscriber.empty():
+                    subscriber.get_nowait()
+                subscriber.put_nowait(_LAGGED)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def format_event(event):
+    event_id, kind, data = event
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, kind.encode(), data)
+
+
+def stream_events(subscriber, heartbeat):
+    """
+    Yield SSE frames from ``subscriber`` until the client goes away.
+
+    A comment line is sent every ``heartbeat`` seconds without events so
+    proxies keep the connection open and dead clients are noticed.
+    """
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = subscriber.get(timeout=heartbeat)
+            except queue.Empty:
+                yield b": keep-alive\n\n"
+                continue
+            if event is _LAGGED:
+                yield b"event: lagged\ndata: {}\n\n"
+                return
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+@on_catalog_change
+def _publish_catalog_changes(changes):
+    for kind, destination_id, _ in changes:
+        broker.publish(f"destination.{kind}", {"id": destination_id})
@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from services.background import after_fork_in_child
+
+# Threads for blocking work awaited by async views. Password hashing
+# (hashlib.scrypt) releases the GIL, so hashes run in parallel on every core.
+BLOCKING_WORKERS = int(os.environ.get("BLOCKING_WORKERS", os.cpu_count() or 1))
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(BLOCKING_WORKERS, thread_name_prefix="blocking")
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Await ``func(*args, **kwargs)`` on the shared blocking-work pool.
+
+    The call runs in a copy of the caller's context, so tracing spans opened
+    inside it still nest under the request that awaited it.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+@after_fork_in_child
+def _forget_executor_in_child():
+    # A forked worker builds its own pool on first use
+    global _executor
+    _executor = None
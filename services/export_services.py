@@ -0,0 +1,78 @@
+import csv
+import io
+import operator
+
+from services import destination_services, user_services
+from services.audit_log import record_event
+from services.tracing import span
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Columns per dataset, in CSV order; users never export password or token
+EXPORT_FIELDS = {
+    "destinations": ("id", "name", "description", "location"),
+    "users": ("name", "email", "role"),
+}
+
+# Rows encoded per yielded chunk: big enough to keep per-chunk overhead
+# low, small enough that memory stays flat whatever the dataset size
+EXPORT_CHUNK_ROWS = 500
+
+
+def _snapshot(dataset):
+    # Only references are copied; rows are encoded lazily while streaming
+    if dataset == "destinations":
+        with destination_services.catalog_lock:
+            return list(destination_services.destinations.values())
+    return list(user_services.users.values())
+
+
+def _csv_chunks(records, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    row = operator.attrgetter(*fields)
+    for start in range(0, len(records), EXPORT_CHUNK_ROWS):
+        writer.writerows(map(row, records[start : start + EXPORT_CHUNK_ROWS]))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if not records:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(records):
+    for start in range(0, len(records), EXPORT_CHUNK_ROWS):
+        # Reuses the JSON fragment cached on each model
+        chunk = [
+            record.to_json() for record in records[start : start + EXPORT_CHUNK_ROWS]
+        ]
+        yield b"\n".join(chunk) + b"\n"
+
+
+@span("export_service")
+def export_service(dataset, export_format, admin_user=None):
+    """
+    Export users or destinations as CSV or NDJSON (Admin only).
+
+    Returns ``(chunks, status)``: an iterator of encoded chunks over a
+    snapshot taken now, so the export reflects the store at request time.
+    """
+    if dataset not in EXPORT_FIELDS:
+        return {
+            "message": f"Unknown dataset. Choose from: {', '.join(EXPORT_FIELDS)}"
+        }, 404
+    if export_format not in EXPORT_FORMATS:
+        return {"message": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, 400
+
+    records = _snapshot(dataset)
+    record_event(
+        "export",
+        admin_user.email if admin_user else None,
+        dataset,
+        format=export_format,
+        rows=len(records),
+    )
+    if export_format == "csv":
+        return _csv_chunks(records, EXPORT_FIELDS[dataset]), 200
+    return _ndjson_chunks(records), 200
@@ -0,0 +1,79 @@
+from services.destination_services import (
+    destinations,
+    get_destinations_by_ids,
+    on_catalog_change,
+)
+from services.json_provider import RawJSON, join_fragments
+from services.tracing import span
+
+# Reverse index: destination id (int) -> users who favorited it. Lets a
+# deleted destination be removed from exactly the users that saved it.
+favorited_by = {}
+
+
+def _parse_destination_id(destination_id):
+    try:
+        return int(destination_id)
+    except (TypeError, ValueError):
+        return None
+
+
+@span("add_favorite_service")
+def add_favorite_service(user, destination_id):
+    """Add a destination to the user's favorites."""
+    favorite_id = _parse_destination_id(destination_id)
+    if favorite_id is None or str(favorite_id) not in destinations:
+        return {"message": f"Destination with ID {destination_id} not found."}, 404
+
+    if not user.add_favorite(favorite_id):
+        return {"message": "Destination is already a favorite."}, 200
+
+    favorited_by.setdefault(favorite_id, set()).add(user)
+    return {"message": "Favorite added successfully."}, 201
+
+
+@span("remove_favorite_service")
+def remove_favorite_service(user, destination_id):
+    """Remove a destination from the user's favorites."""
+    favorite_id = _parse_destination_id(destination_id)
+    if favorite_id is None or not user.remove_favorite(favorite_id):
+        return {"message": "Favorite not found."}, 404
+
+    _drop_favoriter(favorite_id, user)
+    return {"message": "Favorite removed successfully."}, 200
+
+
+@span("get_favorites_service")
+def get_favorites_service(user):
+    """Fetch the user's favorite destinations with one batched lookup."""
+    found, _ = get_destinations_by_ids(user.favorites)
+    body = join_fragments(
+        (destination.to_json() for _, destination in found),
+        prefix=b'{"favorites":[',
+        suffix=b"]}",
+    )
+    return RawJSON(body), 200
+
+
+def forget_user_favorites(user):
+    """Remove a user that is being deleted from the reverse index."""
+    for favorite_id in user.favorites:
+        _drop_favoriter(favorite_id, user)
+
+
+def _drop_favoriter(favorite_id, user):
+    favoriters = favorited_by.get(favorite_id)
+    if favoriters is not None:
+        favoriters.discard(user)
+        if not favoriters:
+            del favorited_by[favorite_id]
+
+
+@on_catalog_change
+def _remove_deleted_favorites(changes):
+    for kind, destination_id, _ in changes:
+        if kind != "removed":
+            continue
+        favorite_id = _parse_destination_id(destination_id)
+        for user in favorited_by.pop(favorite_id, ()):
+            user.remove_favorite(favorite_id)
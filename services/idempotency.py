@@ -0,0 +1,140 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request
+
+# Stored results kept at most this long (seconds) and this many at a time
+IDEMPOTENCY_TTL = 24 * 60 * 60
+MAX_ENTRIES = 10000
+# How long a duplicate waits for the in-flight original before giving up
+WAIT_TIMEOUT = 30
+MAX_KEY_LENGTH = 255
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "expires", "done", "response")
+
+    def __init__(self, fingerprint, expires):
+        self.fingerprint = fingerprint
+        self.expires = expires
+        self.done = threading.Event()
+        # (status, mimetype, body) once the original request has finished
+        self.response = None
+
+
+class IdempotencyStore:
+    """
+    Bounded LRU of request results keyed by idempotency key, with a TTL.
+
+    The first request for a key claims an entry and runs; duplicates that
+    arrive meanwhile get the same entry and wait on its event.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=IDEMPOTENCY_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key, fingerprint):
+        """Return ``(entry, is_owner)``; the owner must ``finish`` the entry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(key)
+                return entry, False
+            entry = _Entry(fingerprint, now + self.ttl)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry, True
+
+    def finish(self, key, entry, response=None):
+        """Store the result (or forget the key when ``response`` is None)."""
+        entry.response = response
+        if response is None:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+        entry.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+store = IdempotencyStore()
+
+
+def _replay(response):
+    status, mimetype, body = response
+    replayed = current_app.response_class(body, status=status, mimetype=mimetype)
+    replayed.headers[REPLAY_HEADER] = "true"
+    return replayed
+
+
+def idempotent(view):
+    """
+    Honour an ``Idempotency-Key`` header on a POST view.
+
+    A retry with the same key (and caller) returns the stored response
+    without running the view again; a concurrent duplicate waits for the
+    original to finish. Reusing a key for a different body is a 422. Server
+    errors are not stored, so they can be retried; duplicates that were
+    waiting on a failed original elect one of themselves to run again.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            message = f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters."
+            return jsonify({"message": message}), 400
+
+        scope = (request.endpoint, request.headers.get("Authorization", ""), key)
+        fingerprint = hashlib.sha256(
+            request.method.encode() + request.full_path.encode() + request.get_data()
+        ).digest()
+        while True:
+            entry, is_owner = store.begin(scope, fingerprint)
+            if entry.fingerprint != fingerprint:
+                message = "Idempotency-Key was already used for a different request."
+                return jsonify({"message": message}), 422
+            if is_owner:
+                break
+            if not entry.done.wait(WAIT_TIMEOUT):
+                message = "A request with this Idempotency-Key is still in progress."
+                return jsonify({"message": message}), 409
+            if entry.response is not None:
+                return _replay(entry.response)
+            # The original failed without a result and released the key;
+            # claim it again so only one of the waiting duplicates reruns
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except BaseException:
+            store.finish(scope, entry)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            store.finish(scope, entry)
+        else:
+            store.finish(
+                scope,
+                entry,
+                (response.status_code, response.mimetype, response.get_data()),
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,285 @@
+import asyncio
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from services import destination_services, similarity_services, user_services
+from services.audit_log import record_event
+from services.background import after_fork_in_child
+
+# Worker threads running jobs, and how many jobs may wait for one
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+MAX_QUEUED_JOBS = int(os.environ.get("MAX_QUEUED_JOBS", 100))
+# Finished jobs kept for status polling
+MAX_FINISHED_JOBS = 1000
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+
+# Users hashed per step of an import job
+IMPORT_CHUNK_SIZE = 50
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """One unit of background work and its observable state."""
+
+    def __init__(self, job_id, kind, func, params, submitted_by):
+        self.id = job_id
+        self.kind = kind
+        self.func = func
+        self.params = params
+        self.submitted_by = submitted_by
+        self.status = "queued"
+        self.done = 0
+        self.total = None
+        self.message = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def report(self, done, total=None, message=None):
+        """
+        Record progress; raises JobCancelled once cancellation was requested.
+
+        Also yields the GIL, so request threads aren't starved by a job
+        that reports between small steps.
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        time.sleep(0)
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def to_dict(self):
+        data = {
+            "id": self.id,
+            "type": self.kind,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "submitted_by": self.submitted_by,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.message:
+            data["message"] = self.message
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class JobRunner:
+    """
+    Runs jobs on a fixed set of daemon threads fed by a bounded queue.
+
+    Jobs run in this process so they can call the service functions
+    directly; catalog writes are serialized by ``catalog_lock``.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_queued=MAX_QUEUED_JOBS):
+        self.workers = workers
+        self._queue = queue.Queue(max_queued)
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, kind, func, params=None, submitted_by=None):
+        """Queue ``func(job, **params)``; returns the Job, or None when full."""
+        self._start_workers()
+        with self._lock:
+            job = Job(str(next(self._ids)), kind, func, params or {}, submitted_by)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                return None
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def list(self, limit=100):
+        with self._lock:
+            return list(reversed(self._jobs.values()))[:limit]
+
+    def cancel(self, job_id):
+        """Request cancellation; returns the job, or None if it is unknown."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job._cancel.set()
+        if job.status == "queued":
+            # The worker skips it when it comes up
+            self._finish(job, "cancelled")
+        return job
+
+    def _start_workers(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"job-worker-{len(self._threads)}"
+                )
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job.finished:
+                continue
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = job.func(job, **job.params)
+            except JobCancelled:
+                self._finish(job, "cancelled")
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                self._finish(job, "failed")
+            else:
+                self._finish(job, "succeeded")
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+runner = JobRunner()
+
+
+@after_fork_in_child
+def _reset_runner_in_child():
+    global runner
+    runner = JobRunner()
+
+
+def import_users_job(job, users):
+    """Import users in chunks, reporting progress between chunks."""
+    if not isinstance(users, list) or not users:
+        raise ValueError("'users' must be a non-empty list.")
+    created = failed = 0
+    job.report(0, len(users))
+    for start in range(0, len(users), IMPORT_CHUNK_SIZE):
+        chunk = users[start : start + IMPORT_CHUNK_SIZE]
+        result, status_code = asyncio.run(user_services.import_users_service(chunk))
+        if status_code != 200:
+            raise ValueError(result["message"])
+        created += result["created"]
+        failed += result["failed"]
+        job.report(start + len(chunk))
+    return {"created": created, "failed": failed}
+
+
+def rebuild_similarity_index_job(job):
+    """Rebuild the similarity index off the request path."""
+    size = similarity_services.rebuild_index(progress=job.report)
+    return {"indexed": size}
+
+
+def snapshot_job(job):
+    """Write the users and destinations to a timestamped JSON file."""
+    with destination_services.catalog_lock:
+        destinations = list(destination_services.destinations.items())
+    users = list(user_services.users.values())
+    total = len(destinations) + len(users)
+    job.report(0, total)
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = os.path.join(SNAPSHOT_DIR, f"snapshot-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as output:
+        output.write('{"destinations":{')
+        for done, (destination_id, destination) in enumerate(destinations, 1):
+            if done > 1:
+                output.write(",")
+            output.write(json.dumps(destination_id) + ":")
+            output.write(destination.to_json().decode("utf-8"))
+            if done % 1000 == 0:
+                job.report(done)
+        output.write('},"users":[')
+        for done, user in enumerate(users, 1):
+            if done > 1:
+                output.write(",")
+            output.write(user.to_json().decode("utf-8"))
+            if done % 1000 == 0:
+                job.report(len(destinations) + done)
+        output.write("]}")
+    job.report(total)
+    return {"path": path, "destinations": len(destinations), "users": len(users)}
+
+
+JOB_TYPES = {
+    "import_users": import_users_job,
+    "rebuild_similarity_index": rebuild_similarity_index_job,
+    "snapshot": snapshot_job,
+}
+
+
+def submit_job_service(kind, params, admin_user=None):
+    """Queue a background job of a registered type (Admin only)."""
+    func = JOB_TYPES.get(kind)
+    if func is None:
+        return {
+            "message": f"Unknown job type. Choose from: {', '.join(JOB_TYPES)}"
+        }, 400
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        return {"message": "'params' must be an object."}, 400
+
+    actor = admin_user.email if admin_user else None
+    job = runner.submit(kind, func, params, submitted_by=actor)
+    if job is None:
+        return {"message": "The job queue is full. Try again later."}, 503
+    record_event("submit_job", actor, job.id, type=kind)
+    return {"job": job.to_dict()}, 202
+
+
+def get_job_service(job_id):
+    job = runner.get(job_id)
+    if job is None:
+        return {"message": f"Job {job_id} not found."}, 404
+    return {"job": job.to_dict()}, 200
+
+
+def list_jobs_service(limit=100):
+    return {"jobs": [job.to_dict() for job in runner.list(limit)]}, 200
+
+
+def cancel_job_service(job_id, admin_user=None):
+    """Cancel a queued job, or ask a running one to stop at its next step."""
+    job = runner.get(job_id)
+    if job is None:
+        return {"message": f"Job {job_id} not found."}, 404
+    if job.finished:
+        return {"message": f"Job {job_id} has already {job.status}."}, 409
+    runner.cancel(job_id)
+    record_event(
+        "cancel_job", admin_user.email if admin_user else None, job_id, type=job.kind
+    )
+    return {"job": job.to_dict()}, 202
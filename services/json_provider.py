@@ -0,0 +1,71 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+from services.tracing import span
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    # Leave dates and dataclasses to Flask's default() so the output matches
+    # the stdlib provider.
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+def dumps_bytes(obj):
+    """Encode ``obj`` as compact UTF-8 JSON bytes using the fastest encoder available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def join_fragments(fragments, prefix=b"[", suffix=b"]"):
+    """Assemble a JSON array from already-encoded element fragments."""
+    return prefix + b",".join(fragments) + suffix
+
+
+class RawJSON:
+    """Already-encoded JSON that ``jsonify`` sends as-is instead of re-encoding."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that uses orjson when it is installed.
+
+    Falls back to Flask's stdlib-based provider when orjson is missing, when
+    stdlib-only options such as ``indent`` are requested, or when orjson
+    cannot encode a value.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and set(kwargs) <= {"separators"}:
+            try:
+                return orjson.dumps(
+                    obj, default=self.default, option=_ORJSON_OPTIONS
+                ).decode("utf-8")
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if len(args) == 1 and not kwargs and isinstance(args[0], RawJSON):
+            return self._app.response_class(args[0].data, mimetype=self.mimetype)
+        with span("json_encode"):
+            return super().response(*args, **kwargs)
@@ -0,0 +1,193 @@
+import gc
+import itertools
+import os
+import random
+import sys
+import threading
+import tracemalloc
+from array import array
+from types import FunctionType, ModuleType
+
+from models.destination import Destination
+from models.user import User
+from services.destination_services import destinations
+from services.user_services import active_sessions, users
+
+# Entries measured per store; larger stores are extrapolated from the sample
+SAMPLE_SIZE = 200
+MAX_TOP_ALLOCATIONS = 100
+
+MODEL_CLASSES = (User, Destination)
+
+# Shared objects that should never be charged to a single entry
+_SKIPPED_TYPES = (type, ModuleType, FunctionType)
+
+# Snapshot the next ``diff`` request compares against
+_last_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate the memory held by ``obj`` and everything it references.
+
+    Follows containers, instance ``__dict__`` and ``__slots__``; objects
+    already in ``seen`` (ids) are only counted once.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif isinstance(current, (str, bytes, int, float, bool, array)):
+            continue
+        else:
+            instance_dict = getattr(current, "__dict__", None)
+            if instance_dict is not None:
+                pending.append(instance_dict)
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(current, slot):
+                        pending.append(getattr(current, slot))
+    return size
+
+
+def estimate_store_size(store, sample_size=SAMPLE_SIZE):
+    """
+    Estimate the deep size of a dict store from a sample of entries.
+
+    Stores with at most ``sample_size`` entries are measured exactly. Larger
+    ones are sampled every ``count // sample_size`` keys from a random
+    offset, so no list of every key is built.
+    """
+    count = len(store)
+    container = sys.getsizeof(store)
+    if count <= sample_size:
+        keys = list(store)
+    else:
+        step = count // sample_size
+        start = random.randrange(step)
+        keys = list(itertools.islice(store, start, None, step))[:sample_size]
+
+    sampled = 0
+    for key in keys:
+        try:
+            sampled += deep_sizeof(key) + deep_sizeof(store[key])
+        except KeyError:  # removed by a concurrent request
+            continue
+    per_entry = sampled / len(keys) if keys else 0
+
+    return {
+        "entries": count,
+        "sampled": len(keys),
+        "exact": count <= sample_size,
+        "bytes_per_entry": round(per_entry),
+        "estimated_bytes": container + round(per_entry * count),
+    }
+
+
+def count_model_objects():
+    """Count live instances of each model class, including ones no store holds."""
+    counts = {cls.__name__: 0 for cls in MODEL_CLASSES}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls in MODEL_CLASSES:
+            counts[cls.__name__] += 1
+    return counts
+
+
+def _format_stat(stat):
+    frame = stat.traceback[0]
+    entry = {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+
+
+def tracemalloc_report(top, diff=False):
+    """
+    Return the top allocation sites, or their growth since the last diff.
+
+    Each ``diff`` call stores its snapshot as the baseline for the next one.
+    """
+    global _last_snapshot
+
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+
+    current, peak = tracemalloc.get_traced_memory()
+    report = {"tracing": True, "traced_bytes": current, "peak_bytes": peak}
+    snapshot = _take_snapshot()
+    if diff:
+        with _snapshot_lock:
+            previous, _last_snapshot = _last_snapshot, snapshot
+        if previous is None:
+            report["diff"] = []
+            report["message"] = "Baseline snapshot taken; call again to diff."
+        else:
+            stats = snapshot.compare_to(previous, "lineno")
+            report["diff"] = [_format_stat(stat) for stat in stats[:top]]
+    else:
+        stats = snapshot.statistics("lineno")
+        report["top"] = [_format_stat(stat) for stat in stats[:top]]
+    return report
+
+
+def get_memory_report_service(top=0, diff=False, objects=False):
+    """
+    Report store sizes, plus model object counts and tracemalloc data on request.
+
+    Counting objects walks every object the garbage collector tracks, so it
+    only runs when ``objects`` is set.
+    """
+    if top < 0 or top > MAX_TOP_ALLOCATIONS:
+        return {"message": f"top must be between 0 and {MAX_TOP_ALLOCATIONS}."}, 400
+
+    report = {
+        "stores": {
+            "users": estimate_store_size(users),
+            "active_sessions": estimate_store_size(active_sessions),
+            "destinations": estimate_store_size(destinations),
+        },
+    }
+    if objects:
+        report["objects"] = count_model_objects()
+    if top or diff:
+        report["tracemalloc"] = tracemalloc_report(top or 10, diff)
+    return report, 200
+
+
+def init_tracemalloc(app):
+    """Start tracemalloc at startup when TRACEMALLOC_FRAMES is set (e.g. 1)."""
+    app.config.setdefault(
+        "TRACEMALLOC_FRAMES", int(os.environ.get("TRACEMALLOC_FRAMES", 0))
+    )
+    frames = app.config["TRACEMALLOC_FRAMES"]
+    if frames and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
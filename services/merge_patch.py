@@ -0,0 +1,24 @@
+def apply_merge_patch(target, patch):
+    """
+    Apply an RFC 7396 JSON merge patch to ``target`` and return the result.
+
+    ``target`` is never modified. A ``None`` value in the patch removes the
+    key, nested objects are merged recursively and anything else replaces
+    the existing value.
+    """
+    if not isinstance(patch, dict):
+        return patch
+
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def changed_fields(original, patched):
+    """Return the keys whose value differs between ``original`` and ``patched``."""
+    keys = set(original) | set(patched)
+    return sorted(key for key in keys if original.get(key) != patched.get(key))
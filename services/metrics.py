@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+from services.destination_services import destinations
+from services.user_services import active_sessions, users
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class RouteMetrics:
+    """
+    Latency histogram and status code counts for one route.
+
+    Each route has its own lock, so requests to different routes never
+    contend, and recording is a bisect plus a few additions.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count", "statuses", "_lock")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, status):
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count, dict(self.statuses)
+
+
+# (blueprint, endpoint, method) -> RouteMetrics
+_routes = {}
+_registry_lock = threading.Lock()
+
+
+def record_request(blueprint, endpoint, method, status, seconds):
+    key = (blueprint, endpoint, method)
+    route = _routes.get(key)
+    if route is None:
+        with _registry_lock:
+            route = _routes.setdefault(key, RouteMetrics())
+    route.observe(seconds, status)
+
+
+def reset_metrics():
+    with _registry_lock:
+        _routes.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def render_metrics():
+    """Render every metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        routes = sorted(_routes.items())
+    snapshots = [(key, route.bounds, route.snapshot()) for key, route in routes]
+
+    lines = [
+        "# HELP http_requests_total Requests handled, by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (blueprint, endpoint, method), _, (_, _, _, statuses) in snapshots:
+        for status, count in sorted(statuses.items()):
+            labels = _labels(
+                blueprint=blueprint, endpoint=endpoint, method=method, status=status
+            )
+            lines.append(f"http_requests_total{labels} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency, by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (blueprint, endpoint, method), bounds, snapshot in snapshots:
+        counts, total, count, _ = snapshot
+        cumulative = 0
+        for bound, bucket_count in zip(bounds + ("+Inf",), counts):
+            cumulative += bucket_count
+            labels = _labels(
+                blueprint=blueprint, endpoint=endpoint, method=method, le=bound
+            )
+            lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+        labels = _labels(blueprint=blueprint, endpoint=endpoint, method=method)
+        lines.append(f"http_request_duration_seconds_sum{labels} {total}")
+        lines.append(f"http_request_duration_seconds_count{labels} {count}")
+
+    for name, help_text, value in (
+        ("travel_users", "Registered users.", len(users)),
+        ("travel_active_sessions", "Active login sessions.", len(active_sessions)),
+        ("travel_destinations", "Destinations in the catalog.", len(destinations)),
+    ):
+        lines += [
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} gauge",
+            f"{name} {value}",
+        ]
+
+    return "\n".join(lines) + "\n"
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def _record_response(response):
+    started = g.pop("metrics_started", None)
+    if started is not None:
+        record_request(
+            request.blueprint or "app",
+            request.endpoint or "unmatched",
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+        )
+    return response
+
+
+def metrics_view():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    """
+    Record per-route request metrics and expose them at /metrics.
+
+    On by default; METRICS_ENABLED=0 installs no hooks and no route.
+    """
+    app.config.setdefault(
+        "METRICS_ENABLED",
+        os.environ.get("METRICS_ENABLED", "1").lower()
+        not in ("0", "false", "no", "off"),
+    )
+    if not app.config["METRICS_ENABLED"]:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_response)
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from services.destination_services import destinations, on_catalog_change
+from services.tracing import span
+
+# Views are counted into striped shards so concurrent requests rarely contend
+# on the same lock; the shards are folded into the decayed scores at most once
+# per MERGE_INTERVAL seconds.
+SHARD_COUNT = 16
+MERGE_INTERVAL = 5.0
+# A view loses half its weight after this many seconds
+HALF_LIFE = 6 * 3600.0
+# Longest trending list that can be requested
+MAX_TRENDING = 100
+
+_DECAY_RATE = math.log(2) / HALF_LIFE
+# Rescale stored scores before the forward-decay weights overflow a float
+_MAX_EXPONENT = 500.0
+
+_shard_counts = [{} for _ in range(SHARD_COUNT)]
+_shard_locks = [threading.Lock() for _ in range(SHARD_COUNT)]
+# Each thread is given the next shard on its first view. Thread idents are
+# page-aligned addresses, so ``get_ident() % SHARD_COUNT`` would put every
+# thread on shard 0.
+_thread_shard = threading.local()
+_next_shard = itertools.count()
+
+_merge_lock = threading.Lock()
+_last_merge = 0.0
+# Forward decay: every view is weighted by exp(rate * (t - _epoch)), so scores
+# never have to be decayed in place and relative order only changes for
+# destinations that received new views.
+_epoch = time.time()
+_scores = {}
+# Up to MAX_TRENDING (score, destination_id) pairs, highest score first
+_top = []
+
+
+def record_view(destination_id):
+    """Count one view of a destination. Cheap enough for every GET."""
+    shard = getattr(_thread_shard, "index", None)
+    if shard is None:
+        shard = _thread_shard.index = next(_next_shard) % SHARD_COUNT
+    with _shard_locks[shard]:
+        counts = _shard_counts[shard]
+        counts[destination_id] = counts.get(destination_id, 0) + 1
+
+
+def merge_views(force=False):
+    """
+    Fold the pending shard counts into the decayed scores and refresh the top list.
+
+    Does nothing if the last merge is more recent than MERGE_INTERVAL,
+    unless ``force`` is set.
+    """
+    global _last_merge
+
+    now = time.time()
+    if not force and now - _last_merge < MERGE_INTERVAL:
+        return
+
+    with _merge_lock:
+        _last_merge = now
+        pending = {}
+        for shard in range(SHARD_COUNT):
+            with _shard_locks[shard]:
+                counts = _shard_counts[shard]
+                _shard_counts[shard] = {}
+            for destination_id, count in counts.items():
+                pending[destination_id] = pending.get(destination_id, 0) + count
+
+        if not pending:
+            return
+
+        if _DECAY_RATE * (now - _epoch) > _MAX_EXPONENT:
+            _rescale(now)
+
+        weight = math.exp(_DECAY_RATE * (now - _epoch))
+        for destination_id, count in pending.items():
+            if destination_id in destinations:
+                _scores[destination_id] = _scores.get(destination_id, 0.0) + (
+                    count * weight
+                )
+
+        # Only destinations that just gained views can change position
+        candidates = {destination_id for _, destination_id in _top}
+        candidates.update(pending)
+        _refresh_top(candidates)
+
+
+def get_trending(k):
+    """Return up to ``k`` ``(destination_id, score)`` pairs, most popular first."""
+    merge_views()
+    decay = math.exp(-_DECAY_RATE * (time.time() - _epoch))
+    return [(destination_id, score * decay) for score, destination_id in _top[:k]]
+
+
+@span("get_trending_service")
+def get_trending_service(k):
+    """Fetch the ``k`` most viewed destinations, with their decayed view scores."""
+    if k < 1 or k > MAX_TRENDING:
+        return {"message": f"k must be between 1 and {MAX_TRENDING}."}, 400
+
+    trending = []
+    for destination_id, score in get_trending(k):
+        destination = destinations.get(destination_id)
+        if destination:
+            entry = destination.to_dict()
+            entry["score"] = round(score, 3)
+            trending.append(entry)
+    return trending, 200
+
+
+def _refresh_top(candidates):
+    _top[:] = heapq.nlargest(
+        MAX_TRENDING,
+        (
+            (_scores[destination_id], destination_id)
+            for destination_id in candidates
+            if destination_id in _scores
+        ),
+    )
+
+
+def _rescale(now):
+    """Move the decay epoch to ``now`` and shrink the stored scores to match."""
+    global _epoch
+
+    factor = math.exp(-_DECAY_RATE * (now - _epoch))
+    for destination_id in _scores:
+        _scores[destination_id] *= factor
+    _top[:] = [(score * factor, destination_id) for score, destination_id in _top]
+    _epoch = now
+
+
+@on_catalog_change
+def _forget_removed(changes):
+    removed = [
+        destination_id for kind, destination_id, _ in changes if kind == "removed"
+    ]
+    if not removed:
+        return
+
+    with _merge_lock:
+        for destination_id in removed:
+            _scores.pop(destination_id, None)
+        if any(destination_id in removed for _, destination_id in _top):
+            # A slot opened up; any scored destination may now qualify
+            _refresh_top(_scores)
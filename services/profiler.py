@@ -0,0 +1,127 @@
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+PROFILE_HEADER = "X-Profile"
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack at a fixed interval.
+
+    Much cheaper than cProfile for the profiled request itself, and produces
+    collapsed stacks ("outer;inner;leaf count") for flame graph tools.
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        super().__init__(name="request-stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _should_profile(app):
+    secret = app.config["PROFILER_SECRET"]
+    header = request.headers.get(PROFILE_HEADER)
+    # Compared as bytes: compare_digest rejects non-ASCII str arguments
+    if secret and header and hmac.compare_digest(header.encode(), secret.encode()):
+        return True
+    rate = app.config["PROFILER_SAMPLE_RATE"]
+    return rate > 0 and random.random() < rate
+
+
+def _output_path(app, started, extension):
+    endpoint = (request.endpoint or "unmatched").replace(".", "-")
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(started * 1e6) % 10**6:06d}"
+    return os.path.join(
+        app.config["PROFILER_DIR"],
+        f"{name}-{request.method}-{endpoint}.{extension}",
+    )
+
+
+def init_profiler(app):
+    """
+    Profile selected requests when PROFILER_ENABLED is set.
+
+    A request is profiled when it carries ``X-Profile: <PROFILER_SECRET>`` or
+    is picked at PROFILER_SAMPLE_RATE. PROFILER_MODE chooses between
+    "cprofile" (writes .pstats files) and "sampler" (writes .collapsed stack
+    files). When the profiler is disabled no hooks are installed at all, so
+    unprofiled deployments pay nothing.
+    """
+    app.config.setdefault(
+        "PROFILER_ENABLED", os.environ.get("PROFILER_ENABLED", "") == "1"
+    )
+    app.config.setdefault("PROFILER_SECRET", os.environ.get("PROFILER_SECRET"))
+    app.config.setdefault(
+        "PROFILER_SAMPLE_RATE", _env_float("PROFILER_SAMPLE_RATE", 0.0)
+    )
+    app.config.setdefault("PROFILER_MODE", os.environ.get("PROFILER_MODE", "cprofile"))
+    app.config.setdefault("PROFILER_DIR", os.environ.get("PROFILER_DIR", "profiles"))
+    if not app.config["PROFILER_ENABLED"]:
+        return
+
+    os.makedirs(app.config["PROFILER_DIR"], exist_ok=True)
+
+    @app.before_request
+    def start_profiling():
+        if not _should_profile(app):
+            return
+        g.profile_started = time.time()
+        if app.config["PROFILER_MODE"] == "sampler":
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            g.profile_sampler = sampler
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            g.profile_profiler = profiler
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        started = g.pop("profile_started", None)
+        if started is None:
+            return
+
+        profiler = g.pop("profile_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(_output_path(app, started, "pstats"))
+
+        sampler = g.pop("profile_sampler", None)
+        if sampler is not None:
+            sampler.stop()
+            with open(
+                _output_path(app, started, "collapsed"), "w", encoding="utf-8"
+            ) as output:
+                for stack, count in sampler.stacks.most_common():
+                    output.write(f"{stack} {count}\n")
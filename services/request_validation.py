@@ -0,0 +1,178 @@
+import inspect
+import os
+
+import yaml
+from flask import current_app, jsonify, request
+from jsonschema import Draft4Validator
+from jsonschema.exceptions import best_match
+
+# Requests with a body larger than this are refused with 413 before any of it
+# is read
+DEFAULT_MAX_CONTENT_LENGTH = 1024 * 1024
+# Limit for views marked with max_body_size("BULK_MAX_CONTENT_LENGTH")
+DEFAULT_BULK_MAX_CONTENT_LENGTH = 32 * 1024 * 1024
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+
+class BodyValidator:
+    """A compiled JSON Schema for one route's request body."""
+
+    __slots__ = ("required", "validator")
+
+    def __init__(self, schema):
+        Draft4Validator.check_schema(schema)
+        self.required = tuple(schema.get("required", ()))
+        self.validator = Draft4Validator(schema)
+
+    def error_message(self, data):
+        """Return a message describing why ``data`` is invalid, or None."""
+        # Like the views, name every required field rather than just the
+        # missing ones
+        if isinstance(data, dict) and any(field not in data for field in self.required):
+            return required_fields_message(self.required)
+
+        error = best_match(self.validator.iter_errors(data))
+        if error is None:
+            return None
+        field = ".".join(str(part) for part in error.absolute_path)
+        if error.validator == "type":
+            expected = error.validator_value
+            if not field:
+                return f"Request body must be a JSON {expected}."
+            return f"Field '{field}' must be of type {expected}."
+        if error.validator == "minProperties" and not field:
+            return "Request body must not be empty."
+        if not field:
+            return f"Invalid request body: {error.message}"
+        return f"Invalid value for '{field}': {error.message}"
+
+
+def required_fields_message(fields):
+    """Format missing fields the way the routes do, e.g. "Email and password are required"."""
+    if len(fields) == 1:
+        message = f"{fields[0]} is required"
+    elif len(fields) == 2:
+        message = f"{fields[0]} and {fields[1]} are required"
+    else:
+        message = f"{', '.join(fields[:-1])}, and {fields[-1]} are required"
+    return message[0].upper() + message[1:]
+
+
+def _docstring_specs(view):
+    docstring = inspect.getdoc(view) or ""
+    _, separator, spec = docstring.partition("---")
+    if not separator:
+        return None
+    try:
+        return yaml.safe_load(spec)
+    except yaml.YAMLError:
+        return None
+
+
+def body_schema(view):
+    """Return the body schema from a view's swag_from dict or YAML docstring."""
+    specs = getattr(view, "specs_dict", None) or _docstring_specs(view)
+    if not isinstance(specs, dict):
+        return None
+    for parameter in specs.get("parameters") or ():
+        if parameter.get("in") == "body" and "schema" in parameter:
+            return parameter["schema"]
+    return None
+
+
+def max_body_size(config_key):
+    """
+    Let a view accept bodies up to ``app.config[config_key]`` bytes.
+
+    Overrides MAX_CONTENT_LENGTH for that view only; the limit is applied
+    before the body is read for validation.
+    """
+
+    def decorator(view):
+        view.max_body_size_config = config_key
+        return view
+
+    return decorator
+
+
+def empty_body_message(message):
+    """
+    Answer an empty JSON object with 400 ``message`` instead of validating it.
+
+    For views whose clients already rely on that message for ``{}``.
+    """
+
+    def decorator(view):
+        view.empty_body_message = message
+        return view
+
+    return decorator
+
+
+def compile_validators(app):
+    """Build one BodyValidator per endpoint that accepts a documented body."""
+    validators = {}
+    for rule in app.url_map.iter_rules():
+        if not set(BODY_METHODS) & (rule.methods or set()):
+            continue
+        schema = body_schema(app.view_functions[rule.endpoint])
+        if schema is not None:
+            validators[rule.endpoint] = BodyValidator(schema)
+    return validators
+
+
+def validate_request_body():
+    """
+    before_request hook rejecting bodies that don't match the route's schema.
+
+    Missing and non-JSON bodies are left to the views, which report them
+    with their own messages; so is ``{}`` for views marked with
+    ``empty_body_message``. The parsed body is cached on the request,
+    so views reading it again don't parse it twice.
+    """
+    if request.method not in BODY_METHODS:
+        return None
+    view = current_app.view_functions.get(request.endpoint)
+    config_key = getattr(view, "max_body_size_config", None)
+    if config_key is not None:
+        request.max_content_length = current_app.config[config_key]
+
+    validator = current_app.extensions["request_validators"].get(request.endpoint)
+    if validator is None:
+        return None
+
+    data = request.get_json(silent=True)
+    if data is None:
+        return None
+    if data == {} and hasattr(view, "empty_body_message"):
+        return jsonify({"message": view.empty_body_message}), 400
+    message = validator.error_message(data)
+    if message:
+        return jsonify({"message": message}), 400
+    return None
+
+
+def _payload_too_large(error):
+    limit = request.max_content_length
+    return jsonify({"message": f"Request body is larger than {limit} bytes."}), 413
+
+
+def init_request_validation(app):
+    """
+    Validate request bodies against the route specs and cap body size.
+
+    Call after every blueprint is registered: validators are compiled once,
+    from the routes that exist at that point.
+    """
+    app.config.setdefault(
+        "MAX_CONTENT_LENGTH",
+        int(os.environ.get("MAX_CONTENT_LENGTH", DEFAULT_MAX_CONTENT_LENGTH)),
+    )
+    app.config.setdefault(
+        "BULK_MAX_CONTENT_LENGTH",
+        int(os.environ.get("BULK_MAX_CONTENT_LENGTH", DEFAULT_BULK_MAX_CONTENT_LENGTH)),
+    )
+    app.extensions["request_validators"] = compile_validators(app)
+    app.before_request(validate_request_body)
+    app.register_error_handler(413, _payload_too_large)
@@ -0,0 +1,250 @@
+import math
+import re
+import threading
+
+import numpy as np
+
+from services import destination_services
+from services.destination_services import destinations, on_catalog_change
+from services.single_flight import SingleFlight
+from services.tracing import span
+
+MAX_SIMILAR = 50
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Identical concurrent lookups (same destination, k and catalog version) share
+# one scoring pass
+_similar_flight = SingleFlight()
+
+
+def _term_counts(text):
+    """Return ``{term: count}`` for the tokens of ``text``."""
+    counts = {}
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def _destination_text(destination):
+    return f"{destination.name} {destination.description} {destination.location}"
+
+
+class TfidfIndex:
+    """
+    Sparse TF-IDF vectors for the catalog, updated one destination at a time.
+
+    Every distinct term gets its own column, so two destinations only score
+    above zero when they share a word. Each row keeps its term columns and
+    raw (sublinear) term frequencies, and ``df`` counts how many rows use
+    each column, so adding, updating or removing a destination only touches
+    its own row.
+
+    IDF weights, row norms and an inverted index (the rows of every column,
+    grouped by column) are derived lazily and cached until the next change.
+    A query then reads only the postings of its own terms.
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        self._rows = []
+        self._ids = []
+        self._row_of = {}
+        self._lock = threading.RLock()
+        self._derived = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def upsert(self, destination_id, text):
+        counts = _term_counts(text)
+        weights = np.fromiter(
+            (1.0 + math.log(count) for count in counts.values()),
+            dtype=np.float32,
+            count=len(counts),
+        )
+        with self._lock:
+            columns = np.fromiter(
+                (self._column(term) for term in counts),
+                dtype=np.intp,
+                count=len(counts),
+            )
+            row = self._row_of.get(destination_id)
+            if row is None:
+                row = len(self._ids)
+                self._ids.append(destination_id)
+                self._rows.append((columns, weights))
+                self._row_of[destination_id] = row
+            else:
+                self._df[self._rows[row][0]] -= 1
+                self._rows[row] = (columns, weights)
+            self._df[columns] += 1
+            self._derived = None
+
+    def remove(self, destination_id):
+        with self._lock:
+            row = self._row_of.pop(destination_id, None)
+            if row is None:
+                return
+            self._df[self._rows[row][0]] -= 1
+            # Move the last row into the hole so live rows stay contiguous
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._rows[row] = self._rows[last]
+                self._ids[row] = moved_id
+                self._row_of[moved_id] = row
+            self._rows.pop()
+            self._ids.pop()
+            self._derived = None
+
+    def most_similar(self, destination_id, k):
+        """
+        Return up to ``k`` ``(destination_id, cosine)`` pairs, closest first.
+
+        Only rows sharing a term with the query are scored: their postings
+        are gathered and summed per row with one bincount, and the top k are
+        picked with argpartition, so no Python loop runs per destination.
+        """
+        with self._lock:
+            row = self._row_of.get(destination_id)
+            if row is None:
+                return []
+            count = len(self._ids)
+            idf, norms, indptr, posting_rows, posting_weights = self._weights()
+
+            columns, tf = self._rows[row]
+            query_norm = norms[row]
+            if count < 2 or query_norm == 0.0:
+                return []
+
+            starts, ends = indptr[columns], indptr[columns + 1]
+            postings = np.concatenate(
+                [np.arange(start, end) for start, end in zip(starts, ends)]
+            )
+            query = np.repeat(tf * idf[columns] * idf[columns], ends - starts)
+            scores = np.bincount(
+                posting_rows[postings],
+                weights=posting_weights[postings] * query,
+                minlength=count,
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores /= norms * query_norm
+            scores[~np.isfinite(scores)] = 0.0
+            scores[row] = -1.0
+
+            k = min(k, count - 1)
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(self._ids[i], float(scores[i])) for i in top if scores[i] > 0.0]
+
+    def _column(self, term):
+        column = self._columns.get(term)
+        if column is None:
+            column = self._columns[term] = len(self._columns)
+            if column == self._df.shape[0]:
+                self._df = np.concatenate([self._df, np.zeros_like(self._df)])
+        return column
+
+    def _weights(self):
+        if self._derived is None:
+            count, vocabulary = len(self._rows), len(self._columns)
+            idf = (np.log((1.0 + count) / (1.0 + self._df[:vocabulary])) + 1.0).astype(
+                np.float32
+            )
+            columns = np.concatenate([columns for columns, _ in self._rows])
+            weights = np.concatenate([weights for _, weights in self._rows])
+            lengths = np.fromiter(
+                (len(columns) for columns, _ in self._rows), dtype=np.intp, count=count
+            )
+            rows = np.repeat(np.arange(count), lengths)
+            # ||tf_i * idf|| for every row
+            norms = np.sqrt(
+                np.bincount(
+                    rows, weights=(weights * idf[columns]) ** 2, minlength=count
+                )
+            )
+            # Postings grouped by column: column c's rows are
+            # rows[order][indptr[c]:indptr[c + 1]]
+            order = np.argsort(columns, kind="stable")
+            indptr = np.zeros(vocabulary + 1, dtype=np.intp)
+            np.cumsum(np.bincount(columns, minlength=vocabulary), out=indptr[1:])
+            self._derived = (idf, norms, indptr, rows[order], weights[order])
+        return self._derived
+
+
+index = TfidfIndex()
+for _destination_id, _destination in destinations.items():
+    index.upsert(_destination_id, _destination_text(_destination))
+
+# Changes committed while rebuild_index() runs, replayed before the swap
+_rebuild_backlog = None
+
+
+def rebuild_index(progress=None):
+    """
+    Build a fresh index from the catalog and swap it in.
+
+    Catalog writes are only blocked while taking the snapshot and during the
+    swap; changes committed in between are queued and applied to the new
+    index first. ``progress(done, total)`` is called every 1000 rows and may
+    raise to abort the rebuild.
+    """
+    global index, _rebuild_backlog
+
+    with destination_services.catalog_lock:
+        snapshot = list(destinations.items())
+        _rebuild_backlog = backlog = []
+    try:
+        rebuilt = TfidfIndex()
+        for done, (destination_id, destination) in enumerate(snapshot, 1):
+            rebuilt.upsert(destination_id, _destination_text(destination))
+            if progress is not None and done % 1000 == 0:
+                progress(done, len(snapshot))
+        with destination_services.catalog_lock:
+            _apply_changes(rebuilt, backlog)
+            index = rebuilt
+    finally:
+        with destination_services.catalog_lock:
+            _rebuild_backlog = None
+    if progress is not None:
+        progress(len(snapshot), len(snapshot))
+    return len(rebuilt)
+
+
+@span("get_similar_destinations_service")
+def get_similar_destinations_service(destination_id, k):
+    """Fetch the ``k`` destinations whose text is closest to the given one."""
+    destination_id = str(destination_id)
+    if destination_id not in destinations:
+        return {"message": f"Destination with ID {destination_id} not found."}, 404
+    if k < 1 or k > MAX_SIMILAR:
+        return {"message": f"k must be between 1 and {MAX_SIMILAR}."}, 400
+
+    key = (destination_id, k, destination_services.catalog_version)
+    matches = _similar_flight.do(key, index.most_similar, destination_id, k)
+
+    similar = []
+    for similar_id, score in matches:
+        destination = destinations.get(similar_id)
+        if destination:
+            entry = destination.to_dict()
+            entry["similarity"] = round(score, 4)
+            similar.append(entry)
+    return similar, 200
+
+
+@on_catalog_change
+def _update_index(changes):
+    if _rebuild_backlog is not None:
+        _rebuild_backlog.extend(changes)
+    _apply_changes(index, changes)
+
+
+def _apply_changes(target, changes):
+    for kind, destination_id, destination in changes:
+        if kind == "removed":
+            target.remove(destination_id)
+        else:
+            target.upsert(destination_id, _destination_text(destination))
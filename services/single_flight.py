@@ -0,0 +1,66 @@
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result (or exception). Nothing is cached
+    once the call finishes, so keys should include whatever version makes a
+    result current, e.g. the catalog version.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        # Calls answered with another caller's result
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def __len__(self):
+        return len(self._calls)
+
+
+def normalize_key(*parts, **params):
+    """Build a hashable key; keyword order and duplicate values don't matter."""
+    normalized = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = tuple(sorted(set(value)))
+        normalized.append((name, value))
+    return parts + tuple(normalized)
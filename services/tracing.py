@@ -0,0 +1,213 @@
+import functools
+import inspect
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from flask import current_app, g, request
+
+from services.background import JsonLinesWriter, after_fork_in_child
+
+# Most recent finished request traces kept in memory
+MAX_TRACES = 1000
+
+# Span currently open in this request's context, or None outside a trace
+_current_span = ContextVar("current_span", default=None)
+
+_traces = deque(maxlen=MAX_TRACES)
+_exporter = None
+
+
+class Span:
+    """A timed section of a request, with the spans opened inside it as children."""
+
+    __slots__ = ("name", "attributes", "parent", "children", "start", "end")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.parent = parent
+        self.children = []
+        self.start = time.perf_counter()
+        self.end = None
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def duration(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    def to_dict(self):
+        data = {"name": self.name, "duration_ms": round(self.duration * 1000, 3)}
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+    def format_tree(self, depth=0):
+        """Render the span and its children as an indented text tree."""
+        line = f"{'  ' * depth}{self.name} {self.duration * 1000:.3f}ms"
+        if self.attributes:
+            line += " " + " ".join(f"{k}={v}" for k, v in self.attributes.items())
+        lines = [line]
+        for child in self.children:
+            lines.append(child.format_tree(depth + 1))
+        return "\n".join(lines)
+
+
+class span:
+    """
+    Time a block or function as a child of the current span.
+
+    Usable as ``with span("name"):`` or as a ``@span("name")`` decorator.
+    Outside a traced request it does nothing beyond one context variable
+    lookup, so instrumented code costs next to nothing when tracing is off.
+    """
+
+    __slots__ = ("name", "attributes", "_span", "_token")
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self._span = None
+        self._token = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is not None:
+            self._span = Span(self.name, parent, self.attributes)
+            self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is not None:
+            self._span.end = time.perf_counter()
+            if exc_type is not None:
+                self._span.attributes["error"] = exc_type.__name__
+            _current_span.reset(self._token)
+        return False
+
+    def __call__(self, func):
+        name, attributes = self.name, self.attributes
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with span(name, **attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def current_span():
+    return _current_span.get()
+
+
+def get_recent_traces(limit=100):
+    """Return the most recent finished request traces, newest first."""
+    return [root.to_dict() for root in list(_traces)[::-1][:limit]]
+
+
+def clear_traces():
+    _traces.clear()
+
+
+class TraceExporter(JsonLinesWriter):
+    """
+    Background writer appending finished traces to a JSON-lines file.
+
+    Requests only queue their root span; serializing happens here, off the
+    request path.
+    """
+
+    description = "traces"
+
+    def __init__(self, path):
+        super().__init__(path, name="trace-exporter")
+
+    def encode(self, root):
+        return root.to_dict()
+
+
+def start_trace_exporter(path):
+    """Start the background trace exporter, replacing any previous one."""
+    global _exporter
+    stop_trace_exporter()
+    _exporter = TraceExporter(path)
+    _exporter.start()
+    return _exporter
+
+
+def stop_trace_exporter():
+    """Write pending traces and stop the background exporter, if running."""
+    global _exporter
+    exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.stop()
+
+
+@after_fork_in_child
+def _restart_exporter_in_child():
+    global _exporter
+    if _exporter is not None:
+        _exporter = _exporter.clone()
+        _exporter.start()
+
+
+def init_tracing(app):
+    """
+    Trace every request when TRACING_ENABLED is set.
+
+    Each request gets a root span that the instrumented services nest under.
+    Finished traces are kept in memory (see ``get_recent_traces``), handed
+    to a background thread that appends them as JSON lines to
+    TRACE_EXPORT_PATH when configured, and logged as a span
+    tree when the request took longer than TRACE_SLOW_REQUEST_MS.
+    """
+    app.config.setdefault(
+        "TRACING_ENABLED", os.environ.get("TRACING_ENABLED", "") == "1"
+    )
+    app.config.setdefault("TRACE_EXPORT_PATH", os.environ.get("TRACE_EXPORT_PATH"))
+    app.config.setdefault(
+        "TRACE_SLOW_REQUEST_MS", float(os.environ.get("TRACE_SLOW_REQUEST_MS", 500))
+    )
+    if not app.config["TRACING_ENABLED"]:
+        return
+    if app.config["TRACE_EXPORT_PATH"]:
+        start_trace_exporter(app.config["TRACE_EXPORT_PATH"])
+
+    @app.before_request
+    def start_trace():
+        root = Span(f"{request.method} {request.endpoint or request.path}")
+        g.trace_token = _current_span.set(root)
+        g.trace_root = root
+
+    @app.teardown_request
+    def finish_trace(exc):
+        root = g.pop("trace_root", None)
+        if root is None:
+            return
+        root.end = time.perf_counter()
+        _current_span.reset(g.pop("trace_token"))
+        _traces.append(root)
+
+        exporter = _exporter
+        if exporter is not None:
+            exporter.pending.put(root)
+        if root.duration * 1000 >= current_app.config["TRACE_SLOW_REQUEST_MS"]:
+            current_app.logger.warning("Slow request:\n%s", root.format_tree())
@@ -1,13 +1,24 @@
+import asyncio
 import uuid
 from models.user import User
-from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.security import generate_password_hash
+from services.merge_patch import apply_merge_patch, changed_fields
+from services.json_provider import RawJSON, join_fragments
+from services.favorite_services import forget_user_favorites
+from services.audit_log import record_event
+from services.executors import run_blocking
+from services.tracing import span
 
 from flask import Flask, jsonify
 
 users = {}
 active_sessions = {}
 
+# Largest number of users a single bulk import may create
+MAX_IMPORT_USERS = 1000
 
+
+@span("validate_token")
 def validate_token(token):
     """Validate the provided token and return the full user object if valid."""
 
@@ -42,6 +53,7 @@ def validate_token(token):
     return user
 
 
+@span("register_user")
 def register_user(data):
     """Register a new user."""
     name = data.get("name")
@@ -62,9 +74,89 @@ def register_user(data):
     return {"message": "User registered successfully!"}, 201
 
 
+@span("import_users_service")
+async def import_users_service(records, admin_user=None):
+    """
+    Register many users at once (Admin only).
+
+    Passwords are hashed concurrently on the blocking-work pool rather than
+    one after another on the request thread. Returns one result per record,
+    in input order.
+    """
+    if not isinstance(records, list) or not records:
+        return {"message": "A non-empty list of users is required."}, 400
+    if len(records) > MAX_IMPORT_USERS:
+        return {"message": f"At most {MAX_IMPORT_USERS} users per import."}, 400
+
+    results = []
+    pending = []
+    batch_emails = set()
+    for index, record in enumerate(records):
+        result = {"index": index, "status": "error"}
+        results.append(result)
+        if not isinstance(record, dict):
+            result["message"] = "Each user must be an object."
+            continue
+        result["email"] = email = record.get("email")
+        invalid_field = _first_non_string_field(record)
+        if not record.get("name") or not email or not record.get("password"):
+            result["message"] = "Name, email, and password are required"
+        elif invalid_field:
+            result["message"] = f"Field '{invalid_field}' must be a non-empty string."
+        elif email in users or email in batch_emails:
+            result["message"] = "User already exists!"
+        else:
+            batch_emails.add(email)
+            pending.append((result, record))
+
+    hashes = await asyncio.gather(
+        *(run_blocking(_hash_password, record["password"]) for _, record in pending)
+    )
+
+    created = 0
+    for (result, record), password_hash in zip(pending, hashes):
+        email = record["email"]
+        if email in users:  # registered by another request while hashing
+            result["message"] = "User already exists!"
+            continue
+        users[email] = User.from_password_hash(
+            record["name"], email, password_hash, record.get("role", "User")
+        )
+        result["status"] = "created"
+        created += 1
+
+    record_event(
+        "import_users",
+        admin_user.email if admin_user else None,
+        None,
+        created=created,
+        failed=len(records) - created,
+    )
+    return {
+        "created": created,
+        "failed": len(records) - created,
+        "results": results,
+    }, 200
+
+
+def _first_non_string_field(record):
+    """Name the first import field that is not a non-empty string, if any."""
+    for field in ("name", "email", "password", "role"):
+        value = record.get(field, "User" if field == "role" else None)
+        if not isinstance(value, str) or not value:
+            return field
+    return None
+
+
+def _hash_password(password):
+    with span("hash_password"):
+        return generate_password_hash(password)
+
+
 active_sessions = {}
 
 
+@span("login_user")
 def login_user(email, password):
     """Service to handle user login."""
 
@@ -109,6 +201,7 @@ def logout_user(token):
 
 
 # get all user service. Only applicable for admin
+@span("get_all_users_service")
 def get_all_users_service(token):
     """Service to get all users if the authenticated user is an Admin."""
 
@@ -129,13 +222,15 @@ def get_all_users_service(token):
         print("Forbidden: User is not an Admin.")
         return {"message": "Forbidden. Admin access only."}, 403
 
-    # Return the list of all users if the user is an Admin
-    user_list = [
-        {"name": user.name, "email": user.email, "role": user.role}
-        for user in users.values()
-    ]
-    print(f"Returning {len(user_list)} users.")
-    return {"users": user_list}, 200
+    # Return the list of all users if the user is an Admin, assembled from
+    # each user's cached JSON fragment instead of re-encoding every user
+    print(f"Returning {len(users)} users.")
+    body = join_fragments(
+        (user.to_json() for user in users.values()),
+        prefix=b'{"users":[',
+        suffix=b"]}",
+    )
+    return RawJSON(body), 200
 
 
 print(users)
@@ -152,6 +247,7 @@ def get_user_by_email(email):
 
 
 # for deleting any user (only Applicable for admin)
+@span("delete_user_service")
 def delete_user_service(email, token):
     """Service to delete a user (only accessible by logged-in Admin)."""
 
@@ -178,12 +274,14 @@ def delete_user_service(email, token):
         return {"message": "Admins cannot delete other admins."}, 400
 
     # Remove the user from the users dictionary
-    del users[email]
+    forget_user_favorites(users.pop(email))
 
     # Remove the user from active_sessions if they are logged in
     if email in active_sessions:
         del active_sessions[email]
 
+    record_event("delete_user", authenticated_user.email, email)
+
     return {"message": f"User {email} deleted successfully."}, 200
 
 
@@ -192,34 +290,84 @@ def get_user_profile(email):
     """Retrieve user profile data."""
     user = users.get(email)
     if user:
-        return {"name": user.name, "email": user.email, "role": user.role}, 200
+        return user.to_dict(), 200
     return {"message": "User not found"}, 404
 
 
 # updating profile
+@span("update_user_profile")
 def update_user_profile(email, name, password, new_password=None):
     """Update user profile details."""
     user = users.get(email)
     if not user:
         return {"message": "User not found"}, 404
 
-    if password and not check_password_hash(user.password, password):
+    if password and not user.verify_password(password):
         return {"message": "Invalid current password"}, 401
 
     # Update profile information
     user.name = name if name else user.name
     if new_password:
-        user.password = generate_password_hash(new_password)
+        with span("hash_password"):
+            user.password = generate_password_hash(new_password)
 
     return {"message": "Profile updated successfully"}, 200
 
 
+# patching profile
+@span("patch_user_profile")
+def patch_user_profile(email, patch):
+    """
+    Apply a JSON merge patch (RFC 7396) to a user's profile.
+
+    ``name`` is the only profile field that can be patched. A password change
+    is requested with ``new_password`` and must carry the current
+    ``password``. Unchanged fields are not written.
+    """
+    user = users.get(email)
+    if not user:
+        return {"message": "User not found"}, 404
+
+    if not isinstance(patch, dict):
+        return {"message": "Merge patch must be a JSON object."}, 400
+
+    patch = dict(patch)
+    password = patch.pop("password", None)
+    new_password = patch.pop("new_password", None)
+
+    original = {"name": user.name, "email": user.email, "role": user.role}
+    patched = apply_merge_patch(original, patch)
+    changed = changed_fields(original, patched)
+
+    read_only = [field for field in changed if field != "name"]
+    if read_only:
+        return {"message": f"Fields cannot be changed: {', '.join(read_only)}"}, 400
+    if "name" in changed and (
+        not isinstance(patched.get("name"), str) or not patched["name"]
+    ):
+        return {"message": "Field 'name' must be a non-empty string."}, 400
+
+    if new_password:
+        if not password or not user.verify_password(password):
+            return {"message": "Invalid current password"}, 401
+        with span("hash_password"):
+            user.password = generate_password_hash(new_password)
+        changed.append("password")
+
+    if "name" in changed:
+        user.name = patched["name"]
+
+    return {"email": user.email, "changed": changed}, 200
+
+
 # deleting user data
+@span("delete_user_profile")
 def delete_user_profile(email):
     """Delete user profile."""
     user = users.pop(email, None)
     if not user:
         return {"message": "User not found"}, 404
+    forget_user_favorites(user)
     # Remove from active sessions
     active_sessions.pop(email, None)
     return {"message": "User deleted successfully"}, 200
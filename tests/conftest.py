@@ -56,3 +56,23 @@ def logged_in_user(client):
         "auth_token": login_response.json["auth_token"],
         "role": login_response.json["role"],
     }
+
+
+@pytest.fixture
+def admin_token(client):
+    """Register and log in an admin user, returning the auth token."""
+    admin_data = {
+        "name": "Fixture Admin",
+        "email": "fixture.admin@example.com",
+        "password": "adminpassword123",
+        "role": "Admin",
+    }
+    register_response = client.post("/register", json=admin_data)
+    assert register_response.status_code == 201, "Admin registration failed"
+
+    login_response = client.post(
+        "/login",
+        json={"email": admin_data["email"], "password": admin_data["password"]},
+    )
+    assert login_response.status_code == 200, "Admin login failed"
+    return login_response.get_json()["auth_token"]
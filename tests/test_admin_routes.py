@@ -0,0 +1,563 @@
+import asyncio
+import csv
+import io
+import json
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from services import (
+    audit_log,
+    columnar_services,
+    destination_services,
+    export_services,
+    jobs,
+)
+from services.memory_services import estimate_store_size
+from services.user_services import import_users_service
+
+
+@pytest.fixture(autouse=True)
+def clear_audit_events():
+    """Start every test with an empty audit buffer"""
+    audit_log.clear_events()
+    yield
+
+
+def test_audit_requires_admin(client, logged_in_user):
+    """Test that regular users cannot read the audit log"""
+    response = client.get(
+        "/admin/audit", headers={"Authorization": logged_in_user["auth_token"]}
+    )
+
+    assert response.status_code == 403
+
+
+def test_audit_records_destination_actions(client, admin_token):
+    """Test that destination changes are recorded and can be filtered"""
+    headers = {"Authorization": admin_token}
+    created = client.post(
+        "/destinations",
+        json={"name": "Audited", "description": "Tracked", "location": "Log"},
+        headers=headers,
+    )
+    destination_id = created.get_json()["destination_id"]
+    client.put(
+        f"/destinations/{destination_id}",
+        json={"description": "Changed"},
+        headers=headers,
+    )
+    client.delete(f"/destinations/{destination_id}", headers=headers)
+
+    response = client.get("/admin/audit", headers=headers)
+
+    assert response.status_code == 200
+    events = response.get_json()["events"]
+    assert [event["action"] for event in events] == [
+        "delete_destination",
+        "update_destination",
+        "add_destination",
+    ]
+    assert all(event["actor"] == "fixture.admin@example.com" for event in events)
+    assert all(event["target"] == destination_id for event in events)
+
+    response = client.get("/admin/audit?action=add_destination", headers=headers)
+    assert len(response.get_json()["events"]) == 1
+
+
+def test_audit_writer_flushes_to_file(tmp_path):
+    """Test that the background writer appends events as JSON lines"""
+    path = tmp_path / "audit.log"
+    audit_log.start_audit_writer(str(path))
+    try:
+        audit_log.record_event("delete_user", "admin@example.com", "someone")
+    finally:
+        audit_log.stop_audit_writer()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    event = json.loads(lines[0])
+    assert event["action"] == "delete_user"
+    assert event["timestamp"] <= time.time()
+
+
+def test_memory_report(client, admin_token):
+    """Test that the memory report covers every store and model class"""
+    response = client.get("/admin/memory", headers={"Authorization": admin_token})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert set(data["stores"]) == {"users", "active_sessions", "destinations"}
+    assert data["stores"]["users"]["estimated_bytes"] > 0
+    assert "objects" not in data
+    assert "tracemalloc" not in data
+
+
+def test_memory_report_object_counts(client, admin_token):
+    """Test that live model objects are only counted when asked for"""
+    response = client.get(
+        "/admin/memory?objects=1", headers={"Authorization": admin_token}
+    )
+
+    data = response.get_json()
+    assert data["objects"]["User"] >= data["stores"]["users"]["entries"]
+
+
+def test_memory_report_requires_admin(client, logged_in_user):
+    """Test that regular users cannot read the memory report"""
+    response = client.get(
+        "/admin/memory", headers={"Authorization": logged_in_user["auth_token"]}
+    )
+
+    assert response.status_code == 403
+
+
+def test_memory_report_tracemalloc(client, admin_token):
+    """Test top allocation sites and snapshot diffs while tracemalloc runs"""
+    headers = {"Authorization": admin_token}
+    tracemalloc.start()
+    try:
+        top = client.get("/admin/memory?top=5", headers=headers).get_json()
+        baseline = client.get("/admin/memory?diff=1", headers=headers).get_json()
+        diff = client.get("/admin/memory?diff=1&top=3", headers=headers).get_json()
+    finally:
+        tracemalloc.stop()
+
+    assert top["tracemalloc"]["tracing"] is True
+    assert 0 < len(top["tracemalloc"]["top"]) <= 5
+    assert baseline["tracemalloc"]["diff"] == []
+    assert len(diff["tracemalloc"]["diff"]) <= 3
+    assert "size_diff_bytes" in diff["tracemalloc"]["diff"][0]
+
+
+def test_estimate_store_size_samples_large_stores():
+    """Test that large stores are extrapolated from a sample"""
+    store = {str(i): "x" * 100 for i in range(1000)}
+
+    estimate = estimate_store_size(store, sample_size=50)
+
+    assert estimate["sampled"] == 50
+    assert estimate["exact"] is False
+    exact = estimate_store_size(store, sample_size=1000)["estimated_bytes"]
+    assert abs(estimate["estimated_bytes"] - exact) < exact * 0.05
+
+
+def test_import_users(client, admin_token):
+    """Test bulk import with per-user results"""
+    response = client.post(
+        "/admin/users/import",
+        json={
+            "users": [
+                {"name": "Bulk One", "email": "bulk1@example.com", "password": "pw1"},
+                {"name": "Bulk Two", "email": "bulk2@example.com", "password": "pw2"},
+                {"name": "Dup", "email": "bulk1@example.com", "password": "pw3"},
+                {"email": "bulk3@example.com"},
+            ]
+        },
+        headers={"Authorization": admin_token},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [result["status"] for result in data["results"]] == [
+        "created",
+        "created",
+        "error",
+        "error",
+    ]
+    assert data["results"][2]["message"] == "User already exists!"
+
+    login = client.post(
+        "/login", json={"email": "bulk2@example.com", "password": "pw2"}
+    )
+    assert login.status_code == 200
+
+
+def test_import_users_validation(client, admin_token, logged_in_user):
+    """Test that imports need an admin and a non-empty list"""
+    response = client.post(
+        "/admin/users/import",
+        json=[],
+        headers={"Authorization": admin_token},
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        "/admin/users/import",
+        json=[{"name": "X", "email": "x@example.com", "password": "pw"}],
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 403
+
+
+def test_import_users_rejects_wrong_field_types(client, admin_token):
+    """Test that non-string fields are a 400 or a per-record error, never a 500"""
+    for body in (
+        {"users": [{"name": "T", "email": "t1@example.com", "password": 5}]},
+        [{"name": "T", "email": ["t2@example.com"], "password": "pw"}],
+    ):
+        response = client.post(
+            "/admin/users/import", json=body, headers={"Authorization": admin_token}
+        )
+        assert response.status_code == 400
+
+    # Job imports skip the route schema, so the service checks every record
+    result, status_code = asyncio.run(
+        import_users_service(
+            [
+                {"name": "T", "email": "t3@example.com", "password": 5},
+                {"name": "T", "email": ["t4@example.com"], "password": "pw"},
+                {"name": "T", "email": "t5@example.com", "password": "pw", "role": 1},
+                {"name": "T", "email": "t6@example.com", "password": "pw"},
+            ]
+        )
+    )
+    assert status_code == 200
+    assert [r["status"] for r in result["results"]] == [
+        "error",
+        "error",
+        "error",
+        "created",
+    ]
+    assert [r.get("message") for r in result["results"][:3]] == [
+        "Field 'password' must be a non-empty string.",
+        "Field 'email' must be a non-empty string.",
+        "Field 'role' must be a non-empty string.",
+    ]
+
+
+def _wait_for_job(client, headers, location, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(location, headers=headers).get_json()["job"]
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_import_users_job(client, admin_token):
+    """Test that a queued import runs in the background and can be polled"""
+    headers = {"Authorization": admin_token}
+    users = [
+        {"name": f"Job {i}", "email": f"job{i}@example.com", "password": "pw"}
+        for i in range(3)
+    ]
+    response = client.post(
+        "/admin/jobs",
+        json={"type": "import_users", "params": {"users": users}},
+        headers=headers,
+    )
+
+    assert response.status_code == 202
+    location = response.headers["Location"]
+    job = _wait_for_job(client, headers, location)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == {"done": 3, "total": 3}
+    assert job["result"] == {"created": 3, "failed": 0}
+
+    listed = client.get("/admin/jobs", headers=headers).get_json()["jobs"]
+    assert job["id"] in [listed_job["id"] for listed_job in listed]
+
+    failed = client.post(
+        "/admin/jobs",
+        json={"type": "import_users", "params": {"users": []}},
+        headers=headers,
+    )
+    job = _wait_for_job(client, headers, failed.headers["Location"])
+    assert job["status"] == "failed"
+    assert "non-empty list" in job["error"]
+
+
+def test_job_validation(client, admin_token, logged_in_user):
+    """Test unknown job types, unknown jobs and non-admin callers"""
+    headers = {"Authorization": admin_token}
+    response = client.post("/admin/jobs", json={"type": "nope"}, headers=headers)
+    assert response.status_code == 400
+
+    assert client.get("/admin/jobs/missing", headers=headers).status_code == 404
+    assert client.delete("/admin/jobs/missing", headers=headers).status_code == 404
+
+    response = client.post(
+        "/admin/jobs",
+        json={"type": "snapshot"},
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 403
+
+
+def test_job_runner_cancel_and_queue_limit():
+    """Test cancelling queued and running jobs, and the bounded queue"""
+    runner = jobs.JobRunner(workers=1, max_queued=1)
+    started = threading.Event()
+
+    def slow(job):
+        started.set()
+        while True:
+            job.report(0, 1)
+            time.sleep(0.01)
+
+    running = runner.submit("slow", slow)
+    assert started.wait(5)
+    queued = runner.submit("slow", slow)
+    assert runner.submit("slow", slow) is None
+
+    runner.cancel(queued.id)
+    assert queued.status == "cancelled"
+    runner.cancel(running.id)
+    deadline = time.monotonic() + 5
+    while running.status == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert running.status == "cancelled"
+
+
+def test_rebuild_similarity_index_job(client, admin_token):
+    """Test that the similarity index can be rebuilt as a job"""
+    headers = {"Authorization": admin_token}
+    response = client.post(
+        "/admin/jobs", json={"type": "rebuild_similarity_index"}, headers=headers
+    )
+
+    job = _wait_for_job(client, headers, response.headers["Location"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["indexed"] >= 0
+
+
+def test_export_destinations(client, admin_token, monkeypatch):
+    """Test streaming the catalog as CSV and NDJSON"""
+    headers = {"Authorization": admin_token}
+    client.post(
+        "/destinations",
+        json={"name": "Export, Me", "description": 'Says "hi"', "location": "CSV"},
+        headers=headers,
+    )
+    monkeypatch.setattr(export_services, "EXPORT_CHUNK_ROWS", 1)
+
+    response = client.get("/admin/export/destinations", headers=headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    assert "destinations.csv" in response.headers["Content-Disposition"]
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ["id", "name", "description", "location"]
+    assert ["Export, Me", 'Says "hi"', "CSV"] in [row[1:] for row in rows[1:]]
+
+    response = client.get("/admin/export/destinations?format=ndjson", headers=headers)
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == len(rows) - 1
+    assert {json.loads(line)["name"] for line in lines} >= {"Export, Me"}
+
+
+def test_export_users(client, admin_token, logged_in_user):
+    """Test that user exports stream public fields only and need an admin"""
+    headers = {"Authorization": admin_token}
+    response = client.get("/admin/export/users?format=ndjson", headers=headers)
+
+    assert response.status_code == 200
+    users = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert all(set(user) == {"name", "email", "role"} for user in users)
+    assert "fixture.admin@example.com" in [user["email"] for user in users]
+
+    response = client.get("/admin/export/users?format=xml", headers=headers)
+    assert response.status_code == 400
+    response = client.get("/admin/export/sessions", headers=headers)
+    assert response.status_code == 404
+    response = client.get(
+        "/admin/export/users",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 403
+
+
+def test_bulk_destinations(client, admin_token):
+    """Test that a bulk request applies every operation with one catalog bump"""
+    headers = {"Authorization": admin_token}
+    existing = []
+    for name in ("Bulk Keep", "Bulk Drop"):
+        response = client.post(
+            "/destinations",
+            json={"name": name, "description": "Existing", "location": "W"},
+            headers=headers,
+        )
+        existing.append(response.get_json()["destination_id"])
+    version = destination_services.catalog_version
+
+    response = client.post(
+        "/admin/destinations/bulk",
+        json=[
+            {"name": "Bulk A", "description": "First", "location": "X"},
+            {
+                "op": "create",
+                "name": "Bulk B",
+                "description": "Second",
+                "location": "Y",
+            },
+            {"op": "update", "id": existing[0], "description": "Bulk updated"},
+            {"op": "delete", "id": int(existing[1])},
+        ],
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["applied"] is True
+    assert (data["created"], data["updated"], data["deleted"]) == (2, 1, 1)
+    assert [result["status"] for result in data["results"]] == [
+        "created",
+        "created",
+        "updated",
+        "deleted",
+    ]
+    assert destination_services.catalog_version == version + 1
+    created_id = data["results"][0]["id"]
+    assert destination_services.destinations[created_id].name == "Bulk A"
+    assert destination_services.destinations[existing[0]].description == "Bulk updated"
+    assert existing[1] not in destination_services.destinations
+
+    lines = "\n".join(
+        json.dumps(operation)
+        for operation in (
+            {"op": "update", "id": created_id, "name": "Bulk A2"},
+            {"op": "delete", "id": created_id},
+        )
+    )
+    response = client.post(
+        "/admin/destinations/bulk",
+        data=lines + "\n",
+        content_type="application/x-ndjson",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert created_id not in destination_services.destinations
+
+
+def test_bulk_destinations_is_all_or_nothing(client, admin_token, logged_in_user):
+    """Test that one invalid operation rejects the whole request"""
+    headers = {"Authorization": admin_token}
+    response = client.post(
+        "/destinations",
+        json={"name": "Bulk Target", "description": "Existing", "location": "W"},
+        headers=headers,
+    )
+    target = response.get_json()["destination_id"]
+    count = len(destination_services.destinations)
+    version = destination_services.catalog_version
+
+    response = client.post(
+        "/admin/destinations/bulk",
+        json={
+            "operations": [
+                {"name": "Never", "description": "Applied", "location": "Z"},
+                {"op": "delete", "id": target},
+                {"op": "update", "id": target, "name": "Gone already"},
+                {"op": "create", "name": "Incomplete"},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 400
+    data = response.get_json()
+    assert data["applied"] is False
+    assert [result["status"] for result in data["results"]] == [
+        "ok",
+        "ok",
+        "error",
+        "error",
+    ]
+    assert data["results"][2]["message"] == "Destination not found."
+    assert len(destination_services.destinations) == count
+    assert destination_services.catalog_version == version
+
+    response = client.post(
+        "/admin/destinations/bulk",
+        data='{"name": "ok"}\nnot json\n',
+        content_type="application/x-ndjson",
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Line 2 is not valid JSON."
+
+    response = client.post(
+        "/admin/destinations/bulk",
+        json=[],
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 403
+
+
+def test_bulk_destinations_accepts_large_bodies(app, client, admin_token):
+    """Test that the bulk endpoint has its own body size limit"""
+    app.config["MAX_CONTENT_LENGTH"] = 1000
+    operations = [
+        {"name": f"Large {i}", "description": "Bulk", "location": "L"}
+        for i in range(50)
+    ]
+
+    response = client.post(
+        "/admin/destinations/bulk",
+        json=operations,
+        headers={"Authorization": admin_token},
+    )
+    assert response.status_code == 200
+
+    app.config["BULK_MAX_CONTENT_LENGTH"] = 1000
+    response = client.post(
+        "/admin/destinations/bulk",
+        json=operations,
+        headers={"Authorization": admin_token},
+    )
+    assert response.status_code == 413
+    assert response.get_json()["message"] == "Request body is larger than 1000 bytes."
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["dict", "columnar"])
+def test_destination_stats(client, admin_token, logged_in_user, columnar):
+    """Test counting destinations per location and per admin"""
+    headers = {"Authorization": admin_token}
+    x, y = f"Stat X {columnar}", f"Stat Y {columnar}"
+    client.post(
+        "/admin/destinations/bulk",
+        json=[
+            {"name": f"Stat {i}", "description": "Counted", "location": location}
+            for i, location in enumerate([x, y, x])
+        ],
+        headers=headers,
+    )
+    if columnar:
+        columnar_services.enable_table()
+    try:
+        response = client.get(
+            "/admin/destinations/stats?by=location&admin_email=fixture.admin@example.com",
+            headers=headers,
+        )
+        by_admin = client.get(
+            f"/admin/destinations/stats?by=admin_email&location={x}",
+            headers=headers,
+        )
+    finally:
+        columnar_services.disable_table()
+
+    assert response.status_code == 200
+    groups = {group["value"]: group["count"] for group in response.get_json()["groups"]}
+    assert groups[x] == 2
+    assert groups[y] == 1
+    assert by_admin.get_json()["groups"][0] == {
+        "value": "fixture.admin@example.com",
+        "count": by_admin.get_json()["total"],
+    }
+
+    response = client.get("/admin/destinations/stats?by=name", headers=headers)
+    assert response.status_code == 400
+    response = client.get(
+        "/admin/destinations/stats",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 403
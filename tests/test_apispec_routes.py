@@ -0,0 +1,72 @@
+import gzip
+import json
+
+from app import create_app
+
+
+def test_apispec_served_with_etag(client):
+    """Test that the apispec is served from cache with an ETag"""
+    response = client.get("/apispec_1.json")
+
+    assert response.status_code == 200
+    assert "/destinations" in response.get_json()["paths"]
+    etag = response.headers["ETag"]
+
+    cached = client.get("/apispec_1.json", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_apispec_etag_differs_per_encoding(app, client):
+    """Test that gzip and identity responses carry different strong ETags"""
+    identity = client.get("/apispec_1.json")
+    compressed = client.get("/apispec_1.json", headers={"Accept-Encoding": "gzip"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == identity.data
+    assert compressed.headers["ETag"] != identity.headers["ETag"]
+    assert not compressed.headers["ETag"].startswith("W/")
+
+    # The compressed variant is cached with the spec, not rebuilt per request
+    body = app.extensions["apispec_cache"].body
+    again = client.get("/apispec_1.json", headers={"Accept-Encoding": "gzip"})
+    assert again.data == compressed.data
+    assert list(body._encoded) == [("gzip", app.config["COMPRESS_LEVEL"])]
+
+    cached = client.get(
+        "/apispec_1.json",
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": compressed.headers["ETag"],
+        },
+    )
+    assert cached.status_code == 304
+
+
+def test_apispec_loaded_from_file(monkeypatch, tmp_path):
+    """Test that a spec dumped at build time is served as-is"""
+    path = tmp_path / "apispec.json"
+    path.write_text(json.dumps({"swagger": "2.0", "paths": {"/prebuilt": {}}}))
+    monkeypatch.setenv("APISPEC_FILE", str(path))
+
+    response = create_app().test_client().get("/apispec_1.json")
+
+    assert response.get_json()["paths"] == {"/prebuilt": {}}
+
+
+def test_dump_apispec_command(app, tmp_path):
+    """Test dumping the generated spec from the CLI"""
+    path = tmp_path / "apispec.json"
+
+    result = app.test_cli_runner().invoke(args=["dump-apispec", str(path)])
+
+    assert result.exit_code == 0
+    assert "/login" in json.loads(path.read_text())["paths"]
+
+
+def test_swagger_can_be_disabled(monkeypatch):
+    """Test that the docs UI and spec are not registered when disabled"""
+    monkeypatch.setenv("SWAGGER_ENABLED", "0")
+    client = create_app().test_client()
+
+    assert client.get("/apispec_1.json").status_code == 404
+    assert client.get("/apidocs/").status_code == 404
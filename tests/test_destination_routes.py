@@ -1,5 +1,18 @@
 import pytest
 import json
+import random
+import sys
+import threading
+from datetime import date
+from types import SimpleNamespace
+
+from models.destination import Destination
+from services import (
+    availability_services,
+    columnar_services,
+    destination_services,
+)
+from services.similarity_services import TfidfIndex
 
 
 def test_add_destination_unauthorized(client, logged_in_user):
@@ -254,3 +267,604 @@ def test_get_nonexistent_destination(client, logged_in_user):
     assert response.status_code == 404
     assert "Destination" in response.get_json()["message"]
     assert "not found" in response.get_json()["message"]
+
+
+def test_patch_destination_applies_only_changed_fields(client, admin_token):
+    """Test patching a destination with a JSON merge patch"""
+    create_response = client.post(
+        "/destinations",
+        json={
+            "name": "Patch Me",
+            "description": "Before patch",
+            "location": "Somewhere",
+        },
+        headers={"Authorization": admin_token},
+    )
+    destination_id = create_response.get_json()["destination_id"]
+
+    response = client.patch(
+        f"/destinations/{destination_id}",
+        data=json.dumps({"description": "After patch", "name": "Patch Me"}),
+        content_type="application/merge-patch+json",
+        headers={"Authorization": admin_token},
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {"id": destination_id, "changed": ["description"]}
+
+    destination = client.get(
+        f"/destinations/{destination_id}", headers={"Authorization": admin_token}
+    ).get_json()
+    assert destination["description"] == "After patch"
+    assert destination["location"] == "Somewhere"
+
+
+def test_patch_destination_noop_keeps_catalog_version(client, admin_token):
+    """Test that a merge patch without changes does not bump the catalog version"""
+    from services import destination_services
+
+    create_response = client.post(
+        "/destinations",
+        json={"name": "Same", "description": "Same", "location": "Same"},
+        headers={"Authorization": admin_token},
+    )
+    destination_id = create_response.get_json()["destination_id"]
+    version = destination_services.catalog_version
+
+    response = client.patch(
+        f"/destinations/{destination_id}",
+        json={"name": "Same"},
+        headers={"Authorization": admin_token},
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["changed"] == []
+    assert destination_services.catalog_version == version
+
+
+def test_patch_destination_rejects_removing_required_field(client, admin_token):
+    """Test that a merge patch cannot null out a required field"""
+    create_response = client.post(
+        "/destinations",
+        json={"name": "Keep", "description": "Keep", "location": "Keep"},
+        headers={"Authorization": admin_token},
+    )
+    destination_id = create_response.get_json()["destination_id"]
+
+    response = client.patch(
+        f"/destinations/{destination_id}",
+        json={"location": None},
+        headers={"Authorization": admin_token},
+    )
+
+    assert response.status_code == 400
+
+
+def test_get_all_destinations_gzip(client, admin_token):
+    """Test that the catalog is gzip-compressed when the client accepts it"""
+    import gzip
+
+    client.application.config["COMPRESS_MIN_SIZE"] = 0
+    response = client.get(
+        "/destinations",
+        headers={"Authorization": admin_token, "Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    destinations = json.loads(gzip.decompress(response.data))
+    assert isinstance(destinations, list)
+
+
+def test_get_all_destinations_deflate_and_identity(client, admin_token):
+    """Test deflate negotiation and the uncompressed fallback"""
+    import zlib
+
+    client.application.config["COMPRESS_MIN_SIZE"] = 0
+    deflated = client.get(
+        "/destinations",
+        headers={"Authorization": admin_token, "Accept-Encoding": "deflate"},
+    )
+    plain = client.get("/destinations", headers={"Authorization": admin_token})
+
+    assert deflated.headers["Content-Encoding"] == "deflate"
+    assert "Content-Encoding" not in plain.headers
+    assert json.loads(zlib.decompress(deflated.data)) == plain.get_json()
+
+
+def test_small_responses_are_not_compressed(client, logged_in_user):
+    """Test that bodies below the minimum size are sent uncompressed"""
+    response = client.get(
+        "/destinations/nonexistent_id",
+        headers={
+            "Authorization": logged_in_user["auth_token"],
+            "Accept-Encoding": "gzip",
+        },
+    )
+
+    assert response.status_code == 404
+    assert "Content-Encoding" not in response.headers
+
+
+def test_compression_suffixes_strong_etags():
+    """Test that compressing a response gives it an ETag of its own"""
+    from flask import Flask, jsonify
+
+    from services.compression import init_compression
+
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route("/tagged")
+    def tagged():
+        response = jsonify({"padding": "x" * 2000})
+        response.set_etag("v1")
+        return response
+
+    response = app.test_client().get("/tagged", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == '"v1-gzip"'
+
+
+def test_update_destination_empty_body(client, admin_token):
+    """Test that an update with no fields is rejected"""
+    headers = {"Authorization": admin_token}
+    created = client.post(
+        "/destinations",
+        json={"name": "Untouched", "description": "Same", "location": "Still"},
+        headers=headers,
+    )
+    destination_id = created.get_json()["destination_id"]
+
+    response = client.put(f"/destinations/{destination_id}", json={}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Request body must not be empty."
+
+
+def test_update_destination_refreshes_cached_json(client, admin_token):
+    """Test that an update invalidates the destination's cached JSON fragment"""
+    create_response = client.post(
+        "/destinations",
+        json={"name": "Cached", "description": "Old", "location": "Here"},
+        headers={"Authorization": admin_token},
+    )
+    destination_id = create_response.get_json()["destination_id"]
+    headers = {"Authorization": admin_token}
+
+    # Prime the per-object and catalog caches
+    client.get(f"/destinations/{destination_id}", headers=headers)
+    client.get("/destinations", headers=headers)
+
+    client.put(
+        f"/destinations/{destination_id}",
+        json={"description": "New"},
+        headers=headers,
+    )
+
+    single = client.get(f"/destinations/{destination_id}", headers=headers)
+    catalog = client.get("/destinations", headers=headers).get_json()
+    assert single.get_json()["description"] == "New"
+    assert any(
+        dest["id"] == destination_id and dest["description"] == "New"
+        for dest in catalog
+    )
+
+
+def test_trending_destinations_ranks_most_viewed_first(client, admin_token):
+    """Test that trending destinations are ordered by views"""
+    from services import popularity_services
+
+    headers = {"Authorization": admin_token}
+    ids = []
+    for name in ("Quiet Place", "Busy Place"):
+        response = client.post(
+            "/destinations",
+            json={"name": name, "description": "Trending test", "location": "X"},
+            headers=headers,
+        )
+        ids.append(response.get_json()["destination_id"])
+    quiet_id, busy_id = ids
+
+    for _ in range(50):
+        client.get(f"/destinations/{busy_id}", headers=headers)
+    for _ in range(40):
+        client.get(f"/destinations/{quiet_id}", headers=headers)
+    popularity_services.merge_views(force=True)
+
+    response = client.get("/destinations/trending?k=2", headers=headers)
+
+    assert response.status_code == 200
+    trending = response.get_json()
+    assert [dest["id"] for dest in trending] == [busy_id, quiet_id]
+    assert trending[0]["score"] > trending[1]["score"]
+
+
+def test_record_view_spreads_threads_over_shards():
+    """Test that views from different threads land in different shards"""
+    from services import popularity_services
+
+    popularity_services.merge_views(force=True)
+    threads = [
+        threading.Thread(target=popularity_services.record_view, args=("shard-test",))
+        for _ in range(popularity_services.SHARD_COUNT)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    used = [
+        shard
+        for shard, counts in enumerate(popularity_services._shard_counts)
+        if "shard-test" in counts
+    ]
+    assert len(used) > 1
+    popularity_services.merge_views(force=True)
+
+
+def test_trending_destinations_rejects_invalid_k(client, logged_in_user):
+    """Test that k is bounded"""
+    response = client.get(
+        "/destinations/trending?k=0",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_similar_destinations(client, admin_token):
+    """Test that similar destinations are ranked by text similarity"""
+    headers = {"Authorization": admin_token}
+    ids = {}
+    for name, description, location in (
+        ("Alpine Lodge", "Snowy mountain ski resort", "Alps"),
+        ("Alpine Chalet", "Cozy mountain ski cabin", "Alps"),
+        ("Coral Beach", "Sunny tropical beach with coral reefs", "Fiji"),
+    ):
+        response = client.post(
+            "/destinations",
+            json={"name": name, "description": description, "location": location},
+            headers=headers,
+        )
+        ids[name] = response.get_json()["destination_id"]
+
+    response = client.get(
+        f"/destinations/{ids['Alpine Lodge']}/similar?k=1", headers=headers
+    )
+
+    assert response.status_code == 200
+    similar = response.get_json()
+    assert [dest["id"] for dest in similar] == [ids["Alpine Chalet"]]
+    assert 0 < similar[0]["similarity"] <= 1
+
+
+def test_similar_destinations_share_a_word():
+    """Test that destinations with no word in common are never returned"""
+    vocabulary = [f"word{i}" for i in range(5000)]
+    rng = random.Random(7)
+    index = TfidfIndex()
+    words = {}
+    for i in range(2000):
+        words[str(i)] = {rng.choice(vocabulary) for _ in range(12)}
+        index.upsert(str(i), " ".join(words[str(i)]))
+
+    for query in map(str, range(50)):
+        for similar_id, _ in index.most_similar(query, 5):
+            assert words[query] & words[similar_id]
+
+
+def test_similar_destinations_not_found(client, logged_in_user):
+    """Test similar destinations for a missing destination"""
+    response = client.get(
+        "/destinations/nonexistent_id/similar",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+
+    assert response.status_code == 404
+
+
+def test_destination_availability_open_and_close(client, admin_token):
+    """Test opening and closing date ranges for a destination"""
+    headers = {"Authorization": admin_token}
+    created = client.post(
+        "/destinations",
+        json={"name": "Bookable", "description": "Has dates", "location": "Z"},
+        headers=headers,
+    )
+    destination_id = created.get_json()["destination_id"]
+
+    client.post(
+        f"/destinations/{destination_id}/availability",
+        json={"from": "2026-12-30", "to": "2027-01-03", "open": True},
+        headers=headers,
+    )
+    client.post(
+        f"/destinations/{destination_id}/availability",
+        json={"from": "2027-01-01", "to": "2027-01-01", "open": False},
+        headers=headers,
+    )
+
+    response = client.get(
+        f"/destinations/{destination_id}/availability?from=2026-12-29&to=2027-01-05",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    availability = response.get_json()
+    assert availability["open_dates"] == [
+        "2026-12-30",
+        "2026-12-31",
+        "2027-01-02",
+        "2027-01-03",
+    ]
+    assert availability["open_days"] == 4
+    assert availability["total_days"] == 8
+
+    response = client.get(
+        "/destinations/available?dates=2026-12-31,2027-01-02", headers=headers
+    )
+    assert destination_id in [dest["id"] for dest in response.get_json()]
+
+    response = client.get(
+        "/destinations/available?dates=2026-12-31,2027-01-01", headers=headers
+    )
+    assert destination_id not in [dest["id"] for dest in response.get_json()]
+
+
+def test_availability_search_during_concurrent_writes():
+    """Test that searching while calendars are added doesn't fail mid-scan"""
+    admin = SimpleNamespace(email="calendar@example.com")
+    ids = [
+        destination_services.add_destination_service(
+            {"name": f"Cal {i}", "description": "D", "location": "L"}, admin
+        )[0]["destination_id"]
+        for i in range(300)
+    ]
+    days = [date(2028, 3, 1)]
+    errors = []
+
+    def search():
+        try:
+            while ids:
+                availability_services.find_open_destination_ids(days)
+        except RuntimeError as e:
+            errors.append(e)
+
+    # Switch threads often so writes land in the middle of a scan
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        searcher = threading.Thread(target=search)
+        searcher.start()
+        while ids:
+            availability_services.set_availability_service(
+                ids.pop(), {"from": "2028-03-01", "to": "2028-03-01", "open": True}
+            )
+        searcher.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+
+
+def test_destination_availability_requires_admin(client, logged_in_user):
+    """Test that only admins can change availability"""
+    response = client.post(
+        "/destinations/1/availability",
+        json={"from": "2027-01-01", "to": "2027-01-02", "open": True},
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+
+    assert response.status_code == 403
+
+
+def test_available_destinations_invalid_dates(client, logged_in_user):
+    """Test that availability search needs valid dates"""
+    response = client.get(
+        "/destinations/available?dates=2027-13-01",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_destination_events_stream(app, client, admin_token):
+    """Test that catalog changes are pushed to open event streams"""
+    from services.event_stream import broker
+
+    app.config["EVENT_STREAM_HEARTBEAT"] = 0.05
+    headers = {"Authorization": admin_token}
+    response = client.get("/destinations/events", headers=headers, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    frames = iter(response.response)
+    assert next(frames) == b"retry: 3000\n\n"
+    created = client.post(
+        "/destinations",
+        json={"name": "Streamed", "description": "Pushed", "location": "SSE"},
+        headers=headers,
+    )
+    destination_id = created.get_json()["destination_id"]
+
+    frame = next(frames)
+    while frame == b": keep-alive\n\n":
+        frame = next(frames)
+    assert b"event: destination.added\n" in frame
+    assert f'"id":"{destination_id}"'.encode() in frame.replace(b" ", b"")
+
+    response.close()
+    assert len(broker) == 0
+
+
+def test_add_destination_missing_body(client, admin_token):
+    """Test that adding a destination without a JSON body is a 400, not a crash"""
+    response = client.post("/destinations", headers={"Authorization": admin_token})
+
+    assert response.status_code == 400
+
+
+def test_concurrent_adds_keep_ids_matching_keys():
+    """Test that every added destination reports the id it is stored under"""
+    admin = SimpleNamespace(email="ids@example.com")
+    # Destinations built outside the service move the model's own counter
+    Destination("Stray", "Not stored", "Nowhere", admin.email)
+    added = []
+
+    def add(worker):
+        for i in range(20):
+            result, _ = destination_services.add_destination_service(
+                {"name": f"Id {worker}-{i}", "description": "D", "location": "L"},
+                admin,
+            )
+            added.append(result["destination_id"])
+
+    threads = [threading.Thread(target=add, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(added)) == 160
+    for key in added:
+        assert destination_services.destinations[key].to_dict()["id"] == key
+
+
+def test_add_destination_reports_missing_fields(client, admin_token):
+    """Test that required fields come from the route schema"""
+    response = client.post(
+        "/destinations",
+        json={"name": "Nameless"},
+        headers={"Authorization": admin_token},
+    )
+
+    assert response.status_code == 400
+    assert (
+        response.get_json()["message"] == "Name, description, and location are required"
+    )
+
+
+def test_get_destinations_batch(client, admin_token):
+    """Test fetching several destinations in one request"""
+    headers = {"Authorization": admin_token}
+    ids = []
+    for name in ("Batch One", "Batch Two"):
+        response = client.post(
+            "/destinations",
+            json={"name": name, "description": "Batched", "location": "Here"},
+            headers=headers,
+        )
+        ids.append(response.get_json()["destination_id"])
+
+    response = client.get(
+        f"/destinations/batch?ids={ids[1]},missing,{ids[0]},{ids[1]}",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [dest["id"] for dest in data["destinations"]] == [ids[1], ids[0]]
+    assert data["missing"] == ["missing"]
+
+    response = client.post(
+        "/destinations/batch", json={"ids": [int(ids[0]), "missing"]}, headers=headers
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [dest["name"] for dest in data["destinations"]] == ["Batch One"]
+    assert data["missing"] == ["missing"]
+
+
+def test_get_destinations_batch_validation(client, logged_in_user):
+    """Test that batch lookups need a token and a usable list of ids"""
+    headers = {"Authorization": logged_in_user["auth_token"]}
+    assert client.get("/destinations/batch", headers=headers).status_code == 400
+    assert client.get("/destinations/batch?ids=1").status_code == 401
+
+    response = client.post("/destinations/batch", json={"ids": []}, headers=headers)
+    assert response.status_code == 400
+    response = client.post(
+        "/destinations/batch", json={"ids": [{"id": 1}]}, headers=headers
+    )
+    assert response.status_code == 400
+    response = client.post(
+        "/destinations/batch", json={"ids": ["1"] * 1001}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.fixture(params=[False, True], ids=["dict", "columnar"])
+def columnar_store(request):
+    """Run a test against the dict scan and against the columnar table"""
+    if request.param:
+        columnar_services.enable_table()
+    yield request.param
+    columnar_services.disable_table()
+
+
+def test_filter_destinations(client, admin_token, logged_in_user, columnar_store):
+    """Test filtering the catalog by location, and by admin for admins only"""
+    headers = {"Authorization": admin_token}
+    # Destinations persist between tests, so each run uses its own locations
+    suffix = "columnar" if columnar_store else "dict"
+    ids = []
+    for name, location in (
+        ("Fjord A", f"Norway {suffix}"),
+        ("Fjord B", f"Norway {suffix}"),
+        ("Loch", f"UK {suffix}"),
+    ):
+        response = client.post(
+            "/destinations",
+            json={"name": name, "description": "Water", "location": location},
+            headers=headers,
+        )
+        ids.append(response.get_json()["destination_id"])
+    client.patch(
+        f"/destinations/{ids[1]}",
+        json={"location": f"Sweden {suffix}"},
+        headers=headers,
+    )
+    client.delete(f"/destinations/{ids[2]}", headers=headers)
+
+    response = client.get(
+        f"/destinations?location=Norway {suffix}",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 200
+    assert [dest["id"] for dest in response.get_json()] == [ids[0]]
+
+    response = client.get(f"/destinations?location=UK {suffix}", headers=headers)
+    assert response.get_json() == []
+
+    response = client.get(
+        f"/destinations?location=Sweden {suffix}&admin_email=fixture.admin@example.com",
+        headers=headers,
+    )
+    assert [dest["id"] for dest in response.get_json()] == [ids[1]]
+
+    response = client.get(
+        "/destinations?admin_email=fixture.admin@example.com",
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+    assert response.status_code == 403
+
+
+def test_destination_table_compacts_deleted_rows():
+    """Test that the columnar table drops deleted rows and keeps catalog order"""
+    table = columnar_services.DestinationTable(capacity=4)
+    for i in range(3000):
+        table.upsert(str(i), Destination(f"D{i}", "Desc", f"L{i % 3}", "a@x.com"))
+    for i in range(0, 2000):
+        table.remove(str(i))
+
+    assert len(table) == 1000
+    assert table.size < 3000
+    selected = table.select(location="L0")
+    assert [dest.name for dest in selected] == [
+        f"D{i}" for i in range(2000, 3000) if i % 3 == 0
+    ]
+    assert table.group_counts("location") == {"L0": 333, "L1": 333, "L2": 334}
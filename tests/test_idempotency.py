@@ -0,0 +1,157 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+import models.user
+from flask import Flask, jsonify
+
+from app import create_app
+from services.idempotency import IdempotencyStore, idempotent, store
+
+
+@pytest.fixture(autouse=True)
+def clear_idempotency_store():
+    """Start every test with no stored results"""
+    store.clear()
+    yield
+
+
+def test_register_retry_replays_without_rehashing(client):
+    """Test that a retried registration returns the stored response"""
+    body = {"name": "Retry", "email": "retry@example.com", "password": "pw"}
+    headers = {"Idempotency-Key": "register-retry-1"}
+
+    first = client.post("/register", json=body, headers=headers)
+    with mock.patch.object(models.user, "generate_password_hash") as hasher:
+        second = client.post("/register", json=body, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    hasher.assert_not_called()
+
+    # Without the key the retry runs again and hits the duplicate check
+    third = client.post("/register", json=body)
+    assert third.status_code == 400
+
+
+def test_key_reused_for_different_body(client):
+    """Test that a key can't be replayed for a different request"""
+    headers = {"Idempotency-Key": "reused-key"}
+    client.post(
+        "/register",
+        json={"name": "A", "email": "a@example.com", "password": "pw"},
+        headers=headers,
+    )
+
+    response = client.post(
+        "/register",
+        json={"name": "B", "email": "b@example.com", "password": "pw"},
+        headers=headers,
+    )
+
+    assert response.status_code == 422
+
+
+def test_add_destination_retry_creates_one_destination(client, admin_token):
+    """Test that retried destination creation doesn't allocate a second ID"""
+    headers = {"Authorization": admin_token, "Idempotency-Key": "dest-1"}
+    body = {"name": "Once", "description": "Only once", "location": "Here"}
+
+    first = client.post("/destinations", json=body, headers=headers)
+    second = client.post("/destinations", json=body, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert first.get_json()["destination_id"] == second.get_json()["destination_id"]
+
+
+def test_concurrent_duplicates_run_once():
+    """Test that a duplicate arriving mid-flight waits for the original"""
+    app = create_app()
+    body = {"name": "Race", "email": "race@example.com", "password": "pw"}
+    headers = {"Idempotency-Key": "race-1"}
+    started = threading.Event()
+    release = threading.Event()
+    real_hash = models.user.generate_password_hash
+    calls = []
+
+    def slow_hash(password):
+        calls.append(password)
+        started.set()
+        release.wait(5)
+        return real_hash(password)
+
+    responses = []
+
+    def register():
+        responses.append(
+            app.test_client().post("/register", json=body, headers=headers)
+        )
+
+    with mock.patch.object(models.user, "generate_password_hash", slow_hash):
+        original = threading.Thread(target=register)
+        original.start()
+        started.wait(5)
+        duplicate = threading.Thread(target=register)
+        duplicate.start()
+        release.set()
+        original.join()
+        duplicate.join()
+
+    assert len(calls) == 1
+    assert [response.status_code for response in responses] == [201, 201]
+
+
+def test_duplicates_rerun_once_after_failed_original():
+    """Test that duplicates waiting on a failed original run the view only once more"""
+    app = Flask(__name__)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @app.route("/work", methods=["POST"])
+    @idempotent
+    def work():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            return jsonify({"message": "failed"}), 500
+        return jsonify({"call": len(calls)}), 201
+
+    statuses = []
+
+    def post():
+        response = app.test_client().post(
+            "/work", json={}, headers={"Idempotency-Key": "rerun-1"}
+        )
+        statuses.append(response.status_code)
+
+    original = threading.Thread(target=post)
+    original.start()
+    started.wait(5)
+    duplicates = [threading.Thread(target=post) for _ in range(3)]
+    for thread in duplicates:
+        thread.start()
+    # Give the duplicates time to start waiting on the original
+    time.sleep(0.2)
+    release.set()
+    for thread in [original, *duplicates]:
+        thread.join()
+
+    assert len(calls) == 2
+    assert sorted(statuses) == [201, 201, 201, 500]
+
+
+def test_store_evicts_least_recently_used():
+    """Test that the store stays bounded"""
+    bounded = IdempotencyStore(max_entries=2)
+    for key in ("a", "b", "c"):
+        entry, _ = bounded.begin(key, b"")
+        bounded.finish(key, entry, (200, "application/json", b"{}"))
+
+    assert len(bounded) == 2
+    _, is_owner = bounded.begin("a", b"")
+    assert is_owner
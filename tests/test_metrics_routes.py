@@ -0,0 +1,48 @@
+from app import create_app
+from services.metrics import reset_metrics
+
+
+def test_metrics_records_requests(client):
+    """Test that requests show up in the Prometheus metrics"""
+    reset_metrics()
+    client.get("/")
+    client.get("/profile")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert (
+        'http_requests_total{blueprint="app",endpoint="hello_flask",'
+        'method="GET",status="200"} 1'
+    ) in body
+    assert (
+        'http_requests_total{blueprint="profile",endpoint="profile.view_profile",'
+        'method="GET",status="401"} 1'
+    ) in body
+    assert (
+        'http_request_duration_seconds_count{blueprint="app",'
+        'endpoint="hello_flask",method="GET"} 1'
+    ) in body
+    assert 'le="+Inf"' in body
+
+
+def test_metrics_gauges(client, logged_in_user):
+    """Test the store size gauges"""
+    from services.destination_services import destinations
+    from services.user_services import users
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert f"travel_users {len(users)}" in body
+    assert f"travel_destinations {len(destinations)}" in body
+    assert "# TYPE travel_active_sessions gauge" in body
+
+
+def test_metrics_disabled_from_environment(monkeypatch):
+    """Test that METRICS_ENABLED=0 removes the /metrics route"""
+    monkeypatch.setenv("METRICS_ENABLED", "0")
+    client = create_app().test_client()
+
+    assert client.get("/metrics").status_code == 404
@@ -85,6 +85,117 @@ def test_delete_profile_successful(client, logged_in_user):
     assert "User deleted successfully" in response.json["message"]
 
 
+def test_patch_profile_name(client, logged_in_user):
+    """Test patching the profile name with a merge patch"""
+    token = logged_in_user["auth_token"]
+
+    response = client.patch(
+        "/profile",
+        json={"name": "Patched Name"},
+        headers={"Authorization": token},
+    )
+
+    assert response.status_code == 200
+    assert response.json["changed"] == ["name"]
+
+    profile = client.get("/profile", headers={"Authorization": token})
+    assert profile.json["name"] == "Patched Name"
+
+
+def test_patch_profile_rejects_email_change(client, logged_in_user):
+    """Test that read-only profile fields cannot be patched"""
+    response = client.patch(
+        "/profile",
+        json={"email": "other@example.com"},
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_favorites_add_list_and_remove(client, logged_in_user):
+    """Test saving, listing and removing favorite destinations"""
+    headers = {"Authorization": logged_in_user["auth_token"]}
+
+    response = client.post(
+        "/profile/favorites", json={"destination_id": "2"}, headers=headers
+    )
+    assert response.status_code == 201
+
+    response = client.get("/profile/favorites", headers=headers)
+    assert response.status_code == 200
+    assert [dest["id"] for dest in response.json["favorites"]] == ["2"]
+
+    response = client.delete("/profile/favorites/2", headers=headers)
+    assert response.status_code == 200
+    assert client.get("/profile/favorites", headers=headers).json["favorites"] == []
+
+
+def test_favorites_unknown_destination(client, logged_in_user):
+    """Test that only existing destinations can be favorited"""
+    response = client.post(
+        "/profile/favorites",
+        json={"destination_id": "999999"},
+        headers={"Authorization": logged_in_user["auth_token"]},
+    )
+
+    assert response.status_code == 404
+
+
+def test_favorites_require_token(client):
+    """Test that favorites report a missing token like the other profile views"""
+    responses = [
+        client.get("/profile/favorites"),
+        client.post("/profile/favorites", json={"destination_id": "2"}),
+        client.delete("/profile/favorites/2"),
+    ]
+
+    for response in responses:
+        assert response.status_code == 401
+        assert response.json["message"] == "Authorization token is required"
+
+
+def test_deleted_destination_leaves_favorites(client, logged_in_user, admin_token):
+    """Test that deleting a destination removes it from users' favorites"""
+    created = client.post(
+        "/destinations",
+        json={"name": "Short Lived", "description": "Gone soon", "location": "Y"},
+        headers={"Authorization": admin_token},
+    )
+    destination_id = created.get_json()["destination_id"]
+    headers = {"Authorization": logged_in_user["auth_token"]}
+    client.post(
+        "/profile/favorites", json={"destination_id": destination_id}, headers=headers
+    )
+
+    client.delete(
+        f"/destinations/{destination_id}", headers={"Authorization": admin_token}
+    )
+
+    favorites = client.get("/profile/favorites", headers=headers).json["favorites"]
+    assert all(dest["id"] != destination_id for dest in favorites)
+
+
+def test_update_profile_missing_body(client, logged_in_user):
+    """Test that updating the profile without a JSON body is a 400, not a crash"""
+    response = client.put(
+        "/profile", headers={"Authorization": logged_in_user["auth_token"]}
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid request. JSON data is missing"
+
+
+def test_update_profile_empty_body(client, logged_in_user):
+    """Test that an empty JSON object is validated rather than waved through"""
+    response = client.put(
+        "/profile", json={}, headers={"Authorization": logged_in_user["auth_token"]}
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == "Password is required"
+
+
 # Additional fixture for logged-in user
 @pytest.fixture
 def logged_in_user(client):
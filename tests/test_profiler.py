@@ -0,0 +1,50 @@
+import pstats
+
+from app import create_app
+
+
+def _profiled_app(monkeypatch, tmp_path, mode="cprofile"):
+    monkeypatch.setenv("PROFILER_ENABLED", "1")
+    monkeypatch.setenv("PROFILER_SECRET", "let-me-profile")
+    monkeypatch.setenv("PROFILER_MODE", mode)
+    monkeypatch.setenv("PROFILER_DIR", str(tmp_path))
+    return create_app()
+
+
+def test_profiler_triggered_by_secret_header(monkeypatch, tmp_path):
+    """Test that only requests with the secret header are profiled"""
+    client = _profiled_app(monkeypatch, tmp_path).test_client()
+
+    client.get("/")
+    assert list(tmp_path.iterdir()) == []
+
+    client.get("/", headers={"X-Profile": "wrong"})
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.get("/", headers={"X-Profile": "caf\u00e9"})
+    assert response.status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+    client.get("/", headers={"X-Profile": "let-me-profile"})
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].name.endswith("-GET-hello_flask.pstats")
+    assert pstats.Stats(str(files[0])).total_calls > 0
+
+
+def test_profiler_sampler_mode(monkeypatch, tmp_path):
+    """Test that the stack sampler writes a collapsed-stack file"""
+    client = _profiled_app(monkeypatch, tmp_path, mode="sampler").test_client()
+
+    client.get("/", headers={"X-Profile": "let-me-profile"})
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].suffix == ".collapsed"
+
+
+def test_profiler_disabled_installs_no_hooks(app):
+    """Test that a disabled profiler adds no request hooks"""
+    hooks = app.before_request_funcs.get(None, [])
+
+    assert all(hook.__name__ != "start_profiling" for hook in hooks)
@@ -0,0 +1,73 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+import serve
+from serve import PooledWSGIServer, run_worker
+from services import audit_log
+
+
+def test_pooled_server_stops_after_max_requests(app):
+    """Test that a worker stops accepting once it reaches max_requests"""
+    listener = socket.create_server(("127.0.0.1", 0))
+    host, port = listener.getsockname()
+    server = PooledWSGIServer(
+        host, port, app, listener.fileno(), threads=2, max_requests=2
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}
+    )
+    thread.start()
+
+    statuses = []
+    for _ in range(2):
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", "/")
+        statuses.append(connection.getresponse().status)
+        connection.close()
+
+    thread.join(timeout=5)
+    server.pool.shutdown(wait=True)
+    listener.close()
+    assert statuses == [200, 200]
+    assert not thread.is_alive()
+    assert server.requests == 2
+
+
+def test_worker_flushes_audit_log_before_exit(app, monkeypatch, tmp_path):
+    """Test that a recycled worker writes out queued audit events"""
+
+    class WorkerExit(Exception):
+        pass
+
+    def fake_exit(code):
+        raise WorkerExit(code)
+
+    monkeypatch.setattr(serve.signal, "signal", lambda *args: None)
+    monkeypatch.setattr(serve.os, "_exit", fake_exit)
+    path = tmp_path / "audit.log"
+    audit_log.start_audit_writer(str(path))
+    audit_log.record_event("before_exit", "admin@example.com", "1")
+
+    listener = socket.create_server(("127.0.0.1", 0))
+    host, port = listener.getsockname()
+
+    def request():
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", "/")
+        connection.getresponse().read()
+        connection.close()
+
+    client = threading.Thread(target=request)
+    client.start()
+    with pytest.raises(WorkerExit):
+        run_worker(app, listener, threads=1, max_requests=1)
+    client.join()
+    listener.close()
+
+    assert audit_log._writer is None
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["action"] for event in events] == ["before_exit"]
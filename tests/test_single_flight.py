@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from services.single_flight import SingleFlight, normalize_key
+
+
+def test_concurrent_calls_share_one_result():
+    """Test that callers arriving mid-flight get the leader's result"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", compute)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", compute)))
+        for _ in range(4)
+    ]
+    for follower in followers:
+        follower.start()
+    while flight.coalesced < 4:
+        pass
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+    assert len(flight) == 0
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    """Test that a failed call raises for its caller and the next call retries"""
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: 42) == 42
+
+
+def test_normalize_key_ignores_order_and_duplicates():
+    """Test that equivalent queries map to the same key"""
+    assert normalize_key("q", days=[3, 1, 1], k=5) == normalize_key(
+        "q", k=5, days=(1, 3)
+    )
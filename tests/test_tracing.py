@@ -0,0 +1,81 @@
+import json
+
+from app import create_app
+from services.tracing import (
+    Span,
+    clear_traces,
+    get_recent_traces,
+    span,
+    stop_trace_exporter,
+)
+
+
+def _child_names(trace):
+    return [child["name"] for child in trace.get("children", [])]
+
+
+def test_span_outside_trace_is_noop():
+    """Test that spans opened outside a traced request record nothing"""
+
+    @span("work")
+    def work():
+        return 42
+
+    with span("block") as block:
+        assert block is None
+    assert work() == 42
+
+
+def test_span_nesting():
+    """Test that spans nest under the span open when they start"""
+    from services.tracing import _current_span
+
+    root = Span("root")
+    token = _current_span.set(root)
+    try:
+        with span("outer", step=1):
+            with span("inner"):
+                pass
+    finally:
+        _current_span.reset(token)
+
+    tree = root.to_dict()
+    assert _child_names(tree) == ["outer"]
+    assert tree["children"][0]["attributes"] == {"step": 1}
+    assert _child_names(tree["children"][0]) == ["inner"]
+
+
+def test_request_trace_collected_and_exported(monkeypatch, tmp_path):
+    """Test that a traced request records auth, service and encoding spans"""
+    export_path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACING_ENABLED", "1")
+    monkeypatch.setenv("TRACE_EXPORT_PATH", str(export_path))
+    client = create_app().test_client()
+    clear_traces()
+
+    client.post(
+        "/register",
+        json={"name": "Tracer", "email": "tracer@example.com", "password": "pw"},
+    )
+
+    trace = get_recent_traces(1)[0]
+    assert trace["name"] == "POST auth.register"
+    assert _child_names(trace) == ["hash_password", "json_encode"]
+
+    # Stopping the exporter writes out everything still queued
+    stop_trace_exporter()
+    exported = [json.loads(line) for line in export_path.read_text().splitlines()]
+    assert exported[-1]["name"] == "POST auth.register"
+
+
+def test_slow_request_logs_span_tree(monkeypatch, caplog, admin_token):
+    """Test that requests over the threshold log their span tree"""
+    monkeypatch.setenv("TRACING_ENABLED", "1")
+    monkeypatch.setenv("TRACE_SLOW_REQUEST_MS", "0")
+    client = create_app().test_client()
+
+    client.get("/destinations", headers={"Authorization": admin_token})
+
+    assert "Slow request:" in caplog.text
+    assert "validate_token" in caplog.text
+    assert "get_all_destinations_service" in caplog.text
@@ -142,6 +142,33 @@ def test_login_invalid_json(client):
     assert response_data["message"] == "Bad Request, JSON data is missing"
 
 
+def test_register_rejects_wrong_field_types(client):
+    """Test that bodies not matching the route schema are rejected"""
+    response = client.post(
+        "/register",
+        json={"name": "Typed", "email": "typed@example.com", "password": 12345},
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Field 'password' must be of type string."
+
+    response = client.post("/register", json=["not", "an", "object"])
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Request body must be a JSON object."
+
+
+def test_oversize_body_rejected(app, client):
+    """Test that bodies over MAX_CONTENT_LENGTH are refused with 413"""
+    app.config["MAX_CONTENT_LENGTH"] = 100
+    response = client.post(
+        "/register",
+        json={"name": "x" * 200, "email": "big@example.com", "password": "pw"},
+    )
+
+    assert response.status_code == 413
+    assert "larger than 100 bytes" in response.get_json()["message"]
+
+
 def test_logout(client):
     from services.user_services import active_sessions
 